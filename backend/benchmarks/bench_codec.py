@@ -0,0 +1,122 @@
+"""
+Codec benchmark: load / save / serialise throughput of the JSON codec in
+repositories/json_utils.py against the previous stdlib path (indented
+json.dump for data files, jsonable_encoder + json.dumps for responses).
+
+The records in backend/data/*.json are repeated SCALE times (1000 by
+default) with their ids made unique, so each dataset is in the size range
+where the codec dominates request and compaction time.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_codec [--scale N] [--repeat N]
+
+Set TSS_JSON_CODEC=json to measure the stdlib fallback of the new codec.
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+
+from repositories.json_utils import CODEC, dumps, loads
+from repositories.class_offering_repository import ClassOfferingRepository
+from models.report import Report
+from routers.responses import fast_json
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+FILES = ["class_offerings", "enrollments", "reports", "users", "rooms"]
+
+# Fields suffixed per copy so the scaled records do not share ids
+ID_FIELDS = ("id", "report_id", "user_id", "room_id", "class_id", "student_id")
+
+
+def scaled(records: list, scale: int) -> list:
+    out = []
+    for n in range(scale):
+        for record in records:
+            copy = json.loads(json.dumps(record))
+            for field in ID_FIELDS:
+                if isinstance(copy.get(field), str):
+                    copy[field] = f"{copy[field]}-{n}"
+            out.append(copy)
+    return out
+
+
+def best_of(repeat: int, fn: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def row(label: str, size: int, old: float, new: float) -> str:
+    mb = size / (1024 * 1024)
+    return (f"  {label:<10} {mb:8.2f} MB   old {old * 1000:9.1f} ms ({mb / old:7.1f} MB/s)"
+            f"   new {new * 1000:9.1f} ms ({mb / new:7.1f} MB/s)   x{old / new:5.1f}")
+
+
+def bench_file(name: str, records: list, repeat: int) -> List[str]:
+    pretty = json.dumps(records, indent=4)
+    compact = dumps(records)
+    lines = [f"{name}: {len(records)} records, "
+             f"indented {len(pretty.encode('utf-8')) / 1024 / 1024:.2f} MB -> "
+             f"compact {len(compact) / 1024 / 1024:.2f} MB"]
+
+    # Loading: stdlib on the old indented snapshot vs the codec on a compact one
+    old = best_of(repeat, lambda: json.loads(pretty))
+    new = best_of(repeat, lambda: loads(compact))
+    lines.append(row("load", len(compact), old, new))
+
+    # Saving: json.dump(indent=4) vs compact codec output
+    old = best_of(repeat, lambda: json.dumps(records, indent=4).encode("utf-8"))
+    new = best_of(repeat, lambda: dumps(records))
+    lines.append(row("save", len(compact), old, new))
+    return lines
+
+
+def bench_response(name: str, objects: list, repeat: int) -> List[str]:
+    # Previous default: jsonable_encoder, then JSONResponse's json.dumps
+    def old_path():
+        return json.dumps(jsonable_encoder(objects), ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+
+    body = fast_json(objects).body
+    old = best_of(repeat, old_path)
+    new = best_of(repeat, lambda: fast_json(objects).body)
+    return [f"{name} response: {len(objects)} objects",
+            row("serialise", len(body), old, new)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"codec: {CODEC}, scale: x{args.scale}, best of {args.repeat}")
+    datasets = {}
+    for name in FILES:
+        path = DATA_DIR / f"{name}.json"
+        if not path.exists():
+            continue
+        datasets[name] = scaled(loads(path.read_bytes()), args.scale)
+        for line in bench_file(name, datasets[name], args.repeat):
+            print(line)
+
+    repo = ClassOfferingRepository()
+    if "class_offerings" in datasets:
+        offerings = [repo._dict_to_class(item) for item in datasets["class_offerings"]]
+        for line in bench_response("class_offerings", offerings, args.repeat):
+            print(line)
+    if "reports" in datasets:
+        reports = [Report(**item) for item in datasets["reports"]]
+        for line in bench_response("reports", reports, args.repeat):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
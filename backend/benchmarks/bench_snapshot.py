@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark for binary snapshots: a fresh process opens the
+offerings, enrollments and reports repositories and serves one lookup from
+each, once from JSON snapshots and once from binary ones
+(repositories/binary_snapshot.py).
+
+The records in backend/data/*.json are repeated SCALE times (1000 by
+default), written to a temporary directory and compacted there.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_snapshot [--scale N] [--runs N]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.bench_codec import DATA_DIR, scaled
+from repositories.json_utils import compact_json, dumps, loads
+
+FILES = ["class_offerings", "enrollments", "reports"]
+
+# Run in a fresh interpreter per measurement: only a cold process counts
+CHILD = """
+import json, resource, sys, time, tracemalloc
+data_dir, copy, trace = sys.argv[1], sys.argv[2], sys.argv[3] == "trace"
+if trace:
+    # Slows allocation down: the timings of traced runs are not used
+    tracemalloc.start()
+
+import repositories.class_offering_repository as offerings
+import repositories.enrollment_repository as enrollments
+import repositories.report_repository as reports
+enrollments.DATA_FILE = f"{data_dir}/enrollments.json"
+reports.DATA_FILE = f"{data_dir}/reports.json"
+imported = time.perf_counter()
+
+offering_repo = offerings.ClassOfferingRepository(f"{data_dir}/class_offerings.json")
+offering = offering_repo.get(f"cls-001-{copy}")
+page, _ = offering_repo.page(statuses=("Approved",), limit=20)
+mine = enrollments.EnrollmentRepository().get_for_student(f"stu-2252001-{copy}")
+evals, _ = reports.ReportRepository().page_student_evaluations(limit=20)
+assert offering is not None and page and mine and evals
+served = time.perf_counter()
+
+# Peak RSS of this process (ru_maxrss also counts the parent's pages from before exec)
+try:
+    with open("/proc/self/status") as status:
+        max_rss = next(int(line.split()[1]) for line in status if line.startswith("VmHWM"))
+except OSError:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({
+    "first_request_ms": (served - imported) * 1000,
+    "heap_peak_mb": tracemalloc.get_traced_memory()[1] / 1024 / 1024 if trace else None,
+    "max_rss_mb": max_rss / 1024,
+}))
+"""
+
+
+def prepare(target: Path, scale: int, binary: bool):
+    target.mkdir()
+    for name in FILES:
+        path = target / f"{name}.json"
+        path.write_bytes(dumps(scaled(loads((DATA_DIR / f"{name}.json").read_bytes()), scale)))
+        compact_json(path, binary=binary)
+
+
+def measure(target: Path, scale: int, runs: int) -> dict:
+    backend = Path(__file__).parent.parent
+
+    def run(mode: str) -> dict:
+        out = subprocess.run([sys.executable, "-c", CHILD, str(target), str(scale // 2), mode],
+                             cwd=backend, env={**os.environ, "PYTHONPATH": str(backend)},
+                             check=True, capture_output=True, text=True).stdout
+        return json.loads(out)
+
+    results = [run("time") for _ in range(runs)]
+    best = {key: min(r[key] for r in results) for key in ("first_request_ms", "max_rss_mb")}
+    best["heap_peak_mb"] = run("trace")["heap_peak_mb"]
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        print(f"scale: x{args.scale}, best of {args.runs} cold processes")
+        for label, binary in (("json", False), ("binary", True)):
+            target = workdir / label
+            prepare(target, args.scale, binary)
+            size = sum(p.stat().st_size for p in target.glob("*.json" + (".bin" if binary else "")))
+            result = measure(target, args.scale, args.runs)
+            print(f"  {label:<7} snapshots {size / 1024 / 1024:7.2f} MB   "
+                  f"first request {result['first_request_ms']:8.1f} ms   "
+                  f"heap peak {result['heap_peak_mb']:7.2f} MB   "
+                  f"max RSS {result['max_rss_mb']:7.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
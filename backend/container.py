@@ -0,0 +1,111 @@
+from fastapi import Request
+
+from repositories.storage import (
+    make_class_offering_repository,
+    make_enrollment_repository,
+    make_report_repository,
+    make_user_repository,
+    make_room_repository,
+    make_sequence_repository,
+)
+from repositories.user_repository import UserRepository
+from services.admin_service import AdminService
+from services.class_offering_service import ClassOfferingService
+from services.coordinator_service import CoordinatorService
+from services.deptchair_service import DepartmentChairService
+from services.enrollment_service import EnrollmentService
+from services.report_service import ReportService
+from services.student_service import StudentService
+from services.tutor_service import TutorService, TutorDashboardService
+
+
+class ServiceContainer:
+    """
+    Builds exactly one instance of every repository and service for the process.
+    All routers share these instances, so in-memory indexes and caches held by
+    repositories/services are built once and seen by every endpoint.
+    """
+
+    def __init__(self):
+        # Repositories
+        self.class_offering_repo = make_class_offering_repository()
+        self.enrollment_repo = make_enrollment_repository()
+        self.report_repo = make_report_repository()
+        self.user_repo = make_user_repository()
+        self.room_repo = make_room_repository()
+        self.sequence_repo = make_sequence_repository()
+
+        # Services
+        self.offering_service = ClassOfferingService(self.class_offering_repo, self.sequence_repo)
+        self.enrollment_service = EnrollmentService(
+            enrollment_repo=self.enrollment_repo,
+            offering_repo=self.class_offering_repo,
+        )
+        self.report_service = ReportService(
+            report_repo=self.report_repo,
+            class_repo=self.class_offering_repo,
+            sequences=self.sequence_repo,
+            offering_service=self.offering_service,
+        )
+        self.student_service = StudentService(
+            offering_service=self.offering_service,
+            enrollment_service=self.enrollment_service,
+            report_service=self.report_service,
+            user_repo=self.user_repo,
+        )
+        self.tutor_service = TutorService(
+            offering_service=self.offering_service,
+            report_service=self.report_service,
+            user_repo=self.user_repo,
+        )
+        self.tutor_dashboard_service = TutorDashboardService(
+            offering_service=self.offering_service,
+            report_service=self.report_service,
+        )
+        self.coordinator_service = CoordinatorService(
+            offering_service=self.offering_service,
+            user_repo=self.user_repo,
+            room_repo=self.room_repo,
+        )
+        self.deptchair_service = DepartmentChairService(
+            class_repo=self.class_offering_repo,
+            report_repo=self.report_repo,
+        )
+        self.admin_service = AdminService(room_repo=self.room_repo)
+
+
+# FastAPI dependencies ------------------------------
+def get_container(request: Request) -> ServiceContainer:
+    return request.app.state.container
+
+
+def get_user_repository(request: Request) -> UserRepository:
+    return get_container(request).user_repo
+
+
+def get_offering_service(request: Request) -> ClassOfferingService:
+    return get_container(request).offering_service
+
+
+def get_student_service(request: Request) -> StudentService:
+    return get_container(request).student_service
+
+
+def get_tutor_service(request: Request) -> TutorService:
+    return get_container(request).tutor_service
+
+
+def get_tutor_dashboard_service(request: Request) -> TutorDashboardService:
+    return get_container(request).tutor_dashboard_service
+
+
+def get_coordinator_service(request: Request) -> CoordinatorService:
+    return get_container(request).coordinator_service
+
+
+def get_deptchair_service(request: Request) -> DepartmentChairService:
+    return get_container(request).deptchair_service
+
+
+def get_admin_service(request: Request) -> AdminService:
+    return get_container(request).admin_service
@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from container import ServiceContainer
+from routers.responses import FastJSONResponse
+
 # Routers
 from routers.auth_router import router as auth_router
 from routers.student_router import router as student_router
@@ -14,9 +17,14 @@ from routers.deptchair_router import router as deptchair_router
 app = FastAPI(
     title="Tutor Support System API",
     description="MVP Backend for Class Offering, Enrollment, Reports, and Role-Based Actions",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson-backed when installed (see repositories/json_utils.py)
+    default_response_class=FastJSONResponse,
 )
 
+# One shared set of repositories/services for every router (see container.py)
+app.state.container = ServiceContainer()
+
 # Enable CORS (Required for React Frontend)
 app.add_middleware(
     CORSMiddleware,
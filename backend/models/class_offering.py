@@ -1,15 +1,45 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Optional, List, Literal, Dict
 
 DeliveryMode = Literal["online", "offline"]
 ClassStatus = Literal["Pending", "Approved", "Rejected"]
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_minutes(iso: str) -> int:
+    """Parse an ISO timestamp ("2025-12-01T09:00") into minutes since the epoch."""
+    dt = datetime.fromisoformat(iso)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return int((dt - _EPOCH).total_seconds() // 60)
+
+
 @dataclass
 class TimeSlot:
+    # start/end stay ISO strings (that is what is stored and returned);
+    # their epoch minutes are parsed once, on first use, and kept alongside.
+    __slots__ = ("start", "end", "_start_minute", "_end_minute")
+
     start: str
     end: str
 
-@dataclass
+    @property
+    def start_minute(self) -> int:
+        minute = getattr(self, "_start_minute", None)
+        if minute is None:
+            minute = self._start_minute = to_minutes(self.start)
+        return minute
+
+    @property
+    def end_minute(self) -> int:
+        minute = getattr(self, "_end_minute", None)
+        if minute is None:
+            minute = self._end_minute = to_minutes(self.end)
+        return minute
+
+@dataclass(slots=True)
 class ClassOffering:
     id: str
     subject: str
@@ -27,10 +57,15 @@ class ClassOffering:
 
     enrolled_students: List[str] = None
 
+    # Bumped on every save (optimistic concurrency). Internal: stored, but
+    # left out of API responses (see repositories/codec.py)
+    version: int = field(default=0, metadata={"internal": True})
 
-@dataclass
+
+@dataclass(slots=True)
 class Enrollment:
     student_id: str
     class_id: str
     tutor_id: str
     enrollment_status: str
+    version: int = field(default=0, metadata={"internal": True})
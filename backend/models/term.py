@@ -0,0 +1,45 @@
+import re
+from datetime import date, datetime
+from typing import Optional, Tuple
+
+# An academic year has three terms, each starting on the first day of one
+# of these months: term 1 = Jan-May, term 2 = Jun-Aug (summer), term 3 = Sep-Dec.
+TERM_START_MONTHS = (1, 6, 9)
+
+_TERM = re.compile(r"^(\d{4})-(\d)$")
+
+
+def term_of(iso: str) -> str:
+    """The term ("2025-3") an ISO date or timestamp ("2025-12-01T09:00") falls in."""
+    day = datetime.fromisoformat(iso)
+    number = sum(1 for month in TERM_START_MONTHS if month <= day.month)
+    return f"{day.year}-{number}"
+
+
+def current_term(today: Optional[date] = None) -> str:
+    return term_of((today or date.today()).isoformat())
+
+
+def parse_term(term: str) -> str:
+    """Validate a term name from a request; raises ValueError if it is not one."""
+    match = _TERM.match(term or "")
+    if not match or not 1 <= int(match.group(2)) <= len(TERM_START_MONTHS):
+        raise ValueError(f"Invalid term: {term!r} (expected e.g. '2025-3')")
+    return term
+
+
+def term_key(term: str) -> tuple:
+    """Sort key putting terms in chronological order."""
+    year, number = term.split("-")
+    return int(year), int(number)
+
+
+def term_bounds(term: str) -> Tuple[str, str]:
+    """First day of the term and first day of the next one, as ISO dates."""
+    year, number = term_key(parse_term(term))
+    start = date(year, TERM_START_MONTHS[number - 1], 1)
+    if number < len(TERM_START_MONTHS):
+        end = date(year, TERM_START_MONTHS[number], 1)
+    else:
+        end = date(year + 1, TERM_START_MONTHS[0], 1)
+    return start.isoformat(), end.isoformat()
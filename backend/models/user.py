@@ -10,7 +10,7 @@ Role = Literal[
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: str
     name: str
@@ -0,0 +1,291 @@
+"""
+Binary snapshots: an optional, memory-mapped twin of a data file's JSON
+snapshot, written next to it as "<name>.json.bin" when the file is compacted.
+
+Layout (little-endian):
+
+    header      magic "TSSB", format version, field count, record count,
+                string count, length of the field names, and the stat
+                signature (mtime_ns, size, inode) of the JSON snapshot it
+                was written with
+    field names JSON array; position = column number
+    records     record count x field count cells of CELL bytes: a type tag
+                and an 8-byte payload (the int, float, or string number)
+    offsets     string count + 1 offsets into the strings section
+    strings     UTF-8 strings; lists and dicts are stored as JSON strings
+
+Every record has the same size, so record i is found without an index and
+is decoded only when it is read. Opening a snapshot only parses the header:
+the records stay in the page cache, shared by every worker process.
+
+The JSON snapshot stays the source of truth. A binary snapshot is used only
+while the JSON file still has the signature recorded in it; any other
+writer (or an edit by hand) makes it stale and it is ignored.
+
+Usage (from the backend directory), to compact every data file and write
+its binary snapshot now:
+    python -m repositories.binary_snapshot
+"""
+import mmap
+import struct
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from repositories.codec import dumps, loads
+
+MAGIC = b"TSSB"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHIII3Q")
+_CELL = struct.Struct("<Bq")
+_FLOAT = struct.Struct("<d")
+_OFFSET = struct.Struct("<Q")
+
+# Cell type tags
+_MISSING, _NULL, _FALSE, _TRUE, _INT, _FLOAT_TAG, _STR, _JSON = range(8)
+
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def encode_snapshot(records: Sequence[dict], source_signature: tuple) -> bytes:
+    """
+    Encode a list of records. Raises ValueError if it cannot be stored in
+    this format (e.g. the records are not all dicts).
+    """
+    fields: Dict[str, int] = {}
+    for record in records:
+        if not isinstance(record, dict):
+            raise ValueError("Binary snapshots hold lists of records only")
+        for name in record:
+            fields.setdefault(name, len(fields))
+
+    strings: Dict[str, int] = {}
+
+    def string_number(value: str) -> int:
+        number = strings.get(value)
+        if number is None:
+            number = strings[value] = len(strings)
+        return number
+
+    cells = bytearray()
+    missing = _CELL.pack(_MISSING, 0)
+    for record in records:
+        row = [missing] * len(fields)
+        for name, value in record.items():
+            if value is None:
+                cell = _CELL.pack(_NULL, 0)
+            elif value is True or value is False:
+                cell = _CELL.pack(_TRUE if value else _FALSE, 0)
+            elif type(value) is int and _INT_MIN <= value <= _INT_MAX:
+                cell = _CELL.pack(_INT, value)
+            elif type(value) is float:
+                cell = _CELL.pack(_FLOAT_TAG, struct.unpack("<q", _FLOAT.pack(value))[0])
+            elif type(value) is str:
+                cell = _CELL.pack(_STR, string_number(value))
+            else:
+                cell = _CELL.pack(_JSON, string_number(dumps(value).decode("utf-8")))
+            row[fields[name]] = cell
+        cells += b"".join(row)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = bytearray()
+    position = 0
+    for raw in encoded:
+        offsets += _OFFSET.pack(position)
+        position += len(raw)
+    offsets += _OFFSET.pack(position)
+
+    names = dumps(list(fields))
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(fields), len(records), len(strings),
+                          len(names), *source_signature)
+    return b"".join([header, names, bytes(cells), bytes(offsets), *encoded])
+
+
+class SnapshotReader:
+    """A memory-mapped binary snapshot. Values are decoded on access."""
+
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+        (magic, version, field_count, self.count, string_count,
+         names_length, *signature) = _HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("Not a binary snapshot")
+        self.source_signature = tuple(signature)
+
+        start = _HEADER.size
+        self.fields: Tuple[str, ...] = tuple(loads(mm[start:start + names_length]))
+        self.columns = {name: col for col, name in enumerate(self.fields)}
+        if len(self.fields) != field_count:
+            raise ValueError("Corrupt binary snapshot")
+
+        self._row_size = field_count * _CELL.size
+        self._records_at = start + names_length
+        self._offsets_at = self._records_at + self.count * self._row_size
+        self._strings_at = self._offsets_at + (string_count + 1) * _OFFSET.size
+        if self._strings_at > len(mm):
+            raise ValueError("Corrupt binary snapshot")
+
+        # Each distinct string is decoded once and shared by every record
+        self._strings: Dict[int, str] = {}
+
+    def _string(self, number: int) -> str:
+        value = self._strings.get(number)
+        if value is None:
+            start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + number * _OFFSET.size)
+            value = self._strings[number] = str(
+                self._mm[self._strings_at + start:self._strings_at + end], "utf-8")
+        return value
+
+    def _decode(self, tag: int, payload: int) -> Any:
+        if tag == _STR:
+            return self._string(payload)
+        if tag == _INT:
+            return payload
+        if tag == _NULL:
+            return None
+        if tag == _JSON:
+            return loads(self._string(payload))
+        if tag == _TRUE or tag == _FALSE:
+            return tag == _TRUE
+        return _FLOAT.unpack(struct.pack("<q", payload))[0]
+
+    def value(self, row: int, name: str, default: Any = None) -> Any:
+        """One field of one record, without decoding the rest of it."""
+        col = self.columns.get(name)
+        if col is None:
+            return default
+        tag, payload = _CELL.unpack_from(self._mm, self._records_at + row * self._row_size + col * _CELL.size)
+        return default if tag == _MISSING else self._decode(tag, payload)
+
+    def column(self, name: str) -> List[Any]:
+        """One field of every record, in row order (None where it is missing)."""
+        col = self.columns.get(name)
+        if col is None:
+            return [None] * self.count
+
+        # One pass over the record table, picking this field's cell out of each row
+        cell = struct.Struct(f"<{col * _CELL.size}xBq{(len(self.fields) - col - 1) * _CELL.size}x")
+        table = self._mm[self._records_at:self._offsets_at]
+        strings, decode = self._strings, self._decode
+        values = []
+        for tag, payload in cell.iter_unpack(table):
+            if tag == _STR:
+                value = strings.get(payload)
+                values.append(value if value is not None else self._string(payload))
+            elif tag == _MISSING:
+                values.append(None)
+            else:
+                values.append(decode(tag, payload))
+        return values
+
+    def record(self, row: int) -> dict:
+        at = self._records_at + row * self._row_size
+        record = {}
+        for name, (tag, payload) in zip(self.fields, _CELL.iter_unpack(self._mm[at:at + self._row_size])):
+            if tag != _MISSING:
+                record[name] = self._decode(tag, payload)
+        return record
+
+
+def open_snapshot(path: str, source_signature: tuple) -> Optional[SnapshotReader]:
+    """
+    Map the binary snapshot at path, or return None if there is none, it is
+    unreadable, or it was not written from the JSON snapshot with
+    source_signature.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+
+    try:
+        reader = SnapshotReader(mm)
+    except (ValueError, struct.error):
+        mm.close()
+        return None
+    if reader.source_signature != tuple(source_signature):
+        mm.close()
+        return None
+    return reader
+
+
+class LazyRecords(MutableSequence):
+    """
+    The records of a data file, backed by a binary snapshot. Each position
+    holds either a record already decoded (or put there by a change) or the
+    row number in the snapshot it has not been decoded from yet.
+
+    Behaves like the list load_json otherwise returns. copy() is cheap: the
+    copy shares the snapshot and every record decoded so far.
+    """
+
+    def __init__(self, reader: SnapshotReader, slots: Optional[list] = None):
+        self._reader = reader
+        self._slots = slots if slots is not None else list(range(reader.count))
+
+    def _get(self, pos: int) -> dict:
+        item = self._slots[pos]
+        if type(item) is int:
+            item = self._slots[pos] = self._reader.record(item)
+        return item
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self._get(i) for i in range(*pos.indices(len(self._slots)))]
+        if pos < 0:
+            pos += len(self._slots)
+        if not 0 <= pos < len(self._slots):
+            raise IndexError("record index out of range")
+        return self._get(pos)
+
+    def __iter__(self) -> Iterator[dict]:
+        for pos in range(len(self._slots)):
+            yield self._get(pos)
+
+    def __setitem__(self, pos: int, record: dict):
+        self._slots[pos] = record
+
+    def __delitem__(self, pos: int):
+        del self._slots[pos]
+
+    def insert(self, pos: int, record: dict):
+        self._slots.insert(pos, record)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, (list, LazyRecords)) and list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"LazyRecords({len(self._slots)} records)"
+
+    def copy(self) -> "LazyRecords":
+        return LazyRecords(self._reader, list(self._slots))
+
+    def column(self, name: str) -> List[Any]:
+        """The value of one field for every record (None where it is missing)."""
+        stored = self._reader.column(name)
+        return [stored[item] if type(item) is int else item.get(name) for item in self._slots]
+
+    def delete_matching(self, match: dict):
+        """Remove every record whose fields equal `match`."""
+        columns = [(self.column(f), v) for f, v in match.items()]
+        self._slots = [
+            item for pos, item in enumerate(self._slots)
+            if any(column[pos] != v for column, v in columns)
+        ]
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    from repositories.json_utils import compact_json
+
+    data_dir = Path(__file__).parent.parent / "data"
+    targets = [Path(p) for p in sys.argv[1:]] or sorted(data_dir.glob("*.json"))
+    for target in targets:
+        compact_json(target, binary=True)
+        print(f"{target.name}: wrote {target.name}.bin")
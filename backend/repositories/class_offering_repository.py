@@ -1,11 +1,47 @@
-from typing import List, Optional
-from repositories.json_utils import load_json, save_json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from repositories.json_utils import (
+    load_json, load_json_versioned, save_json, put_record, put_records, dataset_version, file_lock,
+    intern_fields,
+)
+from repositories.concurrency import ConcurrentModificationError
+from repositories.pagination import DEFAULT_PAGE_SIZE, in_date_range
+from repositories.record_index import RecordIndex
 from models.class_offering import ClassOffering, TimeSlot
+from models.term import parse_term, term_key, term_of
 from pathlib import Path
 
 # Path to json files
 DATA_FILE = Path(__file__).parent.parent / "data" / "class_offerings.json"
 
+# Offerings of finished terms are moved out of DATA_FILE into one read-only
+# file per term, "class_offerings.<term>.json" (see offering_archive.py)
+ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+
+INTERNED_FIELDS = ("subject", "tutor_id", "room", "status", "delivery_mode")
+
+
+def archive_path(term: str, archive_dir=ARCHIVE_DIR) -> Path:
+    return Path(archive_dir) / f"class_offerings.{term}.json"
+
+
+def offering_term(item: dict) -> Optional[str]:
+    """The term of a stored offering, from its timeslot start (None if it has none)."""
+    try:
+        return term_of(item["timeslot"]["start"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _in_term(item: dict, term: Optional[str]) -> bool:
+    return term is None or offering_term(item) == term
+
+
+def _copy(value):
+    """Shallow-copy a list/dict field, keeping None as None."""
+    return value.copy() if value is not None else None
+
 
 class ClassOfferingRepository:
     """
@@ -14,63 +50,332 @@ class ClassOfferingRepository:
     - save (create/update)
     - get by ID
     - list all
-    - list approved / pending / rejected
+    - list by tutor / status / room / subject (served from in-memory indexes)
+    - filtered pages of offerings and progress notes
+
+    Only the current ("hot") file is read by default. Archived terms are
+    read-only partitions, opened when a query names their term or an id
+    is not found in the hot file.
     """
+    INDEXED_FIELDS = ("tutor_id", "status", "room", "subject")
+
+    def __init__(self, path=DATA_FILE, archive_dir=ARCHIVE_DIR, read_only: bool = False):
+        self.path = path
+        self.archive_dir = archive_dir      # None for an archived partition itself
+        self.read_only = read_only
+        intern_fields(path, *INTERNED_FIELDS)
+
+        self._index: Optional[RecordIndex] = None
+        self._index_lock = threading.Lock()
+        self._archives: Dict[str, "ClassOfferingRepository"] = {}
+
     # Internal helpers
     def _load(self) -> List[dict]:
-        return load_json(DATA_FILE)
-
-    def _save(self, data: List[dict]):
-        save_json(DATA_FILE, data)
+        return load_json(self.path)
+
+    def _save(self, data: List[dict]) -> int:
+        self._check_writable()
+        return save_json(self.path, data)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"{Path(self.path).name} is an archived term and read-only.")
+
+    def _get_index(self) -> RecordIndex:
+        """Return the index for the current file content, rebuilding it if the file changed."""
+        data, version = load_json_versioned(self.path)
+        with self._index_lock:
+            if self._index is None or self._index.version != version:
+                self._index = RecordIndex(data, version, "id", self.INDEXED_FIELDS)
+            return self._index
+
+    @staticmethod
+    def _filters(statuses: Sequence[str] = (), subject: Optional[str] = None,
+                 tutor_id: Optional[str] = None) -> dict:
+        filters = {}
+        if statuses:
+            filters["status"] = tuple(statuses)
+        if subject:
+            filters["subject"] = (subject,)
+        if tutor_id:
+            filters["tutor_id"] = (tutor_id,)
+        return filters
+
+    def _list_by(self, field: str, *values, term: Optional[str] = None) -> List[ClassOffering]:
+        partition = self._partition(term)
+        index = partition._get_index()
+        with partition._index_lock:
+            items = index.lookup(field, values)
+        return [self._dict_to_class(x) for x in items if _in_term(x, term)]
+
+    def _partition(self, term: Optional[str]) -> "ClassOfferingRepository":
+        """Where the offerings of term are stored: its archived partition, or this file."""
+        if term is not None:
+            parse_term(term)
+            if term in self.archived_terms():
+                return self._archive(term)
+        return self
 
 
     # Public API
+    def version(self) -> int:
+        """Changes whenever class_offerings.json is written or edited on disk."""
+        return dataset_version(self.path)
+
     def save(self, offering: ClassOffering) -> ClassOffering:
         """
         Create or update a ClassOffering.
-        If an offering with the same ID exists, it is replaced.
+        If an offering with the same ID exists, it is replaced - but only if it
+        is still at offering.version (compare-and-swap). Otherwise someone else
+        saved it since it was read and ConcurrentModificationError is raised.
+        On success offering.version is bumped to the stored version.
+        Offerings of archived terms cannot be saved (ValueError).
         """
-        data = self._load()
-        offering_dict = self._class_to_dict(offering)
-
-        replaced = False
-        for idx, item in enumerate(data):
-            if item["id"] == offering.id:
-                data[idx] = offering_dict
-                replaced = True
-                break
-
-        if not replaced:
-            data.append(offering_dict)
-
-        self._save(data)
+        self._check_writable()
+        with file_lock(self.path):
+            index = self._get_index()
+
+            pos = index.by_id.get(offering.id)
+            if pos is None:
+                self._check_not_archived(offering)
+            else:
+                stored_version = index.data[pos].get("version", 0)
+                if stored_version != offering.version:
+                    raise ConcurrentModificationError(
+                        f"Class offering {offering.id} was modified concurrently "
+                        f"(expected version {offering.version}, found {stored_version})."
+                    )
+
+            offering_dict = self._class_to_dict(offering)
+            offering_dict["version"] = offering.version + 1
+
+            if pos is None:
+                pos = len(index.data)
+
+            # Only this record is written (appended to the file's log)
+            put_record(self.path, offering_dict)
+            data, version = load_json_versioned(self.path)
+            offering.version += 1
+
+            # Keep the index in step with the write instead of rebuilding it
+            with self._index_lock:
+                if self._index is index:
+                    index.put(pos, offering_dict)
+                    index.data = data
+                    index.version = version
         return offering
 
+    def save_many(self, offerings: Sequence[ClassOffering]) -> List[ClassOffering]:
+        """
+        save() for several offerings as one write. Every compare-and-swap is
+        checked first; if any fails, nothing is written.
+        """
+        if not offerings:
+            return []
+        self._check_writable()
+        with file_lock(self.path):
+            index = self._get_index()
+
+            positions, records = [], []
+            for offering in offerings:
+                pos = index.by_id.get(offering.id)
+                if pos is None:
+                    self._check_not_archived(offering)
+                    pos = len(index.data) + len(positions)
+                else:
+                    stored_version = index.data[pos].get("version", 0)
+                    if stored_version != offering.version:
+                        raise ConcurrentModificationError(
+                            f"Class offering {offering.id} was modified concurrently "
+                            f"(expected version {offering.version}, found {stored_version})."
+                        )
+
+                offering_dict = self._class_to_dict(offering)
+                offering_dict["version"] = offering.version + 1
+                positions.append(pos)
+                records.append(offering_dict)
+
+            put_records(self.path, records)
+            data, version = load_json_versioned(self.path)
+            for offering in offerings:
+                offering.version += 1
+
+            with self._index_lock:
+                if self._index is index:
+                    for pos, offering_dict in zip(positions, records):
+                        index.put(pos, offering_dict)
+                    index.data = data
+                    index.version = version
+        return list(offerings)
+
     def get(self, offering_id: str) -> Optional[ClassOffering]:
-        data = self._load()
-        for item in data:
-            if item["id"] == offering_id:
-                return self._dict_to_class(item)
+        index = self._get_index()
+        with self._index_lock:
+            pos = index.by_id.get(offering_id)
+            item = index.data[pos] if pos is not None else None
+        if item is not None:
+            return self._dict_to_class(item)
+
+        # Not current: look through the archived terms, newest first
+        for term in reversed(self.archived_terms()):
+            offering = self._archive(term).get(offering_id)
+            if offering is not None:
+                return offering
         return None
 
-    def list_all(self) -> List[ClassOffering]:
-        return [self._dict_to_class(x) for x in self._load()]
+    def list_all(self, term: Optional[str] = None) -> List[ClassOffering]:
+        """The current offerings, or those of term (archived or not)."""
+        return [self._dict_to_class(x) for x in self._partition(term)._load() if _in_term(x, term)]
+
+
+    # Terms ---------------------------------------
+    def archived_terms(self) -> List[str]:
+        """Terms moved to read-only partitions, oldest first."""
+        if self.archive_dir is None:
+            return []
+        try:
+            names = os.listdir(self.archive_dir)
+        except FileNotFoundError:
+            return []
+        terms = []
+        for name in names:
+            prefix, _, rest = name.partition(".")
+            term, _, suffix = rest.partition(".")
+            if prefix == "class_offerings" and suffix == "json":
+                terms.append(term)
+        return sorted(terms, key=term_key)
+
+    def list_terms(self) -> List[dict]:
+        """Every term with offerings, oldest first, and whether it is archived."""
+        current = {offering_term(item) for item in self._load()} - {None}
+        archived = set(self.archived_terms())
+        return [
+            {"term": term, "archived": term in archived}
+            for term in sorted(current | archived, key=term_key)
+        ]
 
+    def _archive(self, term: str) -> "ClassOfferingRepository":
+        """The read-only partition of an archived term."""
+        with self._index_lock:
+            partition = self._archives.get(term)
+            if partition is None:
+                partition = self._archives[term] = ClassOfferingRepository(
+                    archive_path(term, self.archive_dir), archive_dir=None, read_only=True)
+            return partition
+
+    def archived_term(self, offering: ClassOffering) -> Optional[str]:
+        """The term of offering if that term has been archived (read-only), else None."""
+        try:
+            term = term_of(offering.timeslot.start)
+        except (TypeError, ValueError):
+            return None
+        return term if term in self.archived_terms() else None
+
+    def _check_not_archived(self, offering: ClassOffering):
+        # Checked for ids missing from the hot file: the offering may have
+        # been archived since it was read, or be new but dated in an archived term
+        term = self.archived_term(offering)
+        if term is not None:
+            raise ValueError(f"Class offering {offering.id} belongs to archived term {term} and is read-only.")
 
     # Convenient filters --------------------------
-    def list_approved(self) -> List[ClassOffering]:
-        return [
-            self._dict_to_class(x)
-            for x in self._load()
-            if x.get("status") == "approved"
-        ]
+    # Current offerings, or with a term those of that term
+    def list_by_tutor(self, tutor_id: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._list_by("tutor_id", tutor_id, term=term)
+
+    def list_by_status(self, *statuses: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._list_by("status", *statuses, term=term)
+
+    def list_by_room(self, room: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._list_by("room", room, term=term)
+
+    def list_by_subject(self, subject: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._list_by("subject", subject, term=term)
+
+    def list_approved(self, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.list_by_status("Approved", term=term)
+
+    def list_pending(self, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.list_by_status("Pending", term=term)
+
+    def list_statuses(self, term: Optional[str] = None) -> List[str]:
+        """Every status used by some current offering (or offering of term's file)."""
+        partition = self._partition(term)
+        index = partition._get_index()
+        with partition._index_lock:
+            return sorted(s for s in index.by_field["status"] if s is not None)
+
+    # Pages ---------------------------------------
+    def page(self, statuses: Sequence[str] = (), subject: Optional[str] = None,
+             tutor_id: Optional[str] = None, date_from: Optional[str] = None,
+             date_to: Optional[str] = None, after: Optional[str] = None,
+             limit: int = DEFAULT_PAGE_SIZE,
+             term: Optional[str] = None) -> Tuple[List[ClassOffering], bool]:
+        """
+        Up to `limit` offerings matching the filters, in file order, starting
+        after the offering with id `after`. The date range applies to the
+        timeslot start. Also returns whether more offerings follow.
 
-    def list_pending(self) -> List[ClassOffering]:
-        return [
-            self._dict_to_class(x)
-            for x in self._load()
-            if x.get("status") == "pending"
-        ]
+        Without a term only the current offerings are paged; with one, just
+        that term (from its archived partition if it has been archived).
+        """
+        partition = self._partition(term)
+        if partition is not self:
+            return partition.page(statuses, subject, tutor_id, date_from, date_to, after, limit, term)
+
+        filters = self._filters(statuses, subject, tutor_id)
+
+        def matches(item: dict) -> bool:
+            return _in_term(item, term) and in_date_range(item["timeslot"]["start"], date_from, date_to)
+
+        index = self._get_index()
+        with self._index_lock:
+            items, more = index.page(
+                filters, after, limit,
+                matches if (date_from or date_to or term) else None,
+            )
+        return [self._dict_to_class(x) for x in items], more
+
+    def page_progress_notes(self, subject: Optional[str] = None, tutor_id: Optional[str] = None,
+                            date_from: Optional[str] = None, date_to: Optional[str] = None,
+                            after: Optional[Tuple[str, str]] = None,
+                            limit: int = DEFAULT_PAGE_SIZE,
+                            term: Optional[str] = None) -> Tuple[List[dict], bool]:
+        """
+        Up to `limit` progress notes (as returned by get_progress_notes_all),
+        ordered by class then timestamp, starting after the (class_id,
+        timestamp) pair `after`. Also returns whether more notes follow.
+        Notes of current offerings only, unless a term is given.
+        """
+        partition = self._partition(term)
+        if partition is not self:
+            return partition.page_progress_notes(subject, tutor_id, date_from, date_to, after, limit, term)
+
+        filters = self._filters(subject=subject, tutor_id=tutor_id)
+        result = []
+
+        index = self._get_index()
+        with self._index_lock:
+            start = index.position(after[0]) - 1 if after else -1
+
+            for pos in index.scan(filters, start):
+                cls = index.data[pos]
+                if not _in_term(cls, term):
+                    continue
+                for timestamp in sorted(cls.get("progress_notes") or {}):
+                    if after and cls["id"] == after[0] and timestamp <= after[1]:
+                        continue
+                    if not in_date_range(timestamp, date_from, date_to):
+                        continue
+                    if len(result) == limit:
+                        return result, True
+                    result.append({
+                        "class_id": cls["id"],
+                        "tutor_id": cls["tutor_id"],
+                        "timestamp": timestamp,
+                        "content": cls["progress_notes"][timestamp]
+                    })
+        return result, False
 
     # Enrollment helpers ---------------------------
     def add_student(self, class_id: str, student_id: str):
@@ -95,12 +400,15 @@ class ClassOfferingRepository:
         self.save(offering)
         return offering
 
-    def get_progress_notes_all(self) -> List[dict]:
-        """Return all progress notes across all classes."""
+    def get_progress_notes_all(self, term: Optional[str] = None) -> List[dict]:
+        """Return all progress notes across all current classes (or those of term)."""
         result = []
-        data = self._load()
+        data = self._partition(term)._load()
 
         for cls in data:
+            if not _in_term(cls, term):
+                continue
+
             # This still gets 'None' if the key exists and its value is None
             notes = cls.get("progress_notes", {})
 
@@ -138,9 +446,11 @@ class ClassOfferingRepository:
 
             "status": offering.status,
 
-            "enrolled_students": offering.enrolled_students,
+            "enrolled_students": _copy(offering.enrolled_students),
 
-            "progress_notes": offering.progress_notes,
+            "progress_notes": _copy(offering.progress_notes),
+
+            "version": offering.version,
         }
 
     def _dict_to_class(self, data: dict) -> ClassOffering:
@@ -161,7 +471,10 @@ class ClassOfferingRepository:
 
             status=data["status"],
 
-            enrolled_students=data.get("enrolled_students", []),
+            # Copy mutable fields: the loaded dict is shared with the json cache
+            enrolled_students=_copy(data.get("enrolled_students", [])),
+
+            progress_notes=_copy(data.get("progress_notes", {})),
 
-            progress_notes=data.get("progress_notes", {}),
+            version=data.get("version", 0),
         )
@@ -0,0 +1,64 @@
+"""
+JSON codec for data files, log lines and API responses: orjson when it is
+installed, else the stdlib json module. TSS_JSON_CODEC=json forces the
+stdlib one. Both write compact UTF-8 (no indentation or spaces) and read
+whatever either of them wrote.
+
+Dataclasses are encoded without their fields marked internal
+(field(metadata={"internal": True}), e.g. record versions): data files
+store plain dicts, so a dataclass is only ever encoded for a response.
+"""
+import dataclasses
+import datetime
+import json
+import os
+from collections.abc import Sequence
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib codec is used instead
+    orjson = None
+
+CODEC = "orjson" if orjson is not None and os.getenv("TSS_JSON_CODEC", "orjson") != "json" else "json"
+
+
+def _default(obj: Any) -> Any:
+    # Types neither codec handles natively (orjson does datetimes itself, but
+    # not pydantic models, sets or other sequences), and dataclasses, which
+    # orjson passes through so internal fields are dropped the same way
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)
+                if not f.metadata.get("internal")}
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple, Sequence)) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if CODEC == "orjson":
+    def dumps(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON."""
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+    def loads(data) -> Any:
+        """Decode JSON from bytes or str."""
+        return orjson.loads(data)
+
+    DecodeError = orjson.JSONDecodeError
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_default)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode obj as compact UTF-8 JSON."""
+        return _encoder.encode(obj).encode("utf-8")
+
+    def loads(data) -> Any:
+        """Decode JSON from bytes or str."""
+        return json.loads(data)
+
+    DecodeError = json.JSONDecodeError
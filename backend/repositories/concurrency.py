@@ -0,0 +1,27 @@
+import random
+import time
+from functools import wraps
+
+
+class ConcurrentModificationError(ValueError):
+    """A record changed between being read and being saved (version mismatch)."""
+
+
+def retry_on_conflict(attempts: int = 10):
+    """
+    Re-run a read-modify-save operation when its compare-and-swap write loses
+    the race to another writer. The operation must re-read what it modifies.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return fn(*args, **kwargs)
+                except ConcurrentModificationError:
+                    if attempt == attempts - 1:
+                        raise
+                    # Randomised exponential back-off so the retries do not collide again
+                    time.sleep(random.uniform(0, min(0.25, 0.005 * 2 ** attempt)))
+        return wrapper
+    return decorator
@@ -1,9 +1,15 @@
-from typing import List
-from repositories.json_utils import load_json, save_json
+from typing import Dict, Iterable, List, Sequence, Tuple
+from dataclasses import asdict
+from repositories.json_utils import load_json, save_json, dataset_version, file_lock, put_record, put_records, delete_records, delete_records_many, intern_fields, column
 from models.class_offering import Enrollment
 from pathlib import Path
 
 DATA_FILE = Path(__file__).parent.parent / "data" / "enrollments.json"
+intern_fields(DATA_FILE, "student_id", "class_id", "tutor_id", "enrollment_status")
+
+
+def _matches(item: dict, student_id: str, class_id: str) -> bool:
+    return item.get("student_id") == student_id and item.get("class_id") == class_id
 
 
 class EnrollmentRepository:
@@ -11,25 +17,65 @@ class EnrollmentRepository:
     def _load(self) -> List[dict]:
         return load_json(DATA_FILE)
 
+    def _where(self, field: str, values) -> List[dict]:
+        """Records whose field is in values; only those records are decoded."""
+        data = self._load()
+        return [data[pos] for pos, value in enumerate(column(data, field)) if value in values]
+
     def _save(self, data: List[dict]):
         save_json(DATA_FILE, data)
 
+    def version(self) -> int:
+        return dataset_version(DATA_FILE)
+
     def add(self, enrollment: Enrollment) -> Enrollment:
-        data = self._load()
-        data.append(enrollment.__dict__)
-        self._save(data)
+        with file_lock(DATA_FILE):
+            # Checked under the file lock, so two concurrent joins cannot both land
+            if any(_matches(item, enrollment.student_id, enrollment.class_id)
+                   for item in self._where("student_id", (enrollment.student_id,))):
+                raise ValueError("Student is already enrolled in this class.")
+            enrollment.version = 1
+            put_record(DATA_FILE, asdict(enrollment), key=("student_id", "class_id"))
         return enrollment
 
+    def add_many(self, enrollments: Sequence[Enrollment]) -> List[bool]:
+        """
+        Add every enrollment that is not already recorded, in one write.
+        Returns, per enrollment, whether it was added.
+        """
+        with file_lock(DATA_FILE):
+            data = self._load()
+            taken = set(zip(column(data, "student_id"), column(data, "class_id")))
+            added, records = [], []
+            for enrollment in enrollments:
+                pair = (enrollment.student_id, enrollment.class_id)
+                added.append(pair not in taken)
+                if pair in taken:
+                    continue
+                taken.add(pair)
+                enrollment.version = 1
+                records.append(asdict(enrollment))
+            if records:
+                put_records(DATA_FILE, records, key=("student_id", "class_id"))
+        return added
+
+    def remove(self, student_id: str, class_id: str) -> None:
+        delete_records(DATA_FILE, {"student_id": student_id, "class_id": class_id})
+
+    def remove_many(self, pairs: Sequence[Tuple[str, str]]) -> None:
+        """Remove the (student_id, class_id) enrollments in one write."""
+        if pairs:
+            delete_records_many(DATA_FILE, [{"student_id": s, "class_id": c} for s, c in pairs])
+
     def get_for_student(self, student_id: str) -> List[Enrollment]:
-        return [
-            Enrollment(**item)
-            for item in self._load()
-            if item["student_id"] == student_id
-        ]
+        return [Enrollment(**item) for item in self._where("student_id", (student_id,))]
+
+    def get_for_students(self, student_ids: Iterable[str]) -> Dict[str, List[Enrollment]]:
+        """Enrollments of several students, grouped by student, in one pass."""
+        result: Dict[str, List[Enrollment]] = {sid: [] for sid in student_ids}
+        for item in self._where("student_id", result):
+            result[item["student_id"]].append(Enrollment(**item))
+        return result
 
     def get_for_class(self, class_id: str) -> List[Enrollment]:
-        return [
-            Enrollment(**item)
-            for item in self._load()
-            if item["class_id"] == class_id
-        ]
+        return [Enrollment(**item) for item in self._where("class_id", (class_id,))]
@@ -1,19 +1,750 @@
-import json
 import os
-from typing import Any
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from repositories.codec import CODEC, DecodeError, dumps, loads
+from repositories.binary_snapshot import LazyRecords, encode_snapshot, open_snapshot
+
+# Every data file "<name>.json" is a snapshot plus an append-only log,
+# "<name>.json.log", of the record changes made since the snapshot was
+# written. One JSON object per line:
+#     {"op": "put", "match": {"id": "cls-001"}, "record": {...}}
+#     {"op": "delete", "match": {"student_id": "...", "class_id": "..."}}
+#     {"op": "batch", "ops": [{"op": "put", ...}, ...]}
+# A put replaces the first record whose fields equal `match` (or appends it),
+# a delete removes every matching record, and a batch applies its ops in
+# order - all of them or, if its line was torn, none. Loading a file replays its log over
+# the snapshot; once the log grows past COMPACT_LOG_BYTES it is folded into a
+# fresh snapshot in the background.
+#
+# Replaying is idempotent, so a crash between writing a snapshot and emptying
+# the log loses nothing, and a torn last line (crash mid-append) is skipped.
+#
+# With TSS_BINARY_SNAPSHOTS=1 compaction also writes "<name>.json.bin", a
+# memory-mapped copy of the snapshot whose records are decoded on first
+# access (see binary_snapshot.py). Any process reads it while it matches
+# the JSON snapshot, so a cold start does not parse the whole file.
+COMPACT_LOG_BYTES = int(os.getenv("TSS_LOG_COMPACT_BYTES", str(1024 * 1024)))
+
+# How long a group commit waits for more writes to join the batch (seconds)
+GROUP_COMMIT_WINDOW = float(os.getenv("TSS_GROUP_COMMIT_WINDOW_MS", "2")) / 1000
+
+BINARY_SNAPSHOTS = os.getenv("TSS_BINARY_SNAPSHOTS", "0") == "1"
+
+# Process-wide cache of parsed data files. Entries are revalidated against
+# the snapshot's stat signature and the log's size on every load, so changes
+# made by another process are picked up (new log lines are replayed
+# incrementally).
+MAX_CACHED_FILES = 32
+
+
+class _Entry:
+    """Cached content of one data file: its snapshot with the log replayed on top."""
+
+    def __init__(self, signature: Optional[tuple], log_id: Optional[int], log_offset: int,
+                 version: int, data: list):
+        self.signature = signature      # stat signature of the snapshot that was read
+        self.log_id = log_id            # inode of the log that was read
+        self.log_offset = log_offset    # bytes of that log already replayed
+        self.version = version
+        self.data = data
+        self.positions: Dict[Tuple[str, ...], Dict[tuple, int]] = {}   # match fields -> key -> position
+
+
+_cache: "OrderedDict[str, _Entry]" = OrderedDict()
+_versions: Dict[str, int] = {}
+_dirty: Set[str] = set()          # files whose cached content is not all on disk yet
+_cache_lock = threading.RLock()
+
+# Per file, top-level record fields whose values repeat across records (ids,
+# statuses, ...). They are interned as records are read from disk, so every
+# record shares one string object per distinct value.
+_interned_fields: Dict[str, Tuple[str, ...]] = {}
+
+
+def _key(path) -> str:
+    return os.path.abspath(str(path))
+
+
+def intern_fields(path, *fields: str):
+    """Intern the given fields of every record read from a data file."""
+    _interned_fields[_key(path)] = tuple(fields)
+
+
+def _intern(key: str, records: list):
+    fields = _interned_fields.get(key)
+    if not fields:
+        return
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for field in fields:
+            value = record.get(field)
+            if type(value) is str:
+                record[field] = sys.intern(value)
+
+
+def _intern_ops(key: str, ops: List[dict]):
+    if key not in _interned_fields:
+        return
+    for op in ops:
+        if op.get("op") == "batch":
+            _intern_ops(key, op["ops"])
+        elif op.get("op") == "put":
+            _intern(key, [op["record"]])
+
+
+def _log_path(key: str) -> str:
+    return key + ".log"
+
+
+def _binary_path(key: str) -> str:
+    return key + ".bin"
+
+
+def _signature(st: os.stat_result) -> tuple:
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _snapshot_signature(key: str) -> Optional[tuple]:
+    try:
+        return _signature(os.stat(key))
+    except FileNotFoundError:
+        return None
+
+
+def _log_stat(key: str) -> Tuple[Optional[int], int]:
+    try:
+        st = os.stat(_log_path(key))
+    except FileNotFoundError:
+        return None, 0
+    return st.st_ino, st.st_size
+
+
+def _read_snapshot(key: str) -> Tuple[Optional[tuple], list]:
+    try:
+        f = open(key, "rb")
+    except FileNotFoundError:
+        return None, []
+
+    with f:
+        signature = _signature(os.fstat(f.fileno()))
+        reader = open_snapshot(_binary_path(key), signature)
+        if reader is not None:
+            return signature, LazyRecords(reader)
+        raw = f.read()
+
+    try:
+        data = loads(raw)
+    except (DecodeError, UnicodeDecodeError):
+        return signature, []
+    if isinstance(data, list):
+        _intern(key, data)
+    return signature, data
+
+
+def _read_log(key: str, offset: int = 0) -> Tuple[Optional[int], int, List[dict]]:
+    """Read the complete log lines after offset. Returns (log inode, new offset, ops)."""
+    try:
+        f = open(_log_path(key), "rb")
+    except FileNotFoundError:
+        return None, 0, []
+
+    with f:
+        log_id = os.fstat(f.fileno()).st_ino
+        f.seek(offset)
+        chunk = f.read()
+
+    # A line without its newline is still being written (or was torn by a crash)
+    complete = chunk[:chunk.rfind(b"\n") + 1]
+    ops = []
+    for line in complete.splitlines():
+        try:
+            ops.append(loads(line))
+        except ValueError:
+            continue
+    _intern_ops(key, ops)
+    return log_id, offset + len(complete), ops
+
+
+def _fields_key(item: dict, fields: Tuple[str, ...]) -> tuple:
+    return tuple(item.get(f) for f in fields)
+
+
+def _private(data):
+    """A copy of the record list that can be changed without affecting readers."""
+    return data.copy() if isinstance(data, LazyRecords) else list(data)
+
+
+def _position(entry: _Entry, match: dict) -> Optional[int]:
+    fields = tuple(sorted(match))
+    positions = entry.positions.get(fields)
+    if positions is None:
+        positions = {}
+        if isinstance(entry.data, LazyRecords):
+            # Read just the match fields, not whole records
+            keys = zip(*(entry.data.column(f) for f in fields))
+        else:
+            keys = (_fields_key(item, fields) for item in entry.data)
+        for pos, key in enumerate(keys):
+            positions.setdefault(key, pos)
+        entry.positions[fields] = positions
+    return positions.get(tuple(match[f] for f in fields))
+
+
+def _apply(entry: _Entry, op: dict):
+    """Apply one log record to entry.data (which must be a private list)."""
+    if op["op"] == "batch":
+        for sub in op["ops"]:
+            _apply(entry, sub)
+        return
+
+    match = op["match"]
+
+    if op["op"] == "delete":
+        if isinstance(entry.data, LazyRecords):
+            entry.data.delete_matching(match)
+        else:
+            entry.data[:] = [
+                item for item in entry.data
+                if any(item.get(f) != v for f, v in match.items())
+            ]
+        entry.positions.clear()
+        return
+
+    record = op["record"]
+    pos = _position(entry, match)
+    if pos is None:
+        pos = len(entry.data)
+        entry.data.append(record)
+        for fields, positions in entry.positions.items():
+            positions.setdefault(_fields_key(record, fields), pos)
+        return
+
+    old = entry.data[pos]
+    entry.data[pos] = record
+    for fields in list(entry.positions):
+        if _fields_key(old, fields) != _fields_key(record, fields):
+            del entry.positions[fields]
+
+
+def _next_version(key: str) -> int:
+    version = _versions.get(key, 0) + 1
+    _versions[key] = version
+    return version
+
+
+def _store(key: str, entry: _Entry):
+    _cache[key] = entry
+    _cache.move_to_end(key)
+
+    # Evict least recently used files, but never data that is still waiting to be written
+    for old in list(_cache):
+        if len(_cache) <= MAX_CACHED_FILES:
+            break
+        if old not in _dirty:
+            del _cache[old]
+
+
+def _current(key: str) -> _Entry:
+    """Return the up-to-date cache entry for a file (caller holds _cache_lock)."""
+    entry = _cache.get(key)
+    if entry is not None:
+        if key in _dirty:
+            _cache.move_to_end(key)
+            return entry
+
+        log_id, log_size = _log_stat(key)
+        if entry.signature == _snapshot_signature(key) and entry.log_id == log_id:
+            if log_size == entry.log_offset:
+                _cache.move_to_end(key)
+                return entry
+            if log_size > entry.log_offset:
+                # Another process appended to the log: replay just the new lines
+                log_id, offset, ops = _read_log(key, entry.log_offset)
+                if log_id == entry.log_id:
+                    entry.data = _private(entry.data)
+                    for op in ops:
+                        _apply(entry, op)
+                    entry.log_offset = offset
+                    entry.version = _next_version(key)
+                    _cache.move_to_end(key)
+                    return entry
+
+    # Read the log before the snapshot: compaction writes the new snapshot
+    # before emptying the log, so we never pair an old snapshot with a
+    # log that has already been folded into a new one.
+    log_id, offset, ops = _read_log(key)
+    signature, data = _read_snapshot(key)
+    entry = _Entry(signature, log_id, offset, _next_version(key), _private(data))
+    for op in ops:
+        _apply(entry, op)
+
+    _store(key, entry)
+    if offset > COMPACT_LOG_BYTES:
+        _schedule_compaction(key)
+    return entry
+
 
 def load_json(path: str) -> Any:
-    if not os.path.exists(path):
-        return []
+    """
+    Return the parsed content of a data file, served from the in-process cache
+    while the file on disk is unchanged.
+
+    The returned object is shared between callers and must be treated as
+    read-only: copy it (or the records you change) before mutating.
+    """
+    return load_json_versioned(path)[0]
+
+
+def load_json_versioned(path: str) -> Tuple[Any, int]:
+    """Like load_json, but also return the dataset version of the content."""
+    with _cache_lock:
+        entry = _current(_key(path))
+        return entry.data, entry.version
+
+
+def column(data: Sequence[dict], field: str) -> List[Any]:
+    """
+    One field of every record loaded by load_json (None where missing).
+    On a binary snapshot this reads the field without decoding the records.
+    """
+    if isinstance(data, LazyRecords):
+        return data.column(field)
+    return [item.get(field) for item in data]
+
+
+def _log(key: str, op: dict) -> int:
+    """Apply op to the cached content and queue it for the log. Caller holds file_lock."""
+    line = dumps(op) + b"\n"
+
+    with _cache_lock:
+        entry = _current(key)
+        entry.data = _private(entry.data)     # readers may still hold the old list
+        _apply(entry, op)
+        entry.version = version = _next_version(key)
+        _dirty.add(key)
+
+    writer = _writer(key)
+    with writer.cond:
+        writer.pending_lines.append(line)
+        writer.pending_version = version
 
-    with open(path, "r") as f:
+    pending = _held.pending
+    pending[key] = max(pending.get(key, 0), version)
+    return version
+
+
+def put_record(path: str, record: dict, key: Sequence[str] = ("id",)) -> int:
+    """
+    Insert or replace one record of a data file and return the new dataset
+    version. The record replaces the one with the same values for the `key`
+    fields, or is appended if there is none.
+
+    Only the change is appended to the file's log; it is visible to load_json
+    at once and the call returns when it is durable (or, inside file_lock, on
+    leaving the outermost file_lock). The record must not be mutated afterwards.
+    """
+    op = {"op": "put", "match": {f: record.get(f) for f in key}, "record": record}
+    with file_lock(path):
+        return _log(_key(path), op)
+
+
+def put_records(path: str, records: Sequence[dict], key: Sequence[str] = ("id",)) -> int:
+    """
+    put_record for many records as one change: a single log line and a
+    single version bump, applied completely or (after a crash) not at all.
+    """
+    op = {
+        "op": "batch",
+        "ops": [{"op": "put", "match": {f: r.get(f) for f in key}, "record": r} for r in records],
+    }
+    with file_lock(path):
+        return _log(_key(path), op)
+
+
+def delete_records(path: str, match: dict) -> int:
+    """Remove every record whose fields equal `match`; same durability as put_record."""
+    op = {"op": "delete", "match": dict(match)}
+    with file_lock(path):
+        return _log(_key(path), op)
+
+
+def delete_records_many(path: str, matches: Sequence[dict]) -> int:
+    """delete_records for several matches as one change, like put_records."""
+    op = {"op": "batch", "ops": [{"op": "delete", "match": dict(m)} for m in matches]}
+    with file_lock(path):
+        return _log(_key(path), op)
+
+
+def save_json(path: str, data: Any) -> int:
+    """
+    Replace the whole content of a data file and return its new dataset
+    version. Writes a fresh snapshot and empties the log before returning.
+    """
+    key = _key(path)
+    with file_lock(key):
+        return _rewrite(key, data)
+
+
+# File locking and group commit -----------------
+# One lock per data file, held for a whole read-modify-write. It combines a
+# thread lock (FastAPI runs sync endpoints on a thread pool) with an OS lock
+# on "<file>.lock" so several worker processes can share the data files.
+#
+# Log lines are not written by the thread that made the change. Leaving the
+# outermost file_lock waits until the change is durable; the first waiter
+# becomes the leader and appends every line queued so far with one write and
+# one fsync. The OS lock is kept until everything this process logged is on
+# disk, so other processes never read or append to a log with a gap in it.
+class _FileWriter:
+    """Lock and group-commit state for one data file."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.lock = threading.RLock()          # serialises read-modify-write in this process
+        self.owner: Optional[int] = None       # thread currently inside file_lock
+        self.cond = threading.Condition()      # guards the commit state below
+        self.lock_file = None                  # open "<file>.lock" while we hold the OS lock
+        self.pending_lines: List[bytes] = []   # log lines not written yet
+        self.pending_version = 0               # newest version handed to the log
+        self.durable_version = 0               # newest version known to be on disk
+        self.failed_after = 0                  # versions in (failed_after, failed_version]
+        self.failed_version = 0                # were lost by the last failed commit
+        self.error: Optional[BaseException] = None
+        self.committing = False
+        self.compacting = False
+
+    def settled(self) -> bool:
+        return self.pending_version <= max(self.durable_version, self.failed_version)
+
+    def acquire_os_lock(self):
+        if self.lock_file is None:
+            f = open(self.key + ".lock", "a+")
+            _os_lock(f)
+            self.lock_file = f
+
+    def release_os_lock(self):
+        if self.lock_file is not None:
+            _os_unlock(self.lock_file)
+            self.lock_file.close()
+            self.lock_file = None
+
+    def flush(self):
+        """Write everything queued so far. Called inside file_lock; keeps the OS lock."""
+        with self.cond:
+            version = self.pending_version
+        self.wait_durable(version)
+
+    def wait_durable(self, version: int):
+        """Block until `version` is on disk, committing a batch ourselves if nobody else is."""
+        while True:
+            with self.cond:
+                if self.failed_after < version <= self.failed_version:
+                    raise OSError(f"Could not write {self.key}") from self.error
+                if self.durable_version >= version:
+                    return
+                if self.committing:
+                    self.cond.wait()
+                    continue
+                self.committing = True
+
+            try:
+                self._commit()
+            finally:
+                with self.cond:
+                    self.committing = False
+                    self.cond.notify_all()
+
+            # Hand the file back to other processes once nothing is left to write
+            with self.lock:
+                with self.cond:
+                    idle = self.settled()
+                if idle and self.owner is None:
+                    self.release_os_lock()
+
+    def _commit(self):
+        # Let concurrent writers join this batch
+        if GROUP_COMMIT_WINDOW > 0:
+            time.sleep(GROUP_COMMIT_WINDOW)
+
+        with self.cond:
+            lines, self.pending_lines = self.pending_lines, []
+            version = self.pending_version
+
+        try:
+            log_size = _append_log(self.key, lines)
+        except BaseException as e:
+            with self.cond:
+                self.error = e
+                # Later changes in the batch built on the lost ones, so they fail too
+                self.failed_after = self.durable_version
+                self.failed_version = self.pending_version
+                self.pending_lines = []
+            # What is on disk is the truth again
+            with _cache_lock:
+                _dirty.discard(self.key)
+                _cache.pop(self.key, None)
+            return
+
+        with self.cond:
+            self.durable_version = max(self.durable_version, version)
+        with _cache_lock:
+            entry = _cache.get(self.key)
+            if entry is not None and entry.version == version:
+                entry.signature = _snapshot_signature(self.key)
+                entry.log_id, entry.log_offset = _log_stat(self.key)
+                _dirty.discard(self.key)
+
+        if log_size > COMPACT_LOG_BYTES:
+            _schedule_compaction(self.key)
+
+
+_writers: Dict[str, _FileWriter] = {}
+_writers_guard = threading.Lock()
+_held = threading.local()
+
+
+def _writer(key: str) -> _FileWriter:
+    with _writers_guard:
+        if key not in _writers:
+            _writers[key] = _FileWriter(key)
+        return _writers[key]
+
+
+def _os_lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _os_unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _fsync_dir(path: str):
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(path), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _append_log(key: str, lines: List[bytes]) -> int:
+    """Append lines to the log and fsync it. Returns the new log size."""
+    path = _log_path(key)
+    created = not os.path.exists(path)
+
+    with open(path, "a+b") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                # Terminate a line torn by a crash so it is skipped on replay
+                lines = [b"\n"] + lines
+        f.write(b"".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+
+    if created:
+        _fsync_dir(path)
+    return size
+
+
+def _write_atomic(path: str, payload: bytes):
+    # Write a sibling file, flush it to disk and swap it in, so readers never
+    # see a half-written file and a crash leaves either the old or new version
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    # Make the rename itself durable
+    _fsync_dir(path)
+
+
+def _write_binary(key: str, records: Any):
+    """
+    Write the binary twin of the snapshot just written to key, or with
+    records=None (or records it cannot hold) remove it.
+    """
+    payload = None
+    if records is not None:
         try:
-            return json.load(f)
+            payload = encode_snapshot(records, _snapshot_signature(key))
+        except ValueError:
+            pass
+
+    try:
+        if payload is None:
+            os.remove(_binary_path(key))
+        else:
+            _write_atomic(_binary_path(key), payload)
+    except OSError:
+        # No binary snapshot (or one that is mapped elsewhere on Windows):
+        # a stale one no longer matches the JSON snapshot and is ignored
+        pass
+
+
+def _rewrite(key: str, data: Any = None, binary: Optional[bool] = None) -> int:
+    """
+    Write a new snapshot and empty the log. With data=None the current
+    content is compacted; otherwise data replaces it. binary overrides
+    BINARY_SNAPSHOTS for this write. Caller holds file_lock.
+    """
+    if binary is None:
+        binary = BINARY_SNAPSHOTS
+
+    writer = _writer(key)
+    writer.flush()
+
+    with _cache_lock:
+        entry = _current(key)
+        if data is not None:
+            entry = _Entry(None, None, 0, _next_version(key), data)
+            _store(key, entry)
+            # On disk only once the snapshot below is written
+            _dirty.add(key)
+
+    try:
+        records = list(entry.data) if isinstance(entry.data, LazyRecords) else entry.data
+        _write_atomic(key, dumps(records))
+        if binary:
+            _write_binary(key, records)
+        elif os.path.exists(_binary_path(key)):
+            _write_binary(key, None)
+        # The snapshot now holds everything in the log
+        if os.path.exists(_log_path(key)):
+            with open(_log_path(key), "r+b") as f:
+                f.truncate(0)
+                os.fsync(f.fileno())
+    except BaseException:
+        with _cache_lock:
+            _dirty.discard(key)
+            _cache.pop(key, None)
+        raise
+
+    with _cache_lock:
+        entry.signature = _snapshot_signature(key)
+        entry.log_id, entry.log_offset = _log_stat(key)
+        _dirty.discard(key)
+    return entry.version
+
+
+def _schedule_compaction(key: str):
+    writer = _writer(key)
+    with writer.cond:
+        if writer.compacting:
+            return
+        writer.compacting = True
+
+    def compact():
+        try:
+            with file_lock(key):
+                _rewrite(key)
+        finally:
+            with writer.cond:
+                writer.compacting = False
+
+    threading.Thread(target=compact, name=f"compact {os.path.basename(key)}", daemon=True).start()
+
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Exclusive, re-entrant lock on a data file across threads and processes.
+    Leaving the outermost file_lock waits until everything logged inside it
+    has been committed to disk.
+    """
+    key = _key(path)
+    held = getattr(_held, "keys", None)
+    if held is None:
+        held = _held.keys = set()
+        _held.pending = {}
+
+    if key in held:
+        # Already ours further up the stack
+        yield
+        return
+
+    writer = _writer(key)
+    with writer.lock:
+        writer.acquire_os_lock()
+        writer.owner = threading.get_ident()
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            writer.owner = None
+            with writer.cond:
+                idle = writer.settled()
+            if idle:
+                # Nothing logged (or a failed mutation): give the OS lock back now
+                writer.release_os_lock()
+
+    version = _held.pending.pop(key, None)
+    if version is not None:
+        writer.wait_durable(version)
+
+
+def compact_json(path: str, binary: Optional[bool] = None) -> int:
+    """
+    Fold a data file's log into a fresh snapshot now (and, if binary or
+    TSS_BINARY_SNAPSHOTS says so, its binary snapshot). Returns the version.
+    """
+    key = _key(path)
+    with file_lock(key):
+        return _rewrite(key, binary=binary)
+
+
+def update_json(path: str, mutate: Callable[[list], Any]) -> Any:
+    """
+    Read-modify-write a whole data file under its lock.
+    mutate receives a private copy of the record list; it may append, remove
+    or replace records (but must not edit the loaded record dicts in place).
+    If it raises, nothing is written. Rewrites the snapshot, so prefer
+    put_record / delete_records for single-record changes.
+    """
+    with file_lock(path):
+        data = list(load_json(path))
+        result = mutate(data)
+        save_json(path, data)
+    return result
+
 
-        except json.JSONDecodeError:
-            return []
+def dataset_version(path: str) -> int:
+    """
+    Monotonic version of a data file within this process. It is bumped by
+    every change made here and whenever a change on disk is detected by load_json.
+    """
+    return load_json_versioned(path)[1]
 
 
-def save_json(path: str, data: Any) -> None:
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
+def invalidate_cache(path: Optional[str] = None) -> None:
+    """Drop one cached file (or all of them) so the next load re-reads disk."""
+    with _cache_lock:
+        keys = list(_cache) if path is None else [_key(path)]
+        for key in keys:
+            if key not in _dirty:
+                _cache.pop(key, None)
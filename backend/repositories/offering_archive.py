@@ -0,0 +1,92 @@
+"""
+Archives finished terms: moves their offerings out of class_offerings.json
+into read-only partitions, one file per term
+(data/archive/class_offerings.<term>.json), so everyday requests only load
+the current offerings. ClassOfferingRepository still finds archived
+offerings by id, and pages them when a query names their term.
+
+A term is finished once the current term has started; --before picks
+another cut-off. Archiving a term again (offerings added to it late) merges
+them into its partition.
+
+Usage (from the backend directory):
+    python -m repositories.offering_archive [--before TERM] [--dry-run]
+"""
+import argparse
+import os
+import stat
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models.term import current_term, parse_term, term_key
+from repositories.json_utils import file_lock, load_json, save_json
+from repositories.class_offering_repository import (
+    ARCHIVE_DIR,
+    DATA_FILE,
+    archive_path,
+    offering_term,
+)
+from repositories.storage import STORAGE_BACKEND
+
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+def _set_read_only(path: Path, read_only: bool):
+    os.chmod(path, _READ_ONLY if read_only else _READ_ONLY | stat.S_IWUSR)
+
+
+def archive_terms(before: Optional[str] = None, path=DATA_FILE, archive_dir=ARCHIVE_DIR,
+                  dry_run: bool = False) -> Dict[str, int]:
+    """
+    Move every offering whose term is earlier than `before` (default: the
+    current term) to its term's archived partition.
+    Returns the number of offerings moved (or, with dry_run, to move) per term.
+    """
+    cutoff = term_key(parse_term(before) if before else current_term())
+
+    with file_lock(path):
+        moving: Dict[str, List[dict]] = {}
+        keep = []
+        for item in load_json(path):
+            term = offering_term(item)
+            if term is not None and term_key(term) < cutoff:
+                moving.setdefault(term, []).append(item)
+            else:
+                keep.append(item)
+
+        counts = {term: len(moving[term]) for term in sorted(moving, key=term_key)}
+        if dry_run or not moving:
+            return counts
+
+        # Partitions first: a crash before the current file is rewritten
+        # leaves the offerings in both, and archiving again is harmless
+        Path(archive_dir).mkdir(parents=True, exist_ok=True)
+        for term in counts:
+            target = archive_path(term, archive_dir)
+            with file_lock(target):
+                records = {}
+                if target.exists():
+                    records = {item["id"]: item for item in load_json(target)}
+                    _set_read_only(target, False)
+                for item in moving[term]:
+                    records[item["id"]] = item
+                save_json(target, list(records.values()))
+                _set_read_only(target, True)
+
+        save_json(path, keep)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move finished terms to read-only archive partitions.")
+    parser.add_argument("--before", help="archive terms earlier than this one (default: the current term)")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be moved")
+    args = parser.parse_args()
+    if STORAGE_BACKEND != "json":
+        parser.error("archiving applies to the JSON storage backend only")
+
+    counts = archive_terms(args.before, dry_run=args.dry_run)
+    for term, count in counts.items():
+        print(f"{term}: {count} offering(s){'' if args.dry_run else ' archived'}")
+    if not counts:
+        print("Nothing to archive")
@@ -0,0 +1,56 @@
+"""
+Cursor pagination shared by the list endpoints.
+
+A page carries an opaque `next_cursor`; passing it back returns the records
+that follow, even if other records were added in between. The cursor encodes
+the sort key of the last record on the page (e.g. an offering id), so
+repositories can resume with an index lookup instead of counting an offset.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Generic, List, Optional, TypeVar
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(key: Any) -> str:
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], expected: type = str) -> Any:
+    """Return the key stored in a cursor (None for the first page)."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, expected):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def in_date_range(value: Optional[str], date_from: Optional[str], date_to: Optional[str]) -> bool:
+    """
+    Whether an ISO date/time string lies in [date_from, date_to]. Both bounds
+    are inclusive and may be dates ("2025-12-01") or full timestamps.
+    """
+    if value is None:
+        return date_from is None and date_to is None
+    if date_from and value < date_from:
+        return False
+    if date_to and value[:len(date_to)] > date_to:
+        return False
+    return True
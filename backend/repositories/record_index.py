@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class RecordIndex:
+    """
+    Hash indexes over one version of a data file.
+    Records are referenced by their position in the data list, and every
+    bucket keeps its positions sorted, so lookups (and pages) come back in
+    file order and can resume right after a given position.
+    """
+
+    def __init__(self, data: List[dict], version: int, id_field: str, fields: Sequence[str]):
+        self.data = data
+        self.version = version
+        self.id_field = id_field
+        self.fields = tuple(fields)
+        self.by_id: Dict[str, int] = {}
+        self.by_field: Dict[str, Dict[str, List[int]]] = {f: {} for f in self.fields}
+
+        column = getattr(data, "column", None)
+        if column is not None:
+            # Lazily decoded records (binary snapshot): read just the indexed fields
+            for pos, (record_id, *values) in enumerate(zip(column(id_field), *map(column, self.fields))):
+                self._add_values(pos, record_id, values)
+        else:
+            for pos, item in enumerate(data):
+                self._add(pos, item)
+
+    def _add(self, pos: int, item: dict):
+        self._add_values(pos, item[self.id_field], [item.get(field) for field in self.fields])
+
+    def _add_values(self, pos: int, record_id, values: Sequence):
+        self.by_id[record_id] = pos
+        for field, value in zip(self.fields, values):
+            insort(self.by_field[field].setdefault(value, []), pos)
+
+    def _remove(self, pos: int, item: dict):
+        for field in self.fields:
+            bucket = self.by_field[field].get(item.get(field))
+            if bucket is None:
+                continue
+            i = bisect_left(bucket, pos)
+            if i < len(bucket) and bucket[i] == pos:
+                del bucket[i]
+            if not bucket:
+                del self.by_field[field][item.get(field)]
+
+    def put(self, pos: int, item: dict):
+        """Record that data[pos] is now item (replacing the old record, if any)."""
+        if pos < len(self.data):
+            self._remove(pos, self.data[pos])
+        self._add(pos, item)
+
+    def positions(self, field: str, values: Iterable, after: int = -1) -> Iterator[int]:
+        """Positions of records whose field is one of values, ascending, after `after`."""
+        buckets = [self.by_field[field].get(value, []) for value in set(values)]
+        return merge(*(b[bisect_right(b, after):] for b in buckets))
+
+    def lookup(self, field: str, values) -> List[dict]:
+        return [self.data[pos] for pos in self.positions(field, values)]
+
+    def position(self, record_id: str) -> int:
+        """Position of a record named in a cursor."""
+        if record_id not in self.by_id:
+            raise ValueError("Invalid cursor")
+        return self.by_id[record_id]
+
+    def scan(self, filters: Dict[str, Tuple], start: int = -1) -> Iterator[int]:
+        """
+        Positions after `start` of the records matching every filter
+        (field -> allowed values), in file order.
+
+        Iterates the smallest filter bucket and checks the other filters on
+        the records it yields, so the cost follows what is consumed, not the file.
+        """
+        if filters:
+            driver = min(
+                filters,
+                key=lambda f: sum(len(self.by_field[f].get(v, ())) for v in filters[f]),
+            )
+            candidates = self.positions(driver, filters[driver], start)
+        else:
+            candidates = iter(range(start + 1, len(self.data)))
+
+        for pos in candidates:
+            item = self.data[pos]
+            if all(item.get(f) in values for f, values in filters.items()):
+                yield pos
+
+    def page(self, filters: Dict[str, Tuple], after: Optional[str], limit: int,
+             predicate: Optional[Callable[[dict], bool]] = None) -> Tuple[List[dict], bool]:
+        """
+        Up to `limit` records matching the filters and the predicate, starting
+        after the record whose id is `after`. Also returns whether more follow.
+        """
+        start = self.position(after) if after is not None else -1
+
+        items = []
+        for pos in self.scan(filters, start):
+            item = self.data[pos]
+            if predicate is not None and not predicate(item):
+                continue
+            if len(items) == limit:
+                return items, True
+            items.append(item)
+        return items, False
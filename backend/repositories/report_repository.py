@@ -1,34 +1,52 @@
+import threading
 import uuid
-from typing import List
+from typing import List, Optional, Tuple
 from models.report import Report
-from repositories.json_utils import load_json, save_json
+from repositories.json_utils import load_json, load_json_versioned, save_json, file_lock, put_record, dataset_version, intern_fields
+from repositories.pagination import DEFAULT_PAGE_SIZE, in_date_range
+from repositories.record_index import RecordIndex
 from pathlib import Path
 
 DATA_FILE = Path(__file__).parent.parent / "data" / "reports.json"
+intern_fields(DATA_FILE, "class_id", "tutor_id", "student_id", "type")
 
 class ReportRepository:
+    INDEXED_FIELDS = ("type", "tutor_id", "class_id")
+
+    def __init__(self):
+        self._index: Optional[RecordIndex] = None
+        self._index_lock = threading.Lock()
 
     def _load(self) -> List[dict]:
         return load_json(DATA_FILE)
 
+    def version(self) -> int:
+        return dataset_version(DATA_FILE)
+
+    def _get_index(self) -> RecordIndex:
+        data, version = load_json_versioned(DATA_FILE)
+        with self._index_lock:
+            if self._index is None or self._index.version != version:
+                self._index = RecordIndex(data, version, "report_id", self.INDEXED_FIELDS)
+            return self._index
+
     def _save(self, data: List[dict]):
         save_json(DATA_FILE, data)
 
     def create(self, report: Report) -> Report:
-        data = self._load()
         item = report.model_dump()
-        item["report_id"] = str(uuid.uuid4())
-        data.append(item)
-        self._save(data)
+        # Callers may allocate the id (from a sequence); otherwise it is random
+        item["report_id"] = item["report_id"] or str(uuid.uuid4())
+        put_record(DATA_FILE, item, key=("report_id",))
         return Report(**item)
 
     def update(self, report_id: str, content: str) -> Report:
-        data = self._load()
-        for item in data:
-            if item["report_id"] == report_id:
-                item["content"] = content
-                self._save(data)
-                return Report(**item)
+        with file_lock(DATA_FILE):
+            for item in self._load():
+                if item["report_id"] == report_id:
+                    updated = {**item, "content": content}
+                    put_record(DATA_FILE, updated, key=("report_id",))
+                    return Report(**updated)
         raise ValueError("Report not found")
 
     def get_by_student(self, student_id: str) -> List[Report]:
@@ -52,3 +70,28 @@ class ReportRepository:
             for item in data
             if item["type"] == "student_evaluation"
         ]
+
+    def page_student_evaluations(self, tutor_id: Optional[str] = None, class_id: Optional[str] = None,
+                                 date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                 after: Optional[str] = None,
+                                 limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Report], bool]:
+        """
+        Up to `limit` student evaluations in file order, starting after the
+        report with id `after`. Also returns whether more follow.
+        """
+        filters = {"type": ("student_evaluation",)}
+        if tutor_id:
+            filters["tutor_id"] = (tutor_id,)
+        if class_id:
+            filters["class_id"] = (class_id,)
+
+        def dated_in_range(item: dict) -> bool:
+            return in_date_range(item.get("date"), date_from, date_to)
+
+        index = self._get_index()
+        with self._index_lock:
+            items, more = index.page(
+                filters, after, limit,
+                dated_in_range if (date_from or date_to) else None,
+            )
+        return [Report(**item) for item in items], more
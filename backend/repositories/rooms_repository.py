@@ -1,27 +1,25 @@
-import json
 from typing import List, Optional
 from pathlib import Path
+from repositories.json_utils import load_json, file_lock, put_record, dataset_version
 
 DATA_FILE = Path(__file__).parent.parent / "data" / "rooms.json"
 
 class RoomRepository:
-    def __init__(self, path="data/rooms.json"):
+    def __init__(self, path=DATA_FILE):
         self.path = path
-        self.rooms = self._load()
+
+    @property
+    def rooms(self) -> List[dict]:
+        return self._load()
 
     def _load(self) -> List[dict]:
-        try:
-            with open(self.path, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
+        return load_json(self.path)
 
-    def _save(self):
-        with open(self.path, "w") as f:
-            json.dump(self.rooms, f, indent=4)
+    def version(self) -> int:
+        return dataset_version(self.path)
 
     def list_rooms(self) -> List[dict]:
-        return self.rooms
+        return list(self.rooms)
 
     def exists(self, room_id: str) -> bool:
         return any(r["room_id"] == room_id for r in self.rooms)
@@ -33,23 +31,21 @@ class RoomRepository:
         return None
 
     def add_room(self, room_id: str, capacity: int):
-        if self.exists(room_id):
-            raise ValueError("Room ID already exists")
-
         new_room = {
             "room_id": room_id,
             "capacity": capacity
         }
 
-        self.rooms.append(new_room)
-        self._save()
+        with file_lock(self.path):
+            if self.exists(room_id):
+                raise ValueError("Room ID already exists")
+            put_record(self.path, new_room, key=("room_id",))
         return new_room
 
     def update_room(self, room_id: str, capacity: Optional[int] = None):
-        for room in self.rooms:
-            if room["room_id"] == room_id:
-                if capacity is not None:
-                    room["capacity"] = capacity
-                self._save()
-                return room
-        return None
\ No newline at end of file
+        with file_lock(self.path):
+            room = self.get_room(room_id)
+            if room is not None and capacity is not None:
+                room = {**room, "capacity": capacity}
+                put_record(self.path, room, key=("room_id",))
+        return room
@@ -0,0 +1,45 @@
+from pathlib import Path
+from typing import Callable, Optional
+from repositories.json_utils import load_json, file_lock, put_record
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "sequences.json"
+
+
+class SequenceRepository:
+    """
+    Persistent counters that hand out ids, one sequence per entity type
+    ("class_offering", "report", ...). Each sequence stores the last number
+    handed out, so allocating is O(1) whatever the size of the catalogue.
+
+    Allocation happens under the file lock (threads and worker processes),
+    so two callers never get the same number, and the stored value survives
+    restarts.
+    """
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+
+    def _last(self, name: str) -> Optional[int]:
+        for item in load_json(self.path):
+            if item["name"] == name:
+                return item["value"]
+        return None
+
+    def reserve(self, name: str, count: int = 1,
+                seed: Optional[Callable[[], int]] = None) -> range:
+        """
+        Reserve the next `count` numbers of a sequence (e.g. a block for a
+        bulk import) and return them. `seed` gives the last number already in
+        use when the sequence does not exist yet; it is called once, ever.
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with file_lock(self.path):
+            last = self._last(name)
+            if last is None:
+                last = seed() if seed else 0
+            put_record(self.path, {"name": name, "value": last + count}, key=("name",))
+        return range(last + 1, last + count + 1)
+
+    def next(self, name: str, seed: Optional[Callable[[], int]] = None) -> int:
+        return self.reserve(name, 1, seed)[0]
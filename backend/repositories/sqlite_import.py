@@ -0,0 +1,102 @@
+"""
+One-shot importer: copies backend/data/*.json (and archived terms of class
+offerings) into a SQLite database.
+
+Usage (from the backend directory):
+    python -m repositories.sqlite_import [db_path] [--replace]
+"""
+import sys
+from pathlib import Path
+
+from repositories.json_utils import load_json
+from repositories.class_offering_repository import DATA_FILE as OFFERINGS_FILE, ClassOfferingRepository
+from repositories.enrollment_repository import DATA_FILE as ENROLLMENTS_FILE
+from repositories.report_repository import DATA_FILE as REPORTS_FILE
+from repositories.user_repository import DATA_FILE as USERS_FILE
+from repositories.rooms_repository import DATA_FILE as ROOMS_FILE
+from repositories.sequence_repository import DATA_FILE as SEQUENCES_FILE
+from repositories.sqlite_repositories import (
+    SqliteDatabase,
+    SqliteClassOfferingRepository,
+    DEFAULT_DB_FILE,
+)
+from repositories.storage import SQLITE_PATH
+
+TABLES = ["class_offerings", "enrollments", "reports", "users", "rooms", "sequences"]
+
+
+def import_json_data(db_path=DEFAULT_DB_FILE, replace: bool = False) -> dict:
+    """
+    Load every JSON data file into the database at db_path.
+    Refuses to import into non-empty tables unless replace=True.
+    Returns the number of rows imported per table.
+    """
+    db = SqliteDatabase(db_path)
+    conn = db.connect()
+
+    non_empty = [t for t in TABLES if conn.execute(f"SELECT 1 FROM {t} LIMIT 1").fetchone()]
+    if non_empty and not replace:
+        raise ValueError(f"Database already contains data in: {', '.join(non_empty)}")
+
+    # The database keeps every term in one table, archived ones included
+    archive = ClassOfferingRepository(OFFERINGS_FILE)
+    offerings = list({
+        item["id"]: item
+        for path in [*(archive._archive(t).path for t in archive.archived_terms()), OFFERINGS_FILE]
+        for item in load_json(path)
+    }.values())
+    enrollments = load_json(ENROLLMENTS_FILE)
+    reports = load_json(REPORTS_FILE)
+    users = load_json(USERS_FILE)
+    rooms = load_json(ROOMS_FILE)
+    sequences = load_json(SEQUENCES_FILE)
+
+    with conn:
+        for table in TABLES:
+            conn.execute(f"DELETE FROM {table}")
+
+        conn.executemany(
+            SqliteClassOfferingRepository._UPSERT,
+            [SqliteClassOfferingRepository._dict_to_row(o) for o in offerings],
+        )
+        conn.executemany(
+            "INSERT INTO enrollments (student_id, class_id, tutor_id, enrollment_status, version) "
+            "VALUES (:student_id, :class_id, :tutor_id, :enrollment_status, :version)",
+            # Tolerate stray whitespace in hand-edited keys
+            [{"version": 0, **{k.strip(): v for k, v in e.items()}} for e in enrollments],
+        )
+        conn.executemany(
+            "INSERT INTO reports (report_id, class_id, tutor_id, type, content, date, student_id) "
+            "VALUES (:report_id, :class_id, :tutor_id, :type, :content, :date, :student_id)",
+            [{"tutor_id": None, "student_id": None, **r} for r in reports],
+        )
+        conn.executemany(
+            "INSERT INTO users (id, name, email, role) VALUES (:id, :name, :email, :role)",
+            users,
+        )
+        conn.executemany(
+            "INSERT INTO rooms (room_id, capacity) VALUES (:room_id, :capacity)",
+            rooms,
+        )
+        conn.executemany(
+            "INSERT INTO sequences (name, value) VALUES (:name, :value)",
+            sequences,
+        )
+
+    return {
+        "class_offerings": len(offerings),
+        "enrollments": len(enrollments),
+        "reports": len(reports),
+        "users": len(users),
+        "rooms": len(rooms),
+        "sequences": len(sequences),
+    }
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--replace"]
+    target = Path(args[0]) if args else Path(SQLITE_PATH or DEFAULT_DB_FILE)
+    counts = import_json_data(target, replace="--replace" in sys.argv)
+    for table, count in counts.items():
+        print(f"{table}: {count} rows")
+    print(f"Imported into {target}")
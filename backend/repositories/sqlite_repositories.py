@@ -0,0 +1,752 @@
+import json
+import sqlite3
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.class_offering import ClassOffering, Enrollment
+from models.term import term_bounds, term_key, term_of
+from models.report import Report
+from models.user import User
+from repositories.class_offering_repository import ClassOfferingRepository
+from repositories.enrollment_repository import EnrollmentRepository
+from repositories.report_repository import ReportRepository
+from repositories.user_repository import UserRepository, normalise_email
+from repositories.rooms_repository import RoomRepository
+from repositories.sequence_repository import SequenceRepository
+from repositories.concurrency import ConcurrentModificationError
+from repositories.pagination import DEFAULT_PAGE_SIZE, in_date_range
+
+DEFAULT_DB_FILE = Path(__file__).parent.parent / "data" / "tss.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS class_offerings (
+    id TEXT PRIMARY KEY,
+    subject TEXT NOT NULL,
+    tutor_id TEXT NOT NULL,
+    delivery_mode TEXT NOT NULL,
+    meeting_link TEXT,
+    room TEXT,
+    timeslot_start TEXT NOT NULL,
+    timeslot_end TEXT NOT NULL,
+    status TEXT NOT NULL,
+    enrolled_students TEXT NOT NULL DEFAULT '[]',
+    progress_notes TEXT NOT NULL DEFAULT '{}',
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_offerings_tutor ON class_offerings (tutor_id);
+CREATE INDEX IF NOT EXISTS idx_offerings_status ON class_offerings (status);
+CREATE INDEX IF NOT EXISTS idx_offerings_room ON class_offerings (room);
+CREATE INDEX IF NOT EXISTS idx_offerings_subject ON class_offerings (subject);
+
+CREATE TABLE IF NOT EXISTS enrollments (
+    student_id TEXT NOT NULL,
+    class_id TEXT NOT NULL,
+    tutor_id TEXT NOT NULL,
+    enrollment_status TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_enrollments_student ON enrollments (student_id);
+CREATE INDEX IF NOT EXISTS idx_enrollments_class ON enrollments (class_id);
+
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    class_id TEXT NOT NULL,
+    tutor_id TEXT,
+    type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    date TEXT NOT NULL,
+    student_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_class ON reports (class_id);
+CREATE INDEX IF NOT EXISTS idx_reports_tutor ON reports (tutor_id);
+CREATE INDEX IF NOT EXISTS idx_reports_student ON reports (student_id);
+CREATE INDEX IF NOT EXISTS idx_reports_type ON reports (type);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    role TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_users_name ON users (name);
+CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users (lower(email));
+
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id TEXT PRIMARY KEY,
+    capacity INTEGER NOT NULL
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_enrollments_pair ON enrollments (student_id, class_id);
+
+-- Id sequences: the last number handed out per entity type
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+-- Per-table change counters (the SQLite counterpart of json_utils.dataset_version)
+CREATE TABLE IF NOT EXISTS dataset_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+# Columns added after the first release: (table, column, definition)
+MIGRATIONS = [
+    ("class_offerings", "version", "INTEGER NOT NULL DEFAULT 0"),
+    ("enrollments", "version", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+class SqliteDatabase:
+    """
+    Thin wrapper around a SQLite file.
+    sqlite3 connections cannot be shared between threads, and FastAPI runs
+    sync endpoints on a thread pool, so each thread gets its own connection.
+    """
+
+    def __init__(self, path=DEFAULT_DB_FILE):
+        self.path = str(path)
+        self._local = threading.local()
+        with self.connect() as conn:
+            for table, column, definition in MIGRATIONS:
+                columns = {r["name"] for r in conn.execute(f"PRAGMA table_info({table})")}
+                if columns and column not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            conn.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def write(self, table: str):
+        """Transaction on one table that also bumps the table's version."""
+        conn = self.connect()
+        with conn:
+            yield conn
+            conn.execute(
+                "INSERT INTO dataset_versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                (table,),
+            )
+
+    def version(self, table: str) -> int:
+        row = self.connect().execute(
+            "SELECT version FROM dataset_versions WHERE name = ?", (table,)
+        ).fetchone()
+        return row["version"] if row else 0
+
+
+def _rowid(conn: sqlite3.Connection, table: str, key_column: str, key: str) -> int:
+    """rowid of the record a cursor points at (pages are ordered by rowid)."""
+    row = conn.execute(f"SELECT rowid FROM {table} WHERE {key_column} = ?", (key,)).fetchone()
+    if row is None:
+        raise ValueError("Invalid cursor")
+    return row[0]
+
+
+def _date_clauses(column: str, date_from: Optional[str], date_to: Optional[str],
+                  clauses: List[str], params: list):
+    # Same inclusive bounds as pagination.in_date_range
+    if date_from:
+        clauses.append(f"{column} >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append(f"substr({column}, 1, length(?)) <= ?")
+        params.extend([date_to, date_to])
+
+
+def _term_clauses(term: Optional[str], clauses: List[str], params: list):
+    if term is not None:
+        clauses.append("timeslot_start >= ? AND timeslot_start < ?")
+        params.extend(term_bounds(term))
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=DEFAULT_DB_FILE) -> SqliteDatabase:
+    """Return the shared SqliteDatabase for a file (one per path per process)."""
+    key = str(Path(path).resolve())
+    with _databases_lock:
+        if key not in _databases:
+            _databases[key] = SqliteDatabase(path)
+        return _databases[key]
+
+
+class SqliteClassOfferingRepository(ClassOfferingRepository):
+    """
+    SQLite implementation of ClassOfferingRepository.
+    Nested fields (enrolled_students, progress_notes) are stored as JSON text.
+    Every term stays in the one table (queries by term use the timeslot
+    index), so there are no archived partitions.
+    """
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+        self.archive_dir = None
+        self.read_only = False
+
+    # Internal helpers
+    def _load(self) -> List[dict]:
+        rows = self.db.connect().execute("SELECT * FROM class_offerings ORDER BY rowid")
+        return [self._row_to_dict(r) for r in rows]
+
+    def _save(self, data: List[dict]):
+        with self.db.write("class_offerings") as conn:
+            conn.execute("DELETE FROM class_offerings")
+            conn.executemany(self._UPSERT, [self._dict_to_row(d) for d in data])
+
+    def _query(self, where: str, params: tuple, term: Optional[str] = None) -> List[ClassOffering]:
+        clauses, params = [where], list(params)
+        _term_clauses(term, clauses, params)
+        rows = self.db.connect().execute(
+            f"SELECT * FROM class_offerings WHERE {' AND '.join(clauses)} ORDER BY rowid", params
+        )
+        return [self._dict_to_class(self._row_to_dict(r)) for r in rows]
+
+    _INSERT = """
+        INSERT INTO class_offerings (id, subject, tutor_id, delivery_mode, meeting_link, room,
+                                     timeslot_start, timeslot_end, status,
+                                     enrolled_students, progress_notes, version)
+        VALUES (:id, :subject, :tutor_id, :delivery_mode, :meeting_link, :room,
+                :timeslot_start, :timeslot_end, :status,
+                :enrolled_students, :progress_notes, :version)
+    """
+
+    _UPSERT = _INSERT + """
+        ON CONFLICT(id) DO UPDATE SET
+            subject = excluded.subject,
+            tutor_id = excluded.tutor_id,
+            delivery_mode = excluded.delivery_mode,
+            meeting_link = excluded.meeting_link,
+            room = excluded.room,
+            timeslot_start = excluded.timeslot_start,
+            timeslot_end = excluded.timeslot_end,
+            status = excluded.status,
+            enrolled_students = excluded.enrolled_students,
+            progress_notes = excluded.progress_notes,
+            version = excluded.version
+    """
+
+    # Compare-and-swap: only touches the row if nobody saved it since it was read
+    _UPDATE_IF_VERSION = """
+        UPDATE class_offerings SET
+            subject = :subject,
+            tutor_id = :tutor_id,
+            delivery_mode = :delivery_mode,
+            meeting_link = :meeting_link,
+            room = :room,
+            timeslot_start = :timeslot_start,
+            timeslot_end = :timeslot_end,
+            status = :status,
+            enrolled_students = :enrolled_students,
+            progress_notes = :progress_notes,
+            version = :version
+        WHERE id = :id AND version = :expected_version
+    """
+
+    # Public API
+    def version(self) -> int:
+        return self.db.version("class_offerings")
+
+    def save(self, offering: ClassOffering) -> ClassOffering:
+        data = self._class_to_dict(offering)
+        data["version"] = offering.version + 1
+        row = self._dict_to_row(data)
+
+        with self.db.write("class_offerings") as conn:
+            cur = conn.execute(self._UPDATE_IF_VERSION, {**row, "expected_version": offering.version})
+            if cur.rowcount == 0:
+                try:
+                    conn.execute(self._INSERT, row)
+                except sqlite3.IntegrityError:
+                    # The row exists, just not at the version we read
+                    raise ConcurrentModificationError(
+                        f"Class offering {offering.id} was modified concurrently."
+                    )
+
+        offering.version += 1
+        return offering
+
+    def save_many(self, offerings: Sequence[ClassOffering]) -> List[ClassOffering]:
+        if not offerings:
+            return []
+        # One transaction: a failed compare-and-swap rolls every row back
+        with self.db.write("class_offerings") as conn:
+            for offering in offerings:
+                data = self._class_to_dict(offering)
+                data["version"] = offering.version + 1
+                row = self._dict_to_row(data)
+                cur = conn.execute(self._UPDATE_IF_VERSION, {**row, "expected_version": offering.version})
+                if cur.rowcount == 0:
+                    try:
+                        conn.execute(self._INSERT, row)
+                    except sqlite3.IntegrityError:
+                        raise ConcurrentModificationError(
+                            f"Class offering {offering.id} was modified concurrently."
+                        )
+
+        for offering in offerings:
+            offering.version += 1
+        return list(offerings)
+
+    def get(self, offering_id: str) -> Optional[ClassOffering]:
+        found = self._query("id = ?", (offering_id,))
+        return found[0] if found else None
+
+    def list_all(self, term: Optional[str] = None) -> List[ClassOffering]:
+        if term is not None:
+            return self._query("1 = 1", (), term)
+        return [self._dict_to_class(x) for x in self._load()]
+
+    def list_by_tutor(self, tutor_id: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._query("tutor_id = ?", (tutor_id,), term)
+
+    def list_by_status(self, *statuses: str, term: Optional[str] = None) -> List[ClassOffering]:
+        placeholders = ", ".join("?" for _ in statuses)
+        return self._query(f"status IN ({placeholders})", statuses, term)
+
+    def list_by_room(self, room: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._query("room = ?", (room,), term)
+
+    def list_by_subject(self, subject: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self._query("subject = ?", (subject,), term)
+
+    def list_statuses(self, term: Optional[str] = None) -> List[str]:
+        clauses, params = ["1 = 1"], []
+        _term_clauses(term, clauses, params)
+        rows = self.db.connect().execute(
+            f"SELECT DISTINCT status FROM class_offerings WHERE {' AND '.join(clauses)} ORDER BY status",
+            params,
+        )
+        return [r["status"] for r in rows]
+
+    def list_terms(self) -> List[dict]:
+        rows = self.db.connect().execute(
+            "SELECT DISTINCT substr(timeslot_start, 1, 7) AS month FROM class_offerings"
+        )
+        terms = {term_of(r["month"] + "-01") for r in rows if r["month"]}
+        return [{"term": term, "archived": False} for term in sorted(terms, key=term_key)]
+
+    @staticmethod
+    def _page_where(statuses: Sequence[str] = (), subject: Optional[str] = None,
+                    tutor_id: Optional[str] = None) -> Tuple[List[str], list]:
+        clauses, params = ["1 = 1"], []
+        if statuses:
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if subject:
+            clauses.append("subject = ?")
+            params.append(subject)
+        if tutor_id:
+            clauses.append("tutor_id = ?")
+            params.append(tutor_id)
+        return clauses, params
+
+    def page(self, statuses: Sequence[str] = (), subject: Optional[str] = None,
+             tutor_id: Optional[str] = None, date_from: Optional[str] = None,
+             date_to: Optional[str] = None, after: Optional[str] = None,
+             limit: int = DEFAULT_PAGE_SIZE,
+             term: Optional[str] = None) -> Tuple[List[ClassOffering], bool]:
+        conn = self.db.connect()
+        clauses, params = self._page_where(statuses, subject, tutor_id)
+        _date_clauses("timeslot_start", date_from, date_to, clauses, params)
+        _term_clauses(term, clauses, params)
+        if after is not None:
+            clauses.append("rowid > ?")
+            params.append(_rowid(conn, "class_offerings", "id", after))
+
+        rows = conn.execute(
+            f"SELECT * FROM class_offerings WHERE {' AND '.join(clauses)} "
+            "ORDER BY rowid LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        items = [self._dict_to_class(self._row_to_dict(r)) for r in rows[:limit]]
+        return items, len(rows) > limit
+
+    def page_progress_notes(self, subject: Optional[str] = None, tutor_id: Optional[str] = None,
+                            date_from: Optional[str] = None, date_to: Optional[str] = None,
+                            after: Optional[Tuple[str, str]] = None,
+                            limit: int = DEFAULT_PAGE_SIZE,
+                            term: Optional[str] = None) -> Tuple[List[dict], bool]:
+        conn = self.db.connect()
+        clauses, params = self._page_where(subject=subject, tutor_id=tutor_id)
+        _term_clauses(term, clauses, params)
+        if after:
+            clauses.append("rowid >= ?")
+            params.append(_rowid(conn, "class_offerings", "id", after[0]))
+
+        result = []
+        rows = conn.execute(
+            f"SELECT id, tutor_id, progress_notes FROM class_offerings "
+            f"WHERE {' AND '.join(clauses)} ORDER BY rowid",
+            params,
+        )
+        for row in rows:
+            notes = json.loads(row["progress_notes"]) or {}
+            for timestamp in sorted(notes):
+                if after and row["id"] == after[0] and timestamp <= after[1]:
+                    continue
+                if not in_date_range(timestamp, date_from, date_to):
+                    continue
+                if len(result) == limit:
+                    return result, True
+                result.append({
+                    "class_id": row["id"],
+                    "tutor_id": row["tutor_id"],
+                    "timestamp": timestamp,
+                    "content": notes[timestamp]
+                })
+        return result, False
+
+    def get_progress_notes_all(self, term: Optional[str] = None) -> List[dict]:
+        result = []
+        clauses, params = ["1 = 1"], []
+        _term_clauses(term, clauses, params)
+        rows = self.db.connect().execute(
+            f"SELECT id, tutor_id, progress_notes FROM class_offerings "
+            f"WHERE {' AND '.join(clauses)} ORDER BY rowid",
+            params,
+        )
+        for row in rows:
+            for timestamp, content in (json.loads(row["progress_notes"]) or {}).items():
+                result.append({
+                    "class_id": row["id"],
+                    "tutor_id": row["tutor_id"],
+                    "timestamp": timestamp,
+                    "content": content
+                })
+        return result
+
+    # Conversion Utilities
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> dict:
+        return {
+            "id": row["id"],
+            # Repeated across rows: share one string per value
+            "subject": sys.intern(row["subject"]),
+            "tutor_id": sys.intern(row["tutor_id"]),
+            "delivery_mode": sys.intern(row["delivery_mode"]),
+            "meeting_link": row["meeting_link"],
+            "room": sys.intern(row["room"]) if row["room"] is not None else None,
+            "timeslot": {
+                "start": row["timeslot_start"],
+                "end": row["timeslot_end"],
+            },
+            "status": sys.intern(row["status"]),
+            "enrolled_students": json.loads(row["enrolled_students"]),
+            "progress_notes": json.loads(row["progress_notes"]),
+            "version": row["version"],
+        }
+
+    @staticmethod
+    def _dict_to_row(data: dict) -> dict:
+        return {
+            "id": data["id"],
+            "subject": data["subject"],
+            "tutor_id": data["tutor_id"],
+            "delivery_mode": data["delivery_mode"],
+            "meeting_link": data.get("meeting_link"),
+            "room": data.get("room"),
+            "timeslot_start": data["timeslot"]["start"],
+            "timeslot_end": data["timeslot"]["end"],
+            "status": data["status"],
+            "enrolled_students": json.dumps(data.get("enrolled_students", [])),
+            "progress_notes": json.dumps(data.get("progress_notes", {})),
+            "version": data.get("version", 0),
+        }
+
+
+class SqliteEnrollmentRepository(EnrollmentRepository):
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+
+    def _load(self) -> List[dict]:
+        rows = self.db.connect().execute("SELECT * FROM enrollments ORDER BY rowid")
+        return [dict(r) for r in rows]
+
+    def _save(self, data: List[dict]):
+        with self.db.write("enrollments") as conn:
+            conn.execute("DELETE FROM enrollments")
+            conn.executemany(self._INSERT, data)
+
+    _INSERT = """
+        INSERT INTO enrollments (student_id, class_id, tutor_id, enrollment_status, version)
+        VALUES (:student_id, :class_id, :tutor_id, :enrollment_status, :version)
+    """
+    # Skips pairs already enrolled (unique index on student_id, class_id)
+    _INSERT_IF_NEW = """
+        INSERT OR IGNORE INTO enrollments (student_id, class_id, tutor_id, enrollment_status, version)
+        VALUES (:student_id, :class_id, :tutor_id, :enrollment_status, :version)
+    """
+
+    def version(self) -> int:
+        return self.db.version("enrollments")
+
+    def add(self, enrollment: Enrollment) -> Enrollment:
+        try:
+            with self.db.write("enrollments") as conn:
+                conn.execute(self._INSERT, {**asdict(enrollment), "version": 1})
+        except sqlite3.IntegrityError:
+            raise ValueError("Student is already enrolled in this class.")
+        enrollment.version = 1
+        return enrollment
+
+    def add_many(self, enrollments: Sequence[Enrollment]) -> List[bool]:
+        if not enrollments:
+            return []
+        added = []
+        with self.db.write("enrollments") as conn:
+            for enrollment in enrollments:
+                cur = conn.execute(self._INSERT_IF_NEW, {**asdict(enrollment), "version": 1})
+                added.append(cur.rowcount == 1)
+        for enrollment, was_added in zip(enrollments, added):
+            if was_added:
+                enrollment.version = 1
+        return added
+
+    def remove(self, student_id: str, class_id: str) -> None:
+        with self.db.write("enrollments") as conn:
+            conn.execute(
+                "DELETE FROM enrollments WHERE student_id = ? AND class_id = ?",
+                (student_id, class_id),
+            )
+
+    def remove_many(self, pairs: Sequence[Tuple[str, str]]) -> None:
+        if not pairs:
+            return
+        with self.db.write("enrollments") as conn:
+            conn.executemany(
+                "DELETE FROM enrollments WHERE student_id = ? AND class_id = ?",
+                list(pairs),
+            )
+
+    def get_for_student(self, student_id: str) -> List[Enrollment]:
+        rows = self.db.connect().execute(
+            "SELECT * FROM enrollments WHERE student_id = ? ORDER BY rowid", (student_id,)
+        )
+        return [Enrollment(**dict(r)) for r in rows]
+
+    def get_for_students(self, student_ids: Iterable[str]) -> Dict[str, List[Enrollment]]:
+        result: Dict[str, List[Enrollment]] = {sid: [] for sid in student_ids}
+        ids = list(result)
+        conn = self.db.connect()
+        # Chunked to stay under SQLite's bound-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT * FROM enrollments WHERE student_id IN ({', '.join('?' * len(chunk))}) "
+                "ORDER BY rowid",
+                chunk,
+            )
+            for r in rows:
+                result[r["student_id"]].append(Enrollment(**dict(r)))
+        return result
+
+    def get_for_class(self, class_id: str) -> List[Enrollment]:
+        rows = self.db.connect().execute(
+            "SELECT * FROM enrollments WHERE class_id = ? ORDER BY rowid", (class_id,)
+        )
+        return [Enrollment(**dict(r)) for r in rows]
+
+
+class SqliteReportRepository(ReportRepository):
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+
+    def _load(self) -> List[dict]:
+        rows = self.db.connect().execute("SELECT * FROM reports ORDER BY rowid")
+        return [dict(r) for r in rows]
+
+    def _save(self, data: List[dict]):
+        with self.db.write("reports") as conn:
+            conn.execute("DELETE FROM reports")
+            conn.executemany(self._INSERT, data)
+
+    _INSERT = """
+        INSERT INTO reports (report_id, class_id, tutor_id, type, content, date, student_id)
+        VALUES (:report_id, :class_id, :tutor_id, :type, :content, :date, :student_id)
+    """
+
+    def version(self) -> int:
+        return self.db.version("reports")
+
+    def _query(self, where: str, params: tuple) -> List[Report]:
+        rows = self.db.connect().execute(
+            f"SELECT * FROM reports WHERE {where} ORDER BY rowid", params
+        )
+        return [Report(**dict(r)) for r in rows]
+
+    def create(self, report: Report) -> Report:
+        item = report.model_dump()
+        # Callers may allocate the id (from a sequence); otherwise it is random
+        item["report_id"] = item["report_id"] or str(uuid.uuid4())
+        with self.db.write("reports") as conn:
+            conn.execute(self._INSERT, item)
+        return Report(**item)
+
+    def update(self, report_id: str, content: str) -> Report:
+        with self.db.write("reports") as conn:
+            cur = conn.execute(
+                "UPDATE reports SET content = ? WHERE report_id = ?", (content, report_id)
+            )
+        if cur.rowcount == 0:
+            raise ValueError("Report not found")
+        return self._query("report_id = ?", (report_id,))[0]
+
+    def get_by_student(self, student_id: str) -> List[Report]:
+        return self._query("student_id = ?", (student_id,))
+
+    def get_by_tutor(self, tutor_id: str) -> List[Report]:
+        return self._query("tutor_id = ?", (tutor_id,))
+
+    def get_by_class(self, class_id: str) -> List[Report]:
+        return self._query("class_id = ?", (class_id,))
+
+    def list_student_evaluations(self) -> List[Report]:
+        return self._query("type = ?", ("student_evaluation",))
+
+    def page_student_evaluations(self, tutor_id: Optional[str] = None, class_id: Optional[str] = None,
+                                 date_from: Optional[str] = None, date_to: Optional[str] = None,
+                                 after: Optional[str] = None,
+                                 limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Report], bool]:
+        conn = self.db.connect()
+        clauses, params = ["type = ?"], ["student_evaluation"]
+        if tutor_id:
+            clauses.append("tutor_id = ?")
+            params.append(tutor_id)
+        if class_id:
+            clauses.append("class_id = ?")
+            params.append(class_id)
+        _date_clauses("date", date_from, date_to, clauses, params)
+        if after is not None:
+            clauses.append("rowid > ?")
+            params.append(_rowid(conn, "reports", "report_id", after))
+
+        rows = conn.execute(
+            f"SELECT * FROM reports WHERE {' AND '.join(clauses)} ORDER BY rowid LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        return [Report(**dict(r)) for r in rows[:limit]], len(rows) > limit
+
+
+class SqliteUserRepository(UserRepository):
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+
+    def _load(self) -> List[dict]:
+        rows = self.db.connect().execute("SELECT * FROM users ORDER BY rowid")
+        return [dict(r) for r in rows]
+
+    def version(self) -> int:
+        return self.db.version("users")
+
+    def _query_one(self, where: str, params: tuple) -> Optional[User]:
+        row = self.db.connect().execute(
+            f"SELECT * FROM users WHERE {where} ORDER BY rowid LIMIT 1", params
+        ).fetchone()
+        return User(**dict(row)) if row else None
+
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        return self._query_one("id = ?", (user_id,))
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, User]:
+        ids = list(set(user_ids))
+        result = {}
+        # Stay well below SQLite's bound-parameter limit
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.db.connect().execute(
+                f"SELECT * FROM users WHERE id IN ({placeholders})", chunk
+            )
+            for row in rows:
+                result.setdefault(row["id"], User(**dict(row)))
+        return result
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        return self._query_one("lower(email) = ?", (normalise_email(email),))
+
+    def get_by_name(self, username: str) -> Optional[User]:
+        return self._query_one("name = ?", (username,))
+
+
+class SqliteRoomRepository(RoomRepository):
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+
+    def _load(self) -> List[dict]:
+        rows = self.db.connect().execute("SELECT * FROM rooms ORDER BY rowid")
+        return [dict(r) for r in rows]
+
+    def version(self) -> int:
+        return self.db.version("rooms")
+
+    def exists(self, room_id: str) -> bool:
+        return self.get_room(room_id) is not None
+
+    def get_room(self, room_id: str) -> Optional[dict]:
+        row = self.db.connect().execute(
+            "SELECT * FROM rooms WHERE room_id = ?", (room_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def add_room(self, room_id: str, capacity: int):
+        if self.exists(room_id):
+            raise ValueError("Room ID already exists")
+
+        with self.db.write("rooms") as conn:
+            conn.execute("INSERT INTO rooms (room_id, capacity) VALUES (?, ?)", (room_id, capacity))
+        return {"room_id": room_id, "capacity": capacity}
+
+    def update_room(self, room_id: str, capacity: Optional[int] = None):
+        if not self.exists(room_id):
+            return None
+        if capacity is not None:
+            with self.db.write("rooms") as conn:
+                conn.execute("UPDATE rooms SET capacity = ? WHERE room_id = ?", (capacity, room_id))
+        return self.get_room(room_id)
+
+
+class SqliteSequenceRepository(SequenceRepository):
+
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or get_database()
+
+    def _last(self, name: str) -> Optional[int]:
+        row = self.db.connect().execute(
+            "SELECT value FROM sequences WHERE name = ?", (name,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def reserve(self, name: str, count: int = 1,
+                seed: Optional[Callable[[], int]] = None) -> range:
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        with self.db.write("sequences") as conn:
+            # Writing first takes the database write lock, so the read below is current
+            cur = conn.execute("UPDATE sequences SET value = value + ? WHERE name = ?", (count, name))
+            if cur.rowcount == 0:
+                last = seed() if seed else 0
+                conn.execute("INSERT INTO sequences (name, value) VALUES (?, ?)", (name, last + count))
+            value = self._last(name)
+        return range(value - count + 1, value + 1)
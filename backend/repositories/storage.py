@@ -0,0 +1,74 @@
+"""
+Storage backend selection.
+
+The backend is chosen with the TSS_STORAGE_BACKEND environment variable:
+- "json"   (default) → JSON files in backend/data (snapshot + append-only change log)
+- "sqlite"           → SQLite database at TSS_SQLITE_PATH (default backend/data/tss.sqlite3)
+
+Populate a new SQLite database from the JSON files with:
+    python -m repositories.sqlite_import
+"""
+import os
+
+from repositories.class_offering_repository import ClassOfferingRepository
+from repositories.enrollment_repository import EnrollmentRepository
+from repositories.report_repository import ReportRepository
+from repositories.user_repository import UserRepository
+from repositories.rooms_repository import RoomRepository
+from repositories.sequence_repository import SequenceRepository
+
+STORAGE_BACKEND = os.getenv("TSS_STORAGE_BACKEND", "json").lower()
+SQLITE_PATH = os.getenv("TSS_SQLITE_PATH")
+
+
+def _use_sqlite() -> bool:
+    if STORAGE_BACKEND not in ("json", "sqlite"):
+        raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
+    return STORAGE_BACKEND == "sqlite"
+
+
+def _database():
+    from repositories.sqlite_repositories import get_database, DEFAULT_DB_FILE
+    return get_database(SQLITE_PATH or DEFAULT_DB_FILE)
+
+
+def make_class_offering_repository() -> ClassOfferingRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteClassOfferingRepository
+        return SqliteClassOfferingRepository(_database())
+    return ClassOfferingRepository()
+
+
+def make_enrollment_repository() -> EnrollmentRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteEnrollmentRepository
+        return SqliteEnrollmentRepository(_database())
+    return EnrollmentRepository()
+
+
+def make_report_repository() -> ReportRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteReportRepository
+        return SqliteReportRepository(_database())
+    return ReportRepository()
+
+
+def make_user_repository() -> UserRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteUserRepository
+        return SqliteUserRepository(_database())
+    return UserRepository()
+
+
+def make_room_repository() -> RoomRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteRoomRepository
+        return SqliteRoomRepository(_database())
+    return RoomRepository()
+
+
+def make_sequence_repository() -> SequenceRepository:
+    if _use_sqlite():
+        from repositories.sqlite_repositories import SqliteSequenceRepository
+        return SqliteSequenceRepository(_database())
+    return SequenceRepository()
@@ -1,24 +1,63 @@
-from typing import Optional, List
-from repositories.json_utils import load_json
+import threading
+from typing import Dict, Iterable, Optional, List
+from repositories.json_utils import load_json, load_json_versioned, dataset_version, intern_fields
 from models.user import User
 from pathlib import Path
 
 DATA_FILE = Path(__file__).parent.parent / "data" / "users.json"
+intern_fields(DATA_FILE, "role")
+
+
+def normalise_email(email: str) -> str:
+    return email.strip().lower()
 
 
 class UserRepository:
 
+    def __init__(self):
+        # id -> User and normalised email -> User, rebuilt when users.json changes
+        self._by_id: Dict[str, User] = {}
+        self._by_email: Dict[str, User] = {}
+        self._version = -1
+        self._lock = threading.Lock()
+
     def _load(self) -> List[dict]:
         return load_json(DATA_FILE)
 
+    def _refresh(self):
+        data, version = load_json_versioned(DATA_FILE)
+        with self._lock:
+            if version != self._version:
+                by_id, by_email = {}, {}
+                for item in data:
+                    user = User(**item)
+                    by_id.setdefault(user.id, user)
+                    by_email.setdefault(normalise_email(user.email), user)
+                self._by_id, self._by_email = by_id, by_email
+                self._version = version
+
+    def version(self) -> int:
+        return dataset_version(DATA_FILE)
+
+    def _users_by_id(self) -> Dict[str, User]:
+        self._refresh()
+        return self._by_id
+
     def get_all(self) -> List[User]:
         return [User(**x) for x in self._load()]
 
     def get_by_id(self, user_id: str) -> Optional[User]:
-        for item in self._load():
-            if item["id"] == user_id:
-                return User(**item)
-        return None
+        return self._users_by_id().get(user_id)
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, User]:
+        """Resolve many ids at once. Unknown ids are left out of the result."""
+        users = self._users_by_id()
+        return {uid: users[uid] for uid in set(user_ids) if uid in users}
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        """Case-insensitive lookup, ignoring surrounding whitespace."""
+        self._refresh()
+        return self._by_email.get(normalise_email(email))
 
     def get_by_name(self, username: str) -> Optional[User]:
         for item in self._load():
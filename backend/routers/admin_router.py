@@ -1,12 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from services.admin_service import AdminService
+from container import get_admin_service
 
 router = APIRouter(tags=["Admin"])
 
-
-admin_service = AdminService()
-
 class RoomCreateRequest(BaseModel):
     room_id: str
     capacity: int
@@ -15,15 +13,17 @@ class RoomUpdateRequest(BaseModel):
     capacity: int
 
 @router.get("/rooms")
-def list_rooms():
+def list_rooms(admin_service: AdminService = Depends(get_admin_service)):
     return admin_service.list_rooms()
 
 @router.post("/rooms")
-def create_room(request: RoomCreateRequest):
+def create_room(request: RoomCreateRequest,
+                admin_service: AdminService = Depends(get_admin_service)):
     return admin_service.create_room(request.room_id, request.capacity)
 
 @router.put("/rooms/{room_id}")
-def update_room(room_id: str, request: RoomUpdateRequest):
+def update_room(room_id: str, request: RoomUpdateRequest,
+                admin_service: AdminService = Depends(get_admin_service)):
     updated = admin_service.edit_room(room_id, request.capacity)
     if not updated:
         return {"error": "Room not found"}
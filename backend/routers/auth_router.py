@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
-import json
-from pathlib import Path
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException
 import logging
+from repositories.user_repository import UserRepository
+from container import get_user_repository
 from schemas.user_schemas import (
     UserLoginRequest,
 )
@@ -15,26 +16,21 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Auth"])
 
-# Path to json files
-USERS_FILE = Path(__file__).parent.parent / "data" / "users.json"
-
 
 @router.post("/login")
-def login(payload: UserLoginRequest):
+def login(payload: UserLoginRequest,
+          user_repo: UserRepository = Depends(get_user_repository)):
     """
     Login by email. Returns the user object if found.
     """
-    with open(USERS_FILE, "r") as f:
-        users = json.load(f)
-
-    user = next((u for u in users if u["email"] == payload.email), None)
+    user = user_repo.get_by_email(payload.email)
 
     if not user:
         logger.info(f"Login failed for email: {payload.email}")
         raise HTTPException(status_code=404, detail="User not found")
 
-    logger.info(f"Login successful for email: {payload.email}, role: {user['role']}")
-    return user  # returns id, name, email, role
+    logger.info(f"Login successful for email: {payload.email}, role: {user.role}")
+    return asdict(user)  # returns id, name, email, role
 
 
 @router.post("/logout")
@@ -1,26 +1,50 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from services.class_offering_service import ClassOfferingService
+from container import get_offering_service
+from repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from routers.responses import fast_json
 
 router = APIRouter(tags=["ClassOfferings"])
 
-offering_service = ClassOfferingService()
-
 
 @router.get("/")
-def list_all():
-    return offering_service.list_all()
+def list_all(limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+             cursor: Optional[str] = None,
+             status: Optional[str] = None,
+             subject: Optional[str] = None,
+             tutor_id: Optional[str] = None,
+             date_from: Optional[str] = None,
+             date_to: Optional[str] = None,
+             term: Optional[str] = None,
+             offering_service: ClassOfferingService = Depends(get_offering_service)):
+    """Current offerings, or those of one term (e.g. "2025-3", archived or not)."""
+    try:
+        return fast_json(offering_service.list_page(
+            limit=limit, cursor=cursor, statuses=(status,) if status else (),
+            subject=subject, tutor_id=tutor_id, date_from=date_from, date_to=date_to,
+            term=term,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/terms")
+def list_terms(offering_service: ClassOfferingService = Depends(get_offering_service)):
+    return offering_service.list_terms()
 
 
 @router.get("/approved")
-def list_approved():
-    return offering_service.list_approved()
+def list_approved(offering_service: ClassOfferingService = Depends(get_offering_service)):
+    return fast_json(offering_service.list_approved())
 
 
 @router.get("/pending")
-def list_pending():
-    return offering_service.list_pending()
+def list_pending(offering_service: ClassOfferingService = Depends(get_offering_service)):
+    return fast_json(offering_service.list_pending())
 
 
 @router.get("/{offering_id}")
-def get_by_id(offering_id: str):
-    return offering_service.repo.get(offering_id)
+def get_by_id(offering_id: str,
+              offering_service: ClassOfferingService = Depends(get_offering_service)):
+    return fast_json(offering_service.repo.get(offering_id))
@@ -0,0 +1,33 @@
+"""
+Conditional GET helpers: list endpoints send an ETag built from the dataset
+versions their payload depends on, and answer a matching If-None-Match with
+304 before doing any work.
+"""
+import uuid
+from typing import Optional
+
+from fastapi import Request, Response
+
+# JSON dataset versions are counted per process (and restart with it), so
+# every ETag also carries a token for this process.
+_INSTANCE = uuid.uuid4().hex[:8]
+
+
+def make_etag(*versions: int) -> str:
+    return '"' + "-".join([_INSTANCE, *(str(v) for v in versions)]) + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response with etag. Returns a 304 response to send instead if
+    the client already holds this version, else None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags or f"W/{etag}" in tags:
+            return Response(status_code=304, headers=headers)
+    return None
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from services.coordinator_service import CoordinatorService
+from container import get_coordinator_service
+from repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from routers.conditional import make_etag, not_modified
+from routers.responses import fast_json
 from schemas.coordinator_requests import (
     ApproveRequest,
+    ApproveBatchRequest,
     RejectRequest,
     ModifyClassRequest
 )
@@ -18,54 +24,139 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Coordinator"])
 
-coord_service = CoordinatorService()
-
 
 @router.post("/approve")
-def approve_class(payload: ApproveRequest):
+def approve_class(payload: ApproveRequest,
+                  coord_service: CoordinatorService = Depends(get_coordinator_service)):
     logger.info(f"-COORDINATOR- Approving class for payload {payload}")
     try:
-        return coord_service.approve_class(payload.offering_id, payload.room)
+        return fast_json(coord_service.approve_class(payload.offering_id, payload.room))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/approve-batch")
+def approve_classes(payload: ApproveBatchRequest,
+                    coord_service: CoordinatorService = Depends(get_coordinator_service)):
+    """
+    Approve many offerings at once. Each offering gets its own outcome;
+    the accepted ones are committed together.
+    """
+    logger.info(f"-COORDINATOR- Approving {len(payload.offerings)} offering(s) in one batch")
+    results = coord_service.approve_batch([(p.offering_id, p.room) for p in payload.offerings])
+    approved = sum(1 for r in results if r["approved"])
+    return {"approved": approved, "failed": len(results) - approved, "results": results}
+
+
 @router.post("/reject")
-def reject_class(payload: RejectRequest):
+def reject_class(payload: RejectRequest,
+                 coord_service: CoordinatorService = Depends(get_coordinator_service)):
     logger.info(f"-COORDINATOR- Rejecting class for payload {payload}")
     try:
-        return coord_service.reject_class(payload.offering_id, payload.reason)
+        return fast_json(coord_service.reject_class(payload.offering_id, payload.reason))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/coverage")
-def monitor_coverage():
+def monitor_coverage(term: Optional[str] = None,
+                     coord_service: CoordinatorService = Depends(get_coordinator_service)):
     logger.info(f"-COORDINATOR- Monitoring subject coverage")
-    return coord_service.monitor_subject_coverage()
+    try:
+        return coord_service.monitor_subject_coverage(term)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/coverage/detail")
+def monitor_coverage_detail(term: Optional[str] = None,
+                            coord_service: CoordinatorService = Depends(get_coordinator_service)):
+    logger.info(f"-COORDINATOR- Monitoring subject coverage by status and delivery mode")
+    try:
+        return coord_service.subject_coverage_breakdown(term)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/coverage/rebuild")
+def rebuild_coverage(coord_service: CoordinatorService = Depends(get_coordinator_service)):
+    logger.info(f"-COORDINATOR- Rebuilding subject coverage counters")
+    return coord_service.rebuild_subject_coverage()
 
 
 @router.get("/classes")
-def view_classes():
+def view_classes(request: Request,
+                 response: Response,
+                 limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None,
+                 status: Optional[str] = None,
+                 subject: Optional[str] = None,
+                 tutor_id: Optional[str] = None,
+                 date_from: Optional[str] = None,
+                 date_to: Optional[str] = None,
+                 term: Optional[str] = None,
+                 coord_service: CoordinatorService = Depends(get_coordinator_service)):
     logger.info(f"-COORDINATOR- Viewing class lists")
-    return coord_service.view_class_list()
+    unchanged = not_modified(request, response, make_etag(*coord_service.class_list_versions()))
+    if unchanged:
+        return unchanged
+    try:
+        return fast_json(coord_service.view_class_list(
+            limit=limit, cursor=cursor, status=status, subject=subject,
+            tutor_id=tutor_id, date_from=date_from, date_to=date_to, term=term,
+        ), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/classes/pending")
-def view_pending_or_rejected():
+def view_pending_or_rejected(request: Request,
+                             response: Response,
+                             limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                             cursor: Optional[str] = None,
+                             status: Optional[str] = None,
+                             subject: Optional[str] = None,
+                             tutor_id: Optional[str] = None,
+                             date_from: Optional[str] = None,
+                             date_to: Optional[str] = None,
+                             term: Optional[str] = None,
+                             coord_service: CoordinatorService = Depends(get_coordinator_service)):
     logger.info("-COORDINATOR- Viewing pending/rejected class lists")
+    unchanged = not_modified(request, response, make_etag(*coord_service.class_list_versions()))
+    if unchanged:
+        return unchanged
     try:
-        return coord_service.view_pending_rejected_classes()
+        return fast_json(coord_service.view_pending_rejected_classes(
+            limit=limit, cursor=cursor, status=status, subject=subject,
+            tutor_id=tutor_id, date_from=date_from, date_to=date_to, term=term,
+        ), response)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 
+@router.post("/rooms/auto-assign")
+def auto_assign_rooms(dry_run: bool = False,
+                      coord_service: CoordinatorService = Depends(get_coordinator_service)):
+    """
+    Proposes a room for every pending offline offering: large enough for its
+    students and free for its timeslot. With dry_run the proposal is only
+    returned; otherwise the rooms are stored and used when approving.
+    """
+    logger.info(f"-COORDINATOR- Auto-assigning rooms (dry_run={dry_run})")
+    return coord_service.auto_assign_rooms(dry_run)
+
+
 @router.get("/rooms")
-def get_rooms():
+def get_rooms(request: Request,
+              response: Response,
+              coord_service: CoordinatorService = Depends(get_coordinator_service)):
     """
     Returns list of all rooms with capacity information.
     """
+    unchanged = not_modified(request, response, make_etag(coord_service.rooms_version()))
+    if unchanged:
+        return unchanged
     try:
         return coord_service.get_rooms()
     except Exception as e:
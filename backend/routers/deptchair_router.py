@@ -1,19 +1,105 @@
-from fastapi import APIRouter
-from services.deptchair_service import DepartmentChairService
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from services.deptchair_service import (
+    DepartmentChairService,
+    PROGRESS_NOTE_FIELDS,
+    STUDENT_EVALUATION_FIELDS,
+)
+from services.export import MEDIA_TYPES, encode
+from models.term import parse_term
+from container import get_deptchair_service
+from repositories.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from routers.conditional import make_etag, not_modified
+from routers.responses import fast_json
 
 
 router = APIRouter(tags=["Department Chair"])
 
-deptchair_service = DepartmentChairService()
-
 
 @router.get("/progress-notes")
-def get_progress_notes():
-    return deptchair_service.get_all_tutor_progress_notes()
+def get_progress_notes(request: Request,
+                       response: Response,
+                       limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                       cursor: Optional[str] = None,
+                       subject: Optional[str] = None,
+                       tutor_id: Optional[str] = None,
+                       date_from: Optional[str] = None,
+                       date_to: Optional[str] = None,
+                       term: Optional[str] = None,
+                       deptchair_service: DepartmentChairService = Depends(get_deptchair_service)):
+    unchanged = not_modified(request, response, make_etag(deptchair_service.progress_notes_version()))
+    if unchanged:
+        return unchanged
+    try:
+        return fast_json(deptchair_service.page_tutor_progress_notes(
+            limit=limit, cursor=cursor, subject=subject, tutor_id=tutor_id,
+            date_from=date_from, date_to=date_to, term=term,
+        ), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/progress-notes/export")
+def export_progress_notes(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+                          subject: Optional[str] = None,
+                          tutor_id: Optional[str] = None,
+                          date_from: Optional[str] = None,
+                          date_to: Optional[str] = None,
+                          term: Optional[str] = None,
+                          deptchair_service: DepartmentChairService = Depends(get_deptchair_service)):
+    """Every matching progress note, streamed as NDJSON or CSV."""
+    # Checked before streaming starts: the rows are only read once it has
+    if term is not None:
+        try:
+            parse_term(term)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    rows = deptchair_service.export_tutor_progress_notes(
+        subject=subject, tutor_id=tutor_id, date_from=date_from, date_to=date_to, term=term,
+    )
+    return StreamingResponse(
+        encode(rows, fmt, PROGRESS_NOTE_FIELDS),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="progress-notes.{fmt}"'},
+    )
 
 @router.get("/student-evaluations")
-def get_student_evals():
-    return deptchair_service.get_all_student_evaluations()
+def get_student_evals(request: Request,
+                      response: Response,
+                      limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                      cursor: Optional[str] = None,
+                      tutor_id: Optional[str] = None,
+                      class_id: Optional[str] = None,
+                      date_from: Optional[str] = None,
+                      date_to: Optional[str] = None,
+                      deptchair_service: DepartmentChairService = Depends(get_deptchair_service)):
+    unchanged = not_modified(request, response, make_etag(deptchair_service.student_evaluations_version()))
+    if unchanged:
+        return unchanged
+    try:
+        return fast_json(deptchair_service.page_student_evaluations(
+            limit=limit, cursor=cursor, tutor_id=tutor_id, class_id=class_id,
+            date_from=date_from, date_to=date_to,
+        ), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/student-evaluations/export")
+def export_student_evals(fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+                         tutor_id: Optional[str] = None,
+                         class_id: Optional[str] = None,
+                         date_from: Optional[str] = None,
+                         date_to: Optional[str] = None,
+                         deptchair_service: DepartmentChairService = Depends(get_deptchair_service)):
+    """Every matching student evaluation, streamed as NDJSON or CSV."""
+    rows = deptchair_service.export_student_evaluations(
+        tutor_id=tutor_id, class_id=class_id, date_from=date_from, date_to=date_to,
+    )
+    return StreamingResponse(
+        encode(rows, fmt, STUDENT_EVALUATION_FIELDS),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="student-evaluations.{fmt}"'},
+    )
 
 # @router.get("/tutors/pending")
 # def list_pending(service: DepartmentChairService = Depends()):
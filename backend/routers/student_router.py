@@ -1,9 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Optional
 
 from services.student_service import StudentService
+from container import get_student_service
+from routers.responses import fast_json
 from schemas.student_requests import (
     JoinClassRequest,
+    JoinBatchRequest,
     LeaveClassRequest,
     EvaluateTutorRequest
 )
@@ -18,39 +21,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-student_service = StudentService()
-
 @router.get("/{student_id}/browse")
-def browse_classes(student_id: str, subject: Optional[str] = None, tutor_id: Optional[str] = None):
+def browse_classes(student_id: str, subject: Optional[str] = None, tutor_id: Optional[str] = None,
+                   student_service: StudentService = Depends(get_student_service)):
     """
     Returns approved classes grouped by subject and tutor.
     Excludes classes the student is already enrolled in.
     """
     classes = student_service.browse_classes(student_id, subject, tutor_id)
 
-    logger.info(f"-STUDENT- Got classes: {classes}")
+    logger.info(f"-STUDENT- Got classes in {len(classes)} subject(s) for {student_id}")
 
-    return classes
+    return fast_json(classes)
 
 
 @router.post("/join")
-def join_class(payload: JoinClassRequest):
+def join_class(payload: JoinClassRequest,
+               student_service: StudentService = Depends(get_student_service)):
     logger.info(f"-STUDENT- Joining class for payload {payload}")
     try:
         result = student_service.join_class(payload.student_id, payload.class_id)
-        return {"success": True, "data": result}
+        return fast_json({"success": True, "data": result})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/join-batch")
+def join_classes(payload: JoinBatchRequest,
+                 student_service: StudentService = Depends(get_student_service)):
+    """
+    Enroll many (student_id, class_id) rows at once, e.g. a whole cohort.
+    Each row gets its own result; failing rows do not stop the others.
+    """
+    logger.info(f"-STUDENT- Joining {len(payload.rows)} row(s) in one batch")
+    results = student_service.join_batch([(r.student_id, r.class_id) for r in payload.rows])
+    joined = sum(1 for r in results if r["success"])
+    return {"joined": joined, "failed": len(results) - joined, "results": results}
+
+
 @router.post("/leave")
-def leave_class(payload: LeaveClassRequest):
+def leave_class(payload: LeaveClassRequest,
+                student_service: StudentService = Depends(get_student_service)):
     logger.info(f"-STUDENT- Leaving class for payload {payload}")
-    return student_service.leave_class(payload.student_id, payload.class_id)
+    try:
+        return fast_json(student_service.leave_class(payload.student_id, payload.class_id))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/evaluate")
-def evaluate_tutor(payload: EvaluateTutorRequest):
+def evaluate_tutor(payload: EvaluateTutorRequest,
+                   student_service: StudentService = Depends(get_student_service)):
     logger.info(f"-STUDENT- Evaluating for tutor in payload {payload}")
     return student_service.evaluate_tutor(
         payload.class_id,
@@ -61,6 +82,7 @@ def evaluate_tutor(payload: EvaluateTutorRequest):
 
 
 @router.get("/{student_id}/my-courses")
-def list_enrollments(student_id: str):
+def list_enrollments(student_id: str,
+                     student_service: StudentService = Depends(get_student_service)):
     logger.info(f"Listing enrolled classes for student {student_id}")
     return student_service.list_enrolled_classes(student_id)
@@ -1,6 +1,8 @@
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
 from services.tutor_service import TutorService, TutorDashboardService
-from services.class_offering_service import ClassOfferingService
+from container import get_tutor_service, get_tutor_dashboard_service
+from routers.responses import fast_json
 from schemas.tutor_requests import (
     OpenClassOfferingRequest,
     ProgressRequest
@@ -18,24 +20,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Tutor"])
 
-tutor_service = TutorService()
-offering_service = ClassOfferingService()
-
-tutor_dashboard_service = TutorDashboardService(
-    offering_service=tutor_service.offering_service,
-    report_service=tutor_service.report_service
-)
-
 
 @router.post("/{tutor_id}/open-class")
-def open_class(payload: OpenClassOfferingRequest):
+def open_class(payload: OpenClassOfferingRequest,
+               tutor_service: TutorService = Depends(get_tutor_service)):
     logger.info(f"-TUTOR- Opening class for payload {payload}")
     offering = ClassOffering(**payload.model_dump())
-    return tutor_service.open_class_offering(offering)
+    return fast_json(tutor_service.open_class_offering(offering))
 
 
 @router.post("/report")
-def submit_report(payload: dict):
+def submit_report(payload: dict,
+                  tutor_service: TutorService = Depends(get_tutor_service)):
     """
     Expected body:
     {
@@ -52,18 +48,28 @@ def submit_report(payload: dict):
     return tutor_service.submit_report(tutor_id, class_id, note)
 
 @router.get("/{tutor_id}/my-classes")
-def list_my_classes(tutor_id: str):
+def list_my_classes(tutor_id: str,
+                    term: Optional[str] = None,
+                    tutor_service: TutorService = Depends(get_tutor_service)):
     logger.info(f"-TUTOR- Listing classes for tutor {tutor_id}")
-    return tutor_service.list_my_classes(tutor_id)
+    try:
+        return fast_json(tutor_service.list_my_classes(tutor_id, term))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{tutor_id}/dashboard")
-def tutor_dashboard(tutor_id: str):
+def tutor_dashboard(tutor_id: str,
+                    term: Optional[str] = None,
+                    tutor_dashboard_service: TutorDashboardService = Depends(get_tutor_dashboard_service)):
     logger.info(f"-TUTOR- Fetching dashboard for tutor {tutor_id}")
 
-    summary = tutor_dashboard_service.dashboard_summary(tutor_id)
+    try:
+        summary = tutor_dashboard_service.dashboard_summary(tutor_id, term)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return summary
+    return fast_json(summary)
 
 
 
@@ -1,11 +1,14 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from models.class_offering import TimeSlot
 
 class ApproveRequest(BaseModel):
     offering_id: str
     room: Optional[str] = None
 
+class ApproveBatchRequest(BaseModel):
+    offerings: List[ApproveRequest]
+
 class RejectRequest(BaseModel):
     offering_id: str
     reason: Optional[str] = None
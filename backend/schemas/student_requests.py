@@ -1,9 +1,13 @@
+from typing import List
 from pydantic import BaseModel
 
 class JoinClassRequest(BaseModel):
     student_id: str
     class_id: str
 
+class JoinBatchRequest(BaseModel):
+    rows: List[JoinClassRequest]
+
 class LeaveClassRequest(BaseModel):
     student_id: str
     class_id: str
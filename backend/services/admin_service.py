@@ -1,10 +1,11 @@
 from repositories.rooms_repository import RoomRepository
 from typing import Optional
+from repositories.storage import make_room_repository
 
 
 class AdminService:
     def __init__(self, room_repo: Optional[RoomRepository] = None):
-        self.room_repo = room_repo or RoomRepository()
+        self.room_repo = room_repo or make_room_repository()
 
     def create_room(self, room_id: str, capacity: int):
         return self.room_repo.add_room(room_id, capacity)
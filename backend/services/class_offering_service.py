@@ -1,17 +1,38 @@
-from typing import List, Optional
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from repositories.class_offering_repository import ClassOfferingRepository
+from repositories.sequence_repository import SequenceRepository
+from repositories.storage import make_class_offering_repository, make_sequence_repository
+from repositories.concurrency import retry_on_conflict
+from repositories.pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, encode_cursor
 from models.class_offering import ClassOffering, TimeSlot
+from services.coverage import CoverageCounters
 
 
 class ClassOfferingService:
-    def __init__(self, repository: Optional[ClassOfferingRepository] = None):
-        self.repo = repository or ClassOfferingRepository()
+    ID_SEQUENCE = "class_offering"
+
+    def __init__(self, repository: Optional[ClassOfferingRepository] = None,
+                 sequences: Optional[SequenceRepository] = None):
+        self.repo = repository or make_class_offering_repository()
+        self.sequences = sequences or make_sequence_repository()
+
+        # Coverage counters, valid for one offerings version
+        self._coverage: Optional[CoverageCounters] = None
+        self._coverage_version = -1
+        self._coverage_lock = threading.Lock()
+
+        # Called as listener(offerings, version_before, version) after each write
+        self._save_listeners: List[Callable[[List[ClassOffering], int, int], None]] = []
+
+    def add_save_listener(self, listener: Callable[[List[ClassOffering], int, int], None]):
+        """Let a projection of the offerings follow the saves made through this service."""
+        self._save_listeners.append(listener)
 
     # Tutor creates class offering (subject, time, mode, etc.)
+    # Retried in case the new id gets taken between allocation and save
+    @retry_on_conflict()
     def create_offering(self, offering: ClassOffering):
-        # Load all existing classes
-        data = self.list_all()
-
         if isinstance(offering.timeslot, dict):
             try:
                 print("-Tutor Creating Offering- Timeslot is a Dictionary")
@@ -21,22 +42,17 @@ class ClassOfferingService:
                 # Handle case where the dict keys don't match TimeSlot fields
                 raise ValueError(f"Invalid keys in timeslot dictionary: {e}")
 
-        # Get max ID
-        max_id = 0
-        for cls in data:
-            cls_num = int(cls.id.split("-")[1])
-            if cls_num > max_id:
-                max_id = cls_num
         # Assign next ID
-        offering.id = f"cls-{str(max_id + 1).zfill(3)}"
+        offering.id = self._next_id()
         offering.status = "Pending"
         offering.enrolled_students = []
         offering.room = None
         offering.meeting_link = None
-        return self.repo.save(offering)
+        return self._save(offering)
 
 
     # Coordinator approves or rejects offering
+    @retry_on_conflict()
     def approve_offering(self, class_id: str, room: Optional[str] = None):
         offering = self.repo.get(class_id)
         offering.status = "Approved"
@@ -45,31 +61,168 @@ class ClassOfferingService:
         if offering.delivery_mode == "offline":
             offering.room = room
 
-        self.repo.save(offering)
-        return offering
+        return self._save(offering)
+
+
+    @retry_on_conflict()
+    def approve_offerings(self, approvals: Sequence[Tuple[str, Optional[str]]]) -> List[ClassOffering]:
+        """approve_offering for several (class_id, room) pairs, in one write."""
+        offerings = []
+        for class_id, room in approvals:
+            offering = self.repo.get(class_id)
+            offering.status = "Approved"
+            if offering.delivery_mode == "offline":
+                offering.room = room
+            offerings.append(offering)
+        return self._save_many(offerings) if offerings else []
+
 
+    @retry_on_conflict()
+    def assign_rooms(self, assignments: Dict[str, str]) -> List[ClassOffering]:
+        """Store proposed rooms (class id -> room) on offerings that are still pending, in one write."""
+        offerings = []
+        for class_id, room in assignments.items():
+            offering = self.repo.get(class_id)
+            if offering and offering.status == "Pending" and offering.delivery_mode == "offline":
+                offering.room = room
+                offerings.append(offering)
+        return self._save_many(offerings) if offerings else []
 
+
+    @retry_on_conflict()
     def reject_offering(self, class_id: str, reason: str):
         offering = self.repo.get(class_id)
         offering.status = "Rejected"
 
         # optionally store reason in a metadata field
-        self.repo.save(offering)
-        return offering
+        return self._save(offering)
+
+
+    def reserve_ids(self, count: int) -> List[str]:
+        """Reserve a block of offering ids (e.g. for a bulk import)."""
+        numbers = self.sequences.reserve(self.ID_SEQUENCE, count, seed=self._max_id_number)
+        return [self._offering_id(n) for n in numbers]
+
+    def _next_id(self) -> str:
+        # Skips ids taken by offerings written without the sequence (e.g. restored files)
+        while True:
+            offering_id = self._offering_id(self.sequences.next(self.ID_SEQUENCE, seed=self._max_id_number))
+            if self.repo.get(offering_id) is None:
+                return offering_id
+
+    @staticmethod
+    def _offering_id(number: int) -> str:
+        return f"cls-{str(number).zfill(3)}"
+
+    def _max_id_number(self) -> int:
+        # Seeds the sequence once, from the offerings created before it existed.
+        # Archived terms count too, so their ids are never handed out again.
+        max_id = 0
+        for term in [None, *self.repo.archived_terms()]:
+            for cls in self.list_all(term):
+                number = cls.id.split("-")[-1]
+                if number.isdigit():
+                    max_id = max(max_id, int(number))
+        return max_id
+
+    # List approved / pending / all offerings (current ones, or those of a term)
+    def list_approved(self, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.repo.list_by_status("Approved", term=term)
 
+    def list_pending(self, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.repo.list_by_status("Pending", term=term)
 
-    # List approved / pending / all offerings
-    def list_approved(self) -> List[ClassOffering]:
-        return [o for o in self.repo.list_all() if o.status == "Approved"]
+    def list_all(self, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.repo.list_all(term)
 
-    def list_pending(self) -> List[ClassOffering]:
-        return [o for o in self.repo.list_all() if o.status == "Pending"]
+    def list_by_tutor(self, tutor_id: str, term: Optional[str] = None) -> List[ClassOffering]:
+        return self.repo.list_by_tutor(tutor_id, term=term)
 
-    def list_all(self) -> List[ClassOffering]:
-        return self.repo.list_all()
+    def list_terms(self) -> List[dict]:
+        return self.repo.list_terms()
+
+    def check_not_archived(self, offering: ClassOffering):
+        """Raise ValueError if offering belongs to an archived, read-only term."""
+        term = self.repo.archived_term(offering)
+        if term is not None:
+            raise ValueError(f"Class {offering.id} belongs to archived term {term} and cannot be changed.")
+
+    def coverage(self, term: Optional[str] = None) -> CoverageCounters:
+        """
+        Counters for the current offerings. Kept up to date by this service's
+        own saves; rebuilt from a full scan only when something else wrote.
+        The counters of a given term are counted for the call.
+        """
+        if term is not None:
+            return CoverageCounters.build(self.list_all(term))
+
+        version = self.repo.version()
+        with self._coverage_lock:
+            if self._coverage is None or self._coverage_version != version:
+                self._coverage = CoverageCounters.build(self.list_all())
+                self._coverage_version = version
+            return self._coverage
+
+    def rebuild_coverage(self) -> CoverageCounters:
+        with self._coverage_lock:
+            self._coverage = None
+        return self.coverage()
+
+    def verify_coverage(self) -> bool:
+        """Whether the maintained counters match a full scan of the offerings."""
+        counters = self.coverage()
+        return counters == CoverageCounters.build(self.list_all())
+
+    def _save(self, offering: ClassOffering) -> ClassOffering:
+        return self._save_many([offering])[0]
+
+    def _save_many(self, offerings: List[ClassOffering]) -> List[ClassOffering]:
+        version_before = self.repo.version()
+        if len(offerings) == 1:
+            saved = [self.repo.save(offerings[0])]
+        else:
+            saved = self.repo.save_many(offerings)
+
+        # Our own write bumped the version by exactly one: patch the counters.
+        # Anything else means another writer got in between, so rebuild lazily.
+        version = self.repo.version()
+        with self._coverage_lock:
+            if (self._coverage is not None
+                    and self._coverage_version == version_before
+                    and version == version_before + 1):
+                for offering in saved:
+                    self._coverage.put(offering)
+                self._coverage_version = version
+            else:
+                self._coverage = None
+
+        for listener in self._save_listeners:
+            listener(saved, version_before, version)
+        return saved
+
+    def list_page(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                  statuses: Sequence[str] = (), subject: Optional[str] = None,
+                  tutor_id: Optional[str] = None, date_from: Optional[str] = None,
+                  date_to: Optional[str] = None, term: Optional[str] = None) -> Page[ClassOffering]:
+        """
+        One page of offerings matching the filters (date range on the timeslot
+        start). Current offerings only, unless a term is given.
+        """
+        items, more = self.repo.page(
+            statuses=statuses,
+            subject=subject,
+            tutor_id=tutor_id,
+            date_from=date_from,
+            date_to=date_to,
+            after=decode_cursor(cursor),
+            limit=limit,
+            term=term,
+        )
+        return Page(items, encode_cursor(items[-1].id) if more else None)
 
 
     # Enrollment handling (StudentService)
+    @retry_on_conflict()
     def add_student(self, class_id: str, student_id: str):
         offering = self.repo.get(class_id)
 
@@ -82,9 +235,25 @@ class ClassOfferingService:
 
         offering.enrolled_students.append(student_id)
 
-        self.repo.save(offering)
-        return offering
+        return self._save(offering)
 
+    @retry_on_conflict()
+    def add_students(self, rosters: Dict[str, List[str]]) -> List[ClassOffering]:
+        """
+        Append students to several class rosters (class id -> student ids) in
+        one write. Classes that are missing, no longer approved or archived are skipped:
+        only the offerings returned were updated.
+        """
+        offerings = []
+        for class_id, student_ids in rosters.items():
+            offering = self.repo.get(class_id)
+            if not offering or offering.status != "Approved" or self.repo.archived_term(offering):
+                continue
+            offering.enrolled_students = (offering.enrolled_students or []) + list(student_ids)
+            offerings.append(offering)
+        return self._save_many(offerings) if offerings else []
+
+    @retry_on_conflict()
     def remove_student(self, class_id: str, student_id: str):
         offering = self.repo.get(class_id)
         if not offering:
@@ -94,18 +263,34 @@ class ClassOfferingService:
             raise ValueError(f"Student {student_id} is not enrolled in class {class_id}")
 
         offering.enrolled_students.remove(student_id)
-        self.repo.save(offering)
-        return offering
+        return self._save(offering)
+
+    @retry_on_conflict()
+    def add_progress_note(self, class_id: str, tutor_id: str, timestamp: str, note: str):
+        """Add a tutor's class-level progress note, keyed by its timestamp."""
+        class_obj = self.repo.get(class_id)
+
+        if class_obj.tutor_id != tutor_id:
+            raise ValueError("Tutor is not assigned to this class")
+
+        # Check if progress_notes is None and initialize it if necessary
+        if class_obj.progress_notes is None:
+            class_obj.progress_notes = {}
+
+        # Now that we guarantee it's a dictionary, assignment works
+        class_obj.progress_notes[timestamp] = note
+
+        return self._save(class_obj)
 
     def get_by_id(self, class_id: str):
         return self.repo.get(class_id)
 
     # Progress and reports (TutorService)
+    @retry_on_conflict()
     def record_progress(self, class_id: str, student_id: str, notes: str):
         offering = self.repo.get(class_id)
 
         # assume offering.progress_notes is dict[str, str]
         offering.progress_notes[student_id] = notes
 
-        self.repo.save(offering)
-        return offering
+        return self._save(offering)
@@ -1,7 +1,12 @@
-from typing import Optional, List
+import threading
+from typing import List, Optional, Sequence, Tuple
 from services.class_offering_service import ClassOfferingService
 from repositories.user_repository import UserRepository
 from repositories.rooms_repository import RoomRepository
+from repositories.storage import make_user_repository, make_room_repository
+from repositories.pagination import DEFAULT_PAGE_SIZE, Page
+from services.schedule_index import OfferingConflictIndex, resolve_overlaps
+from services.room_assignment import assign_rooms, seats_needed
 
 
 class CoordinatorService:
@@ -10,101 +15,247 @@ class CoordinatorService:
                  user_repo: Optional[UserRepository] = None,
                  room_repo: Optional[RoomRepository] = None):
         self.offering_service = offering_service or ClassOfferingService()
-        self.user_repo = user_repo or UserRepository()
-        self.room_repo = room_repo or RoomRepository()
+        self.user_repo = user_repo or make_user_repository()
+        self.room_repo = room_repo or make_room_repository()
+
+        self._conflicts: Optional[OfferingConflictIndex] = None
+        self._conflicts_version = -1
+        self._approval_lock = threading.Lock()
 
 
     # Approve class offering (assigns room if offline)
     def approve_class(self, offering_id: str, room: Optional[str] = None):
+        # Serialise approvals so two overlapping classes cannot both pass the checks
+        with self._approval_lock:
+            offering = self.offering_service.repo.get(offering_id)
+            if not offering:
+                raise ValueError("Class offering not found.")
+
+            # Fall back to the room proposed by auto-assignment, if any
+            room = room or offering.room
+            rooms = {r["room_id"] for r in self.room_repo.list_rooms()}
+            error = self._approval_error(self._conflict_index(), rooms, offering, room)
+            if error:
+                raise ValueError(error)
+
+            # If all checks pass → approve
+            approved = self.offering_service.approve_offering(
+                class_id=offering_id,
+                room=room
+            )
+            self._record_change(approved)
+            return approved
+
+    # Approve many offerings at once (e.g. at term setup)
+    def approve_batch(self, approvals: Sequence[Tuple[str, Optional[str]]]) -> List[dict]:
+        """
+        Run the approve_class checks on every (offering_id, room) pair, then
+        approve all that pass in one write. Offerings in the batch are also
+        checked against each other: where two clash on a room or tutor, the
+        one starting first is approved. Returns one result per pair, in order.
+        """
+        results = [{"offering_id": offering_id, "approved": False, "room": room, "error": None}
+                   for offering_id, room in approvals]
+
+        with self._approval_lock:
+            conflicts = self._conflict_index()
+            rooms = {r["room_id"] for r in self.room_repo.list_rooms()}
+            candidates = []     # (row, offering, room, start, end)
+            seen = set()
+
+            for i, (offering_id, room) in enumerate(approvals):
+                offering = self.offering_service.repo.get(offering_id)
+                error = None
+                if offering_id in seen:
+                    error = "Class offering appears more than once in the batch."
+                elif not offering:
+                    error = "Class offering not found."
+                else:
+                    room = room or offering.room
+                    error = self._approval_error(conflicts, rooms, offering, room)
+                seen.add(offering_id)
+
+                if error:
+                    results[i]["error"] = error
+                    continue
+                candidates.append((
+                    i, offering, room if offering.delivery_mode == "offline" else None,
+                    offering.timeslot.start_minute, offering.timeslot.end_minute,
+                ))
+
+            # Clashes among the batch itself, in one sweep by start time
+            clashes = resolve_overlaps([
+                (offering.id, start, end,
+                 ([("room", room)] if room else []) + [("tutor", offering.tutor_id)])
+                for _, offering, room, start, end in candidates
+            ])
+
+            accepted = []
+            for i, offering, room, _, _ in candidates:
+                clash = clashes.get(offering.id)
+                if clash is None:
+                    accepted.append((i, offering.id, room))
+                elif clash[0][0] == "room":
+                    results[i]["error"] = f"Room '{room}' is already booked for class '{clash[1]}'."
+                else:
+                    results[i]["error"] = (
+                        f"Tutor '{offering.tutor_id}' has another class ('{clash[1]}') "
+                        "that overlaps with this timeslot."
+                    )
+
+            if accepted:
+                approved = self.offering_service.approve_offerings(
+                    [(offering_id, room) for _, offering_id, room in accepted]
+                )
+                self._record_changes(approved)
+                for (i, _, _), offering in zip(accepted, approved):
+                    results[i]["approved"] = True
+                    results[i]["room"] = offering.room
 
-        offering = self.offering_service.repo.get(offering_id)
-        if not offering:
-            raise ValueError("Class offering not found.")
+        return results
+
+    def _approval_error(self, conflicts: OfferingConflictIndex, rooms: set,
+                        offering, room: Optional[str]) -> Optional[str]:
+        """Why approve_class would refuse offering (against approved classes), or None."""
+        start = offering.timeslot.start_minute
+        end = offering.timeslot.end_minute
 
         # If class is offline, room MUST be provided
         if offering.delivery_mode == "offline":
             if not room:
-                raise ValueError("Offline classes require a room assignment.")
+                return "Offline classes require a room assignment."
 
             # Validate room exists
-            room_obj = self.room_repo.get_room(room)
-            if not room_obj:
-                raise ValueError("Assigned room does not exist.")
-
-            # --- NEW: ROOM CONFLICT CHECK ---
-            for other in self.offering_service.repo.list_all():
-                if other.id == offering.id:
-                    continue
-                if other.delivery_mode != "offline":
-                    continue
-                if other.room != room:
-                    continue
-                if other.status != "Approved":
-                    continue
-
-                if timeslot_overlaps(
-                        offering.timeslot.start,
-                        offering.timeslot.end,
-                        other.timeslot.start,
-                        other.timeslot.end
-                ):
-                    raise ValueError(
-                        f"Room '{room}' is already booked for class '{other.id}'."
-                    )
-
-        # --- OPTIONAL: TUTOR CONFLICT CHECK ---
-        for other in self.offering_service.repo.list_all():
-            if other.id == offering.id:
-                continue
-            if other.tutor_id != offering.tutor_id:
-                continue
-            if other.status != "Approved":
-                continue
-
-            if timeslot_overlaps(
-                    offering.timeslot.start,
-                    offering.timeslot.end,
-                    other.timeslot.start,
-                    other.timeslot.end
-            ):
-                raise ValueError(
-                    f"Tutor '{offering.tutor_id}' has another class ('{other.id}') "
-                    "that overlaps with this timeslot."
-                )
-
-        # If all checks pass → approve
-        return self.offering_service.approve_offering(
-            class_id=offering_id,
-            room=room
-        )
+            if room not in rooms:
+                return "Assigned room does not exist."
+
+            # --- ROOM CONFLICT CHECK ---
+            clashes = conflicts.room_conflicts(room, start, end, exclude=offering.id)
+            if clashes:
+                return f"Room '{room}' is already booked for class '{clashes[0]}'."
+
+        # --- TUTOR CONFLICT CHECK ---
+        clashes = conflicts.tutor_conflicts(offering.tutor_id, start, end, exclude=offering.id)
+        if clashes:
+            return (
+                f"Tutor '{offering.tutor_id}' has another class ('{clashes[0]}') "
+                "that overlaps with this timeslot."
+            )
+        return None
+
+    # Propose rooms for every pending offline offering (and store them unless dry_run)
+    def auto_assign_rooms(self, dry_run: bool = False) -> dict:
+        with self._approval_lock:
+            pending = [o for o in self.offering_service.list_pending() if o.delivery_mode == "offline"]
+            rooms = {r["room_id"]: r["capacity"] for r in self.room_repo.list_rooms()}
+            assigned, unassigned = assign_rooms(pending, rooms, self._conflict_index())
+
+            if assigned and not dry_run:
+                self.offering_service.assign_rooms(assigned)
+
+        by_id = {o.id: o for o in pending}
+        return {
+            "dry_run": dry_run,
+            "assigned": len(assigned),
+            "unassignable": len(unassigned),
+            "assignments": [
+                {"offering_id": oid, "room": room, "capacity": rooms[room],
+                 "seats_needed": seats_needed(by_id[oid])}
+                for oid, room in assigned.items()
+            ],
+            "unassigned": [
+                {"offering_id": oid, "reason": reason} for oid, reason in unassigned.items()
+            ],
+        }
 
     # Reject class offering
     def reject_class(self, offering_id: str, reason: Optional[str] = None):
         if not reason:
             raise ValueError("Rejection requires a reason from the coordinator.")
-        return self.offering_service.reject_offering(offering_id, reason)
+        with self._approval_lock:
+            rejected = self.offering_service.reject_offering(offering_id, reason)
+            self._record_change(rejected)
+            return rejected
+
+    def _conflict_index(self) -> OfferingConflictIndex:
+        """
+        Room/tutor interval index over approved offerings. Rebuilt only when
+        the offerings changed through something other than this service.
+        """
+        version = self.offering_service.repo.version()
+        if self._conflicts is None or self._conflicts_version != version:
+            self._conflicts = OfferingConflictIndex.build(self.offering_service.list_approved())
+            self._conflicts_version = version
+        return self._conflicts
+
+    def _record_change(self, offering):
+        self._record_changes([offering])
+
+    def _record_changes(self, offerings):
+        # Our own write bumped the version by exactly one: patch the index.
+        # Anything else means another writer got in between, so rebuild lazily.
+        version = self.offering_service.repo.version()
+        if self._conflicts is not None and version == self._conflicts_version + 1:
+            for offering in offerings:
+                self._conflicts.put(offering)
+            self._conflicts_version = version
+        else:
+            self._conflicts = None
 
     # Monitor subject coverage:
-    # Count how many classes exist per subject
-    def monitor_subject_coverage(self) -> dict:
-        offerings = self.offering_service.list_all()
-
-        summary = {}
-        for o in offerings:
-            summary[o.subject] = summary.get(o.subject, 0) + 1
-
-        return summary
-
+    # Count how many classes exist per subject (served from maintained counters)
+    def monitor_subject_coverage(self, term: Optional[str] = None) -> dict:
+        return self.offering_service.coverage(term).by_subject()
+
+    # Counts and enrolled seats per subject, status and delivery mode
+    def subject_coverage_breakdown(self, term: Optional[str] = None) -> dict:
+        return self.offering_service.coverage(term).breakdown()
+
+    # Rebuild the counters from a full scan; reports whether the old ones matched
+    def rebuild_subject_coverage(self) -> dict:
+        consistent = self.offering_service.verify_coverage()
+        counters = self.offering_service.rebuild_coverage()
+        return {"consistent": consistent, "offerings": len(counters)}
+
+
+    def _page(self, shown_statuses: tuple, limit: int, cursor: Optional[str],
+              status: Optional[str], subject: Optional[str], tutor_id: Optional[str],
+              date_from: Optional[str], date_to: Optional[str], term: Optional[str]) -> Page:
+        # A status filter can only narrow the statuses a view shows
+        statuses = shown_statuses
+        if status:
+            statuses = (status,) if status in shown_statuses else ()
+        if not statuses:
+            return Page([])
+
+        return self.offering_service.list_page(
+            limit=limit, cursor=cursor, statuses=statuses, subject=subject,
+            tutor_id=tutor_id, date_from=date_from, date_to=date_to, term=term,
+        )
 
-    # View list of all offerings
-    def view_class_list(self) -> List[dict]:
-        all_offerings = self.offering_service.list_all()
-        approved_offerings = [o for o in all_offerings if o.status != "Pending"]
+    # View list of all offerings (one page at a time)
+    def view_class_list(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                        status: Optional[str] = None, subject: Optional[str] = None,
+                        tutor_id: Optional[str] = None, date_from: Optional[str] = None,
+                        date_to: Optional[str] = None, term: Optional[str] = None) -> Page[dict]:
+        # Everything that has been decided on (approved, rejected, completed, ...)
+        shown = tuple(s for s in self.offering_service.repo.list_statuses(term) if s != "Pending")
+        page = self._page(shown, limit, cursor,
+                          status, subject, tutor_id, date_from, date_to, term)
+        approved_offerings = page.items
         result = []
 
+        # Resolve every tutor and student referenced on the page in one batch
+        user_ids = set()
+        for offering in approved_offerings:
+            if offering.tutor_id:
+                user_ids.add(offering.tutor_id)
+            user_ids.update(offering.enrolled_students or [])
+        users = self.user_repo.get_many(user_ids)
+
         for offering in approved_offerings:
             # Tutor lookup
-            tutor = self.user_repo.get_by_id(offering.tutor_id) if offering.tutor_id else None
+            tutor = users.get(offering.tutor_id) if offering.tutor_id else None
             tutor_name = getattr(tutor, "name", None) if tutor else None
             tutor_name = tutor_name or "Unknown Tutor"
 
@@ -112,11 +263,7 @@ class CoordinatorService:
             enrolled_ids = offering.enrolled_students or []
             enrolled_students = []
             for stu_id in enrolled_ids:
-                try:
-                    stu_obj = self.user_repo.get_by_id(stu_id)
-
-                except Exception:
-                    stu_obj = None
+                stu_obj = users.get(stu_id)
 
                 if stu_obj:
                     enrolled_students.append({
@@ -146,18 +293,25 @@ class CoordinatorService:
                 "progress_notes": offering.progress_notes or {},
             })
 
-        return result
-
-
-    def view_pending_rejected_classes(self) -> List[dict]:
-        all_offerings = self.offering_service.list_all()
+        return Page(result, page.next_cursor)
+
+
+    def view_pending_rejected_classes(self, limit: int = DEFAULT_PAGE_SIZE,
+                                      cursor: Optional[str] = None,
+                                      status: Optional[str] = None,
+                                      subject: Optional[str] = None,
+                                      tutor_id: Optional[str] = None,
+                                      date_from: Optional[str] = None,
+                                      date_to: Optional[str] = None,
+                                      term: Optional[str] = None) -> Page[dict]:
+        page = self._page(("Pending", "Rejected"), limit, cursor,
+                          status, subject, tutor_id, date_from, date_to, term)
+        offerings = page.items
+        tutors = self.user_repo.get_many(o.tutor_id for o in offerings)
         result = []
 
-        for offering in all_offerings:
-            if offering.status not in ["Pending", "Rejected"]:
-                continue
-
-            tutor = self.user_repo.get_by_id(offering.tutor_id)
+        for offering in offerings:
+            tutor = tutors.get(offering.tutor_id)
             tutor_name = tutor.name if tutor else "Unknown Tutor"
 
             result.append({
@@ -173,10 +327,17 @@ class CoordinatorService:
                 "progress_notes": offering.progress_notes,
             })
 
-        return result
+        return Page(result, page.next_cursor)
 
     def get_rooms(self):
         return self.room_repo.list_rooms()
 
+    # Dataset versions the views depend on (for ETags)
+    def class_list_versions(self) -> tuple:
+        return self.offering_service.repo.version(), self.user_repo.version()
+
+    def rooms_version(self) -> int:
+        return self.room_repo.version()
+
 def timeslot_overlaps(start1, end1, start2, end2):
     return start1 < end2 and start2 < end1
@@ -0,0 +1,76 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+
+from models.class_offering import ClassOffering
+
+# (subject, status, delivery mode)
+CoverageKey = Tuple[str, str, str]
+
+
+class CoverageCounters:
+    """
+    Offering counts and enrolled seat totals per (subject, status, delivery mode).
+
+    Every offering's contribution is remembered under its id, so replacing an
+    offering (status change, roster change) is O(1): take away what it added
+    before, add what it adds now. No scan of the other offerings is needed.
+    """
+
+    def __init__(self):
+        self.classes: Counter = Counter()
+        self.seats: Counter = Counter()
+        self._by_id: Dict[str, Tuple[CoverageKey, int]] = {}
+
+    @classmethod
+    def build(cls, offerings: Iterable[ClassOffering]) -> "CoverageCounters":
+        counters = cls()
+        for offering in offerings:
+            counters.put(offering)
+        return counters
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __eq__(self, other) -> bool:
+        # Counter equality ignores keys that dropped to zero
+        return (isinstance(other, CoverageCounters)
+                and +self.classes == +other.classes
+                and +self.seats == +other.seats)
+
+    def put(self, offering: ClassOffering):
+        """Count offering, replacing whatever it contributed before."""
+        self.remove(offering.id)
+        key = (offering.subject, offering.status, offering.delivery_mode)
+        seats = len(offering.enrolled_students or [])
+        self.classes[key] += 1
+        self.seats[key] += seats
+        self._by_id[offering.id] = (key, seats)
+
+    def remove(self, offering_id: str):
+        entry = self._by_id.pop(offering_id, None)
+        if entry is None:
+            return
+        key, seats = entry
+        self.classes[key] -= 1
+        self.seats[key] -= seats
+        if not self.classes[key]:
+            del self.classes[key]
+            del self.seats[key]
+
+    def by_subject(self) -> Dict[str, int]:
+        """Number of offerings per subject (any status or mode)."""
+        summary: Dict[str, int] = {}
+        for (subject, _, _), n in self.classes.items():
+            summary[subject] = summary.get(subject, 0) + n
+        return summary
+
+    def breakdown(self) -> Dict[str, Dict[str, Dict[str, dict]]]:
+        """subject -> status -> delivery mode -> {"classes", "enrolled"}."""
+        result: Dict[str, Dict[str, Dict[str, dict]]] = {}
+        for key in sorted(self.classes, key=lambda k: tuple(str(p) for p in k)):
+            subject, status, mode = key
+            result.setdefault(subject, {}).setdefault(status, {})[mode] = {
+                "classes": self.classes[key],
+                "enrolled": self.seats[key],
+            }
+        return result
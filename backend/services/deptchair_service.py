@@ -1,21 +1,98 @@
-from typing import Optional
+from typing import Iterator, Optional
 from repositories.class_offering_repository import ClassOfferingRepository
 from repositories.report_repository import ReportRepository
+from repositories.storage import make_class_offering_repository, make_report_repository
+from repositories.pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, encode_cursor
+
+# Records fetched per repository call while streaming an export
+EXPORT_BATCH_SIZE = 500
+
+PROGRESS_NOTE_FIELDS = ["class_id", "tutor_id", "timestamp", "content"]
+STUDENT_EVALUATION_FIELDS = ["report_id", "class_id", "tutor_id", "student_id", "date", "content"]
+
 
 class DepartmentChairService:
     def __init__(self,
                  class_repo: Optional[ClassOfferingRepository] = None,
                  report_repo: Optional[ReportRepository] = None):
-        self.class_repo = class_repo or ClassOfferingRepository()
-        self.report_repo = report_repo or ReportRepository()
+        self.class_repo = class_repo or make_class_offering_repository()
+        self.report_repo = report_repo or make_report_repository()
 
     # --- Reports ---
-    def get_all_tutor_progress_notes(self):
-        return self.class_repo.get_progress_notes_all()
+    def get_all_tutor_progress_notes(self, term: Optional[str] = None):
+        return self.class_repo.get_progress_notes_all(term)
 
     def get_all_student_evaluations(self):
         return self.report_repo.list_student_evaluations()
 
+    def page_tutor_progress_notes(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                  subject: Optional[str] = None, tutor_id: Optional[str] = None,
+                                  date_from: Optional[str] = None,
+                                  date_to: Optional[str] = None,
+                                  term: Optional[str] = None) -> Page[dict]:
+        after = decode_cursor(cursor, list)
+        if after is not None and len(after) != 2:
+            raise ValueError("Invalid cursor")
+
+        notes, more = self.class_repo.page_progress_notes(
+            subject=subject, tutor_id=tutor_id, date_from=date_from, date_to=date_to,
+            after=after, limit=limit, term=term,
+        )
+        next_cursor = encode_cursor([notes[-1]["class_id"], notes[-1]["timestamp"]]) if more else None
+        return Page(notes, next_cursor)
+
+    def page_student_evaluations(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                                 tutor_id: Optional[str] = None, class_id: Optional[str] = None,
+                                 date_from: Optional[str] = None,
+                                 date_to: Optional[str] = None) -> Page:
+        evaluations, more = self.report_repo.page_student_evaluations(
+            tutor_id=tutor_id, class_id=class_id, date_from=date_from, date_to=date_to,
+            after=decode_cursor(cursor), limit=limit,
+        )
+        return Page(evaluations, encode_cursor(evaluations[-1].report_id) if more else None)
+
+    # Dataset versions the lists depend on (for ETags)
+    def progress_notes_version(self) -> int:
+        return self.class_repo.version()
+
+    def student_evaluations_version(self) -> int:
+        return self.report_repo.version()
+
+    # --- Exports ---
+    # Generators that walk the same pages as above in large batches, so an
+    # export holds one batch in memory however many records there are.
+    def export_tutor_progress_notes(self, subject: Optional[str] = None,
+                                    tutor_id: Optional[str] = None,
+                                    date_from: Optional[str] = None,
+                                    date_to: Optional[str] = None,
+                                    term: Optional[str] = None) -> Iterator[dict]:
+        after = None
+        while True:
+            notes, more = self.class_repo.page_progress_notes(
+                subject=subject, tutor_id=tutor_id, date_from=date_from, date_to=date_to,
+                after=after, limit=EXPORT_BATCH_SIZE, term=term,
+            )
+            yield from notes
+            if not more:
+                return
+            after = (notes[-1]["class_id"], notes[-1]["timestamp"])
+
+    def export_student_evaluations(self, tutor_id: Optional[str] = None,
+                                   class_id: Optional[str] = None,
+                                   date_from: Optional[str] = None,
+                                   date_to: Optional[str] = None) -> Iterator[dict]:
+        after = None
+        while True:
+            evaluations, more = self.report_repo.page_student_evaluations(
+                tutor_id=tutor_id, class_id=class_id, date_from=date_from, date_to=date_to,
+                after=after, limit=EXPORT_BATCH_SIZE,
+            )
+            for evaluation in evaluations:
+                yield evaluation.model_dump()
+            if not more:
+                return
+            after = evaluations[-1].report_id
+
     # --- Tutor Management ---
     # def list_pending_tutors(self):
     #     return self.tutor_repo.list_pending()
@@ -1,7 +1,9 @@
-from typing import Optional, List
+from dataclasses import asdict
+from typing import Optional, List, Sequence, Tuple
 from repositories.enrollment_repository import EnrollmentRepository
 from repositories.class_offering_repository import ClassOfferingRepository
-from models.class_offering import Enrollment
+from repositories.storage import make_class_offering_repository, make_enrollment_repository
+from models.class_offering import ClassOffering, Enrollment
 
 import logging
 
@@ -16,8 +18,8 @@ class EnrollmentService:
     def __init__(self,
                  enrollment_repo: Optional[EnrollmentRepository] = None,
                  offering_repo: Optional[ClassOfferingRepository] = None):
-        self.enrollment_repo = enrollment_repo or EnrollmentRepository()
-        self.offering_repo = offering_repo or ClassOfferingRepository()
+        self.enrollment_repo = enrollment_repo or make_enrollment_repository()
+        self.offering_repo = offering_repo or make_class_offering_repository()
 
     def join_class(self, student_id: str, class_id: str) -> Optional[dict]:
         """
@@ -44,19 +46,35 @@ class EnrollmentService:
         return {"student_id": student_id, "class_id": class_id}
 
 
+    def join_classes(self, rows: Sequence[Tuple[str, ClassOffering]]) -> List[bool]:
+        """
+        Enroll many students at once, given (student_id, approved offering)
+        pairs. One write for all of them; returns, per row, whether the
+        enrollment was added (False: the student was already enrolled).
+        """
+        enrollments = [
+            Enrollment(student_id=student_id, class_id=offering.id,
+                       tutor_id=offering.tutor_id, enrollment_status="Enrolled")
+            for student_id, offering in rows
+        ]
+        return self.enrollment_repo.add_many(enrollments)
+
+
     def leave_class(self, student_id: str, class_id: str) -> Optional[dict]:
         """
         Remove enrollment record and remove student from offering.enrolled_students
         """
-        # Remove from enrollment repo (not implemented remove method; we can filter and save)
-        all_enroll = self.enrollment_repo._load()
-        new = [e for e in all_enroll if not (e.get("student_id") == student_id and e.get("class_id") == class_id)]
-        self.enrollment_repo._save(new)
+        self.enrollment_repo.remove(student_id, class_id)
 
         return {"student_id": student_id, "class_id": class_id}
 
 
+    def leave_classes(self, rows: Sequence[Tuple[str, str]]):
+        """Remove the (student_id, class_id) enrollment records in one write."""
+        self.enrollment_repo.remove_many(rows)
+
+
     def list_enrollments_for_student(self, student_id: str) -> List[dict]:
         rows = self.enrollment_repo.get_for_student(student_id)
         logger.info(rows)
-        return [r.__dict__ for r in rows]
+        return [asdict(r) for r in rows]
@@ -0,0 +1,53 @@
+"""
+Encoders for streamed exports. Each takes an iterable of flat dicts and
+yields text chunks, so rows are formatted as they are produced and the
+whole export never sits in memory.
+"""
+import csv
+import io
+from typing import Iterable, Iterator, Sequence
+
+from repositories.json_utils import dumps
+
+# Rows per yielded chunk: keeps the number of writes to the socket reasonable
+CHUNK_ROWS = 200
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def to_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    """One JSON object per line."""
+    chunk = []
+    for row in rows:
+        chunk.append(dumps(row).decode("utf-8"))
+        if len(chunk) == CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def to_csv(rows: Iterable[dict], fields: Sequence[str]) -> Iterator[str]:
+    """A header line followed by one line per row (missing fields are left empty)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode(rows: Iterable[dict], fmt: str, fields: Sequence[str]) -> Iterator[str]:
+    if fmt == "csv":
+        return to_csv(rows, fields)
+    return to_ndjson(rows)
@@ -1,35 +1,39 @@
-from typing import Dict, Any, Optional
+from typing import Callable, List, Optional
 from repositories.report_repository import ReportRepository
 from repositories.class_offering_repository import ClassOfferingRepository
+from repositories.sequence_repository import SequenceRepository
+from repositories.storage import make_class_offering_repository, make_report_repository, make_sequence_repository
 from models.report import Report
+from services.class_offering_service import ClassOfferingService
 from datetime import datetime
 
 
 class ReportService:
 
+    ID_SEQUENCE = "report"
+
     def __init__(self, report_repo: Optional[ReportRepository] = None,
-                 class_repo: Optional[ClassOfferingRepository] = None):
-        self.report_repo = report_repo or ReportRepository()
-        self.class_repo = class_repo or ClassOfferingRepository()
+                 class_repo: Optional[ClassOfferingRepository] = None,
+                 sequences: Optional[SequenceRepository] = None,
+                 offering_service: Optional[ClassOfferingService] = None):
+        self.report_repo = report_repo or make_report_repository()
+        self.class_repo = class_repo or make_class_offering_repository()
+        self.sequences = sequences or make_sequence_repository()
+        # Progress notes are saved through it, so its counters and listeners see them
+        self.offering_service = offering_service or ClassOfferingService(self.class_repo, self.sequences)
 
+        # Called as listener(report, version_before, version) after each new report
+        self._create_listeners: List[Callable[[Report, int, int], None]] = []
 
-    # TUTOR PROGRESS REPORT
-    def add_tutor_progress(self, class_id: str, tutor_id: str, note: str):
-        class_obj: Dict[str, Any] = self.class_repo.get(class_id)  # Assuming get returns a dict/object
+    def add_create_listener(self, listener: Callable[[Report, int, int], None]):
+        """Let a projection of the reports follow the reports created through this service."""
+        self._create_listeners.append(listener)
 
-        if class_obj.tutor_id != tutor_id:
-            raise ValueError("Tutor is not assigned to this class")
 
+    # TUTOR PROGRESS REPORT
+    def add_tutor_progress(self, class_id: str, tutor_id: str, note: str):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-
-        # Check if progress_notes is None and initialize it if necessary
-        if class_obj.progress_notes is None:
-            class_obj.progress_notes = {}
-
-        # Now that we guarantee it's a dictionary, assignment works
-        class_obj.progress_notes[timestamp] = note
-
-        self.class_repo.save(class_obj)
+        self.offering_service.add_progress_note(class_id, tutor_id, timestamp, note)
 
         return {"message": "Progress added", "timestamp": timestamp}
 
@@ -37,7 +41,7 @@ class ReportService:
     # STUDENT EVALUATION REPORT
     def add_student_evaluation(self, class_id: str, tutor_id: str, student_id: str, content: str):
         report = Report(
-            report_id=None,
+            report_id=self._next_id(),
             class_id=class_id,
             tutor_id=tutor_id,
             student_id=student_id,
@@ -46,7 +50,27 @@ class ReportService:
             date=datetime.now().strftime("%Y-%m-%d")
         )
 
-        return self.report_repo.create(report)
+        version_before = self.report_repo.version()
+        created = self.report_repo.create(report)
+        version = self.report_repo.version()
+
+        for listener in self._create_listeners:
+            listener(created, version_before, version)
+        return created
+
+
+    def _next_id(self) -> str:
+        number = self.sequences.next(self.ID_SEQUENCE, seed=self._max_id_number)
+        return f"rpt-{str(number).zfill(5)}"
+
+    def _max_id_number(self) -> int:
+        # Seeds the sequence once; reports created before it have random (uuid) ids
+        max_id = 0
+        for report in self.report_repo.list_all():
+            prefix, _, number = (report.report_id or "").partition("-")
+            if prefix == "rpt" and number.isdigit():
+                max_id = max(max_id, int(number))
+        return max_id
 
 
     # Retrieval
@@ -0,0 +1,57 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, Tuple
+
+from models.class_offering import ClassOffering
+from services.schedule_index import OfferingConflictIndex
+
+
+def seats_needed(offering: ClassOffering) -> int:
+    return len(offering.enrolled_students or [])
+
+
+def assign_rooms(offerings: Iterable[ClassOffering], rooms: Dict[str, int],
+                 booked: OfferingConflictIndex) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Give every offering a room that is large enough and free for its timeslot.
+
+    Greedy interval colouring: offerings are placed in order of start time
+    (larger classes first on ties), each in the smallest free room that fits.
+    Rooms are also kept free of the bookings already in `booked`. Placing by
+    start means the last offering put in a room is the only one of this run
+    that can still be using it, so checking a room is O(1) plus one lookup
+    in the booked index.
+
+    Returns (offering id -> room id, offering id -> why no room was found).
+    """
+    by_capacity = sorted(rooms.items(), key=lambda r: (r[1], r[0]))
+    capacities = [capacity for _, capacity in by_capacity]
+    last_end: Dict[str, int] = {}       # room -> end of the last offering placed in it
+
+    placed = []
+    for offering in offerings:
+        start = offering.timeslot.start_minute
+        end = offering.timeslot.end_minute
+        placed.append((start, -seats_needed(offering), offering.id, end))
+    placed.sort()
+
+    assigned: Dict[str, str] = {}
+    unassigned: Dict[str, str] = {}
+    for start, negative_need, offering_id, end in placed:
+        need = -negative_need
+        first = bisect_left(capacities, need)
+        if first == len(capacities):
+            unassigned[offering_id] = f"No room has {need} seats."
+            continue
+
+        for room, _ in by_capacity[first:]:
+            if last_end.get(room, start) > start:
+                continue
+            if booked.room_conflicts(room, start, end, exclude=offering_id):
+                continue
+            assigned[offering_id] = room
+            last_end[room] = end
+            break
+        else:
+            unassigned[offering_id] = f"No room with {need} or more seats is free at this time."
+
+    return assigned, unassigned
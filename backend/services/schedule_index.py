@@ -0,0 +1,145 @@
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from models.class_offering import ClassOffering, to_minutes
+
+
+class IntervalIndex:
+    """
+    A set of half-open intervals [start, end), each stored under a key,
+    answering "which intervals overlap [start, end)?".
+
+    Intervals are kept sorted by start. Anything overlapping [start, end)
+    must begin before `end` and no earlier than `start - longest interval`,
+    so a query bisects to that window instead of scanning every interval:
+    O(log n + k) for class-length intervals.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[int, int, str]] = []   # (start, end, key), sorted
+        self._by_key: Dict[str, Tuple[int, int, str]] = {}
+        self._max_length = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def keys(self):
+        return self._by_key.keys()
+
+    def add(self, key: str, start: int, end: int):
+        """Insert (or move) the interval stored under key."""
+        self.remove(key)
+        entry = (start, end, key)
+        insort(self._entries, entry)
+        self._by_key[key] = entry
+        self._max_length = max(self._max_length, end - start)
+
+    def remove(self, key: str):
+        entry = self._by_key.pop(key, None)
+        if entry is None:
+            return
+        del self._entries[bisect_left(self._entries, entry)]
+        if not self._entries:
+            self._max_length = 0
+
+    def overlapping(self, start: int, end: int, exclude: Optional[str] = None) -> List[str]:
+        """Keys of intervals overlapping [start, end), ordered by start."""
+        lo = bisect_right(self._entries, (start - self._max_length, float("inf")))
+        hi = bisect_left(self._entries, (end,))
+        return [
+            key
+            for (s, e, key) in self._entries[lo:hi]
+            if e > start and key != exclude
+        ]
+
+
+class OfferingConflictIndex:
+    """
+    Interval indexes over approved offerings: one per room (offline classes
+    only) and one per tutor. Used by the coordinator to find room and tutor
+    clashes without scanning the whole catalogue.
+    """
+
+    def __init__(self):
+        self.rooms: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+        self.tutors: Dict[str, IntervalIndex] = defaultdict(IntervalIndex)
+        self._placement: Dict[str, Tuple[Optional[str], str]] = {}   # id -> (room, tutor_id)
+
+    @classmethod
+    def build(cls, offerings: Iterable[ClassOffering]) -> "OfferingConflictIndex":
+        index = cls()
+        for offering in offerings:
+            index.put(offering)
+        return index
+
+    def put(self, offering: ClassOffering):
+        """Add, move or drop an offering so the index reflects its current state."""
+        self.discard(offering.id)
+        if offering.status != "Approved":
+            return
+
+        start = offering.timeslot.start_minute
+        end = offering.timeslot.end_minute
+
+        room = offering.room if offering.delivery_mode == "offline" else None
+        if room:
+            self.rooms[room].add(offering.id, start, end)
+        self.tutors[offering.tutor_id].add(offering.id, start, end)
+        self._placement[offering.id] = (room, offering.tutor_id)
+
+    def discard(self, offering_id: str):
+        placement = self._placement.pop(offering_id, None)
+        if placement is None:
+            return
+        room, tutor_id = placement
+        if room:
+            self.rooms[room].remove(offering_id)
+        self.tutors[tutor_id].remove(offering_id)
+
+    def room_conflicts(self, room: str, start: int, end: int,
+                       exclude: Optional[str] = None) -> List[str]:
+        if room not in self.rooms:
+            return []
+        return self.rooms[room].overlapping(start, end, exclude)
+
+    def tutor_conflicts(self, tutor_id: str, start: int, end: int,
+                        exclude: Optional[str] = None) -> List[str]:
+        if tutor_id not in self.tutors:
+            return []
+        return self.tutors[tutor_id].overlapping(start, end, exclude)
+
+
+def resolve_overlaps(intervals: Sequence[Tuple[str, int, int, Sequence[Hashable]]]
+                     ) -> Dict[str, Tuple[Hashable, str]]:
+    """
+    Pick a clash-free subset of intervals that each claim some resources
+    (a room, a tutor, ...), in one sweep over them by start time.
+
+    intervals: (key, start, end, resources). Ties on start keep the given order.
+    An interval is kept unless one of its resources is still held by a kept
+    interval. The kept intervals on a resource never overlap, so the last one
+    kept is the only one that can still hold it: each check is O(1).
+
+    Returns key -> (resource, key of the kept interval holding it) for every
+    interval that was dropped.
+    """
+    order = sorted(range(len(intervals)), key=lambda i: (intervals[i][1], i))
+    held: Dict[Hashable, Tuple[int, str]] = {}     # resource -> (end, key) of the last kept interval
+    dropped: Dict[str, Tuple[Hashable, str]] = {}
+
+    for i in order:
+        key, start, end, resources = intervals[i]
+        clash = next(
+            ((res, held[res][1]) for res in resources if res in held and held[res][0] > start),
+            None,
+        )
+        if clash is not None:
+            dropped[key] = clash
+            continue
+        for res in resources:
+            held[res] = (end, key)
+    return dropped
@@ -1,9 +1,12 @@
-from typing import Optional
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 from services.class_offering_service import ClassOfferingService
 from services.enrollment_service import EnrollmentService
 from services.report_service import ReportService
 from repositories.user_repository import UserRepository
-from datetime import datetime
+from repositories.storage import make_user_repository
+from services.schedule_index import IntervalIndex
+from repositories.concurrency import ConcurrentModificationError
 
 
 class StudentService:
@@ -15,32 +18,74 @@ class StudentService:
         self.offering_service = offering_service or ClassOfferingService()
         self.enrollment_service = enrollment_service or EnrollmentService()
         self.report_service = report_service or ReportService()
-        self.user_repo = user_repo or UserRepository()
+        self.user_repo = user_repo or make_user_repository()
+
+        # student_id -> timetable of enrolled classes, valid for one enrollments version
+        self._timetables: Dict[str, IntervalIndex] = {}
+        self._timetables_version = -1
+        self._schedule_lock = threading.Lock()
+
+        # Approved classes grouped by subject -> tutor -> (group, class ids):
+        # the part of browse that is the same for every student. Valid for
+        # one (offerings version, users version) pair.
+        self._catalogue: Optional[Dict[str, Dict[str, Tuple[dict, FrozenSet[str]]]]] = None
+        self._catalogue_versions: Optional[Tuple[int, int]] = None
+        self._catalogue_lock = threading.Lock()
 
     def browse_classes(self, student_id: str, subject: Optional[str] = None, tutor_id: Optional[str] = None):
-        # Get all approved offerings
-        offerings = self.offering_service.list_approved()
+        catalogue = self._browse_catalogue()
+
+        # Classes the student is already enrolled in
+        with self._schedule_lock:
+            enrolled = set(self._timetable(student_id).keys())
 
-        # Remove classes student is already enrolled in
-        enrolled = {e["class_id"] for e in self.enrollment_service.list_enrollments_for_student(student_id)}
-        offerings = [o for o in offerings if o.id not in enrolled]
+        results = {}
+        for subj, groups in catalogue.items():
+            # Apply optional subject filter
+            if subject and subj.lower() != subject.lower():
+                continue
+
+            for tid, (group, class_ids) in groups.items():
+                # Apply optional tutor filter
+                if tutor_id and tid != tutor_id:
+                    continue
+
+                # Share the cached group unless the student is in one of its classes
+                if not enrolled.isdisjoint(class_ids):
+                    classes = [c for c in group["classes"] if c["class_id"] not in enrolled]
+                    if not classes:
+                        continue
+                    group = {"tutor_info": group["tutor_info"], "classes": classes}
+
+                results.setdefault(subj, {})[tid] = group
+
+        return results
 
-        # Apply optional subject filter
-        if subject:
-            offerings = [o for o in offerings if o.subject.lower() == subject.lower()]
+    def _browse_catalogue(self) -> Dict[str, Dict[str, Tuple[dict, FrozenSet[str]]]]:
+        """
+        Rebuilt only when offerings or users changed in a way browse can see:
+        roster-only changes made by join/leave keep it (see _record_roster_change).
+        """
+        versions = (self.offering_service.repo.version(), self.user_repo.version())
+        with self._catalogue_lock:
+            if self._catalogue is None or self._catalogue_versions != versions:
+                self._catalogue = self._build_catalogue()
+                self._catalogue_versions = versions
+            return self._catalogue
 
-        # Apply optional tutor filter
-        if tutor_id:
-            offerings = [o for o in offerings if o.tutor_id == tutor_id]
+    def _build_catalogue(self) -> Dict[str, Dict[str, Tuple[dict, FrozenSet[str]]]]:
+        # Get all approved offerings
+        offerings = self.offering_service.list_approved()
 
         # Organize by subject -> tutor
+        tutors = self.user_repo.get_many(o.tutor_id for o in offerings)
         results = {}
         for o in offerings:
             if o.subject not in results:
                 results[o.subject] = {}
 
             # Get tutor info from user repository
-            tutor = self.user_repo.get_by_id(o.tutor_id)
+            tutor = tutors.get(o.tutor_id)
             tutor_info = {
                 "tutor_name": tutor.name if tutor else "Unknown",
                 "tutor_email": tutor.email if tutor else None,
@@ -61,35 +106,218 @@ class StudentService:
                 "status": o.status,
             })
 
-        return results
+        return {
+            subj: {
+                tid: (group, frozenset(c["class_id"] for c in group["classes"]))
+                for tid, group in groups.items()
+            }
+            for subj, groups in results.items()
+        }
+
+    def _record_roster_change(self, version_before: int):
+        # A join/leave only edits the class roster, which browse does not show.
+        # If our save was the only offerings write, the catalogue is still valid.
+        version = self.offering_service.repo.version()
+        with self._catalogue_lock:
+            if (self._catalogue_versions is not None
+                    and self._catalogue_versions[0] == version_before
+                    and version == version_before + 1):
+                self._catalogue_versions = (version, self._catalogue_versions[1])
 
     # Join a class: update enrollment record + class roster
     def join_class(self, student_id: str, class_id: str):
         target = self.offering_service.get_by_id(class_id)
+        if not target:
+            raise ValueError("Class offering not found.")
+        self.offering_service.check_not_archived(target)
 
-        enrolled_classes = self.list_enrolled_classes(student_id)
+        start = target.timeslot.start_minute
+        end = target.timeslot.end_minute
 
-        # Check for schedule conflicts
-        for cls in enrolled_classes:
-            a_start = datetime.fromisoformat(cls["timeslot"].start)
-            a_end = datetime.fromisoformat(cls["timeslot"].end)
-            b_start = datetime.fromisoformat(target.timeslot.start)
-            b_end = datetime.fromisoformat(target.timeslot.end)
+        with self._schedule_lock:
+            # Check for schedule conflicts
+            clashes = self._timetable(student_id).overlapping(start, end)
+            if clashes:
+                raise ValueError("Schedule conflict with class " + clashes[0])
 
-            # Overlap condition
-            if a_start < b_end and b_start < a_end:
-                raise ValueError("Schedule conflict with class " + cls["class_id"])
+            # Add record to enrollment list
+            self.enrollment_service.join_class(student_id, class_id)
 
-        # Add record to enrollment list
-        self.enrollment_service.join_class(student_id, class_id)
+            # Add student to offering list
+            version_before = self.offering_service.repo.version()
+            offering = self.offering_service.add_student(class_id, student_id)
+            self._record_roster_change(version_before)
 
-        # Add student to offering list
-        return self.offering_service.add_student(class_id, student_id)
+            self._record_enrollment_change(
+                student_id, lambda timetable: timetable.add(class_id, start, end)
+            )
+            return offering
 
     # Leave a class
     def leave_class(self, student_id: str, class_id: str):
-        self.enrollment_service.leave_class(student_id, class_id)
-        return self.offering_service.remove_student(class_id, student_id)
+        # Refused before the enrollment is removed: an archived roster cannot follow
+        target = self.offering_service.get_by_id(class_id)
+        if target:
+            self.offering_service.check_not_archived(target)
+
+        with self._schedule_lock:
+            self.enrollment_service.leave_class(student_id, class_id)
+            self._record_enrollment_change(
+                student_id, lambda timetable: timetable.remove(class_id)
+            )
+        version_before = self.offering_service.repo.version()
+        offering = self.offering_service.remove_student(class_id, student_id)
+        self._record_roster_change(version_before)
+        return offering
+
+    # Join many classes at once (e.g. loading a whole cohort)
+    def join_batch(self, rows: Sequence[Tuple[str, str]]) -> List[dict]:
+        """
+        Enroll every (student_id, class_id) row that passes the join_class
+        checks. Rows are checked in order, against the students' timetables
+        and the rows accepted before them; the accepted ones are then written
+        with one enrollments write and one offerings write. Rows whose roster
+        could not be updated (e.g. the class was rejected meanwhile) fail and
+        their enrollments are removed again.
+        Returns one result per row, in order.
+        """
+        results = [{"student_id": s, "class_id": c, "success": False, "error": None} for s, c in rows]
+
+        with self._schedule_lock:
+            offerings = {class_id: self.offering_service.get_by_id(class_id)
+                         for class_id in {c for _, c in rows}}
+            timetables = self._timetables_for({s for s, _ in rows})
+            joined: Dict[str, IntervalIndex] = {}    # rows accepted so far, per student
+            accepted = []                            # (row, student_id, offering, start, end)
+
+            for i, (student_id, class_id) in enumerate(rows):
+                offering = offerings[class_id]
+                if not offering:
+                    results[i]["error"] = "Class offering not found."
+                    continue
+
+                start = offering.timeslot.start_minute
+                end = offering.timeslot.end_minute
+                batch = joined.setdefault(student_id, IntervalIndex())
+                clashes = (timetables[student_id].overlapping(start, end)
+                           or batch.overlapping(start, end))
+                if clashes:
+                    results[i]["error"] = "Schedule conflict with class " + clashes[0]
+                    continue
+
+                if offering.status != "Approved":
+                    results[i]["error"] = "Cannot join an unapproved class."
+                    continue
+
+                try:
+                    self.offering_service.check_not_archived(offering)
+                except ValueError as e:
+                    results[i]["error"] = str(e)
+                    continue
+
+                batch.add(class_id, start, end)
+                accepted.append((i, student_id, offering, start, end))
+
+            if not accepted:
+                return results
+
+            added = self.enrollment_service.join_classes([(s, o) for _, s, o, _, _ in accepted])
+
+            rosters: Dict[str, List[str]] = {}
+            enrolled = []                            # (row, student_id, class_id, start, end)
+            for (i, student_id, offering, start, end), was_added in zip(accepted, added):
+                if not was_added:
+                    results[i]["error"] = "Student is already enrolled in this class."
+                    continue
+                rosters.setdefault(offering.id, []).append(student_id)
+                enrolled.append((i, student_id, offering.id, start, end))
+
+            if not enrolled:
+                return results
+
+            # A class may have been rejected since it was checked: add_students
+            # skips it, and a lost write race leaves every roster unchanged
+            version_before = self.offering_service.repo.version()
+            try:
+                updated = {o.id for o in self.offering_service.add_students(rosters)}
+                error = "Cannot join an unapproved class."
+            except ConcurrentModificationError as e:
+                updated, error = set(), str(e)
+            self._record_roster_change(version_before)
+
+            # The enrollments are already written: take back those whose roster was not
+            undone = [(s, c) for _, s, c, _, _ in enrolled if c not in updated]
+            if undone:
+                self.enrollment_service.leave_classes(undone)
+
+            changes: Dict[str, List[Tuple[str, int, int]]] = {}
+            for i, student_id, class_id, start, end in enrolled:
+                if class_id not in updated:
+                    results[i]["error"] = error
+                    continue
+                changes.setdefault(student_id, []).append((class_id, start, end))
+                results[i]["success"] = True
+
+            self._record_enrollment_changes({
+                student_id: self._adding(adds) for student_id, adds in changes.items()
+            })
+
+        return results
+
+    @staticmethod
+    def _adding(intervals: List[Tuple[str, int, int]]) -> Callable[[IntervalIndex], None]:
+        def apply(timetable: IntervalIndex):
+            for class_id, start, end in intervals:
+                timetable.add(class_id, start, end)
+        return apply
+
+    def _timetable(self, student_id: str) -> IntervalIndex:
+        """
+        The student's enrolled classes as an interval index. Built from the
+        enrollments on first use, then patched by join/leave. Offering
+        timeslots are never edited, so only enrollment changes invalidate it.
+        """
+        return self._timetables_for([student_id])[student_id]
+
+    def _timetables_for(self, student_ids: Iterable[str]) -> Dict[str, IntervalIndex]:
+        """_timetable for several students; the missing ones are built in one read."""
+        version = self.enrollment_service.enrollment_repo.version()
+        if version != self._timetables_version:
+            self._timetables.clear()
+            self._timetables_version = version
+
+        student_ids = list(student_ids)
+        missing = [sid for sid in student_ids if sid not in self._timetables]
+        if missing:
+            enrollments = self.enrollment_service.enrollment_repo.get_for_students(missing)
+            for sid, rows in enrollments.items():
+                timetable = IntervalIndex()
+                for enr in rows:
+                    offering = self.offering_service.get_by_id(enr.class_id)
+                    if offering:
+                        timetable.add(
+                            offering.id,
+                            offering.timeslot.start_minute,
+                            offering.timeslot.end_minute,
+                        )
+                self._timetables[sid] = timetable
+        return {sid: self._timetables[sid] for sid in student_ids}
+
+    def _record_enrollment_change(self, student_id: str, apply):
+        self._record_enrollment_changes({student_id: apply})
+
+    def _record_enrollment_changes(self, changes: Dict[str, Callable[[IntervalIndex], object]]):
+        # Our own write bumped the version by exactly one: patch the timetables.
+        # Anything else means another writer got in between, so start over.
+        version = self.enrollment_service.enrollment_repo.version()
+        if version == self._timetables_version + 1:
+            for student_id, apply in changes.items():
+                if student_id in self._timetables:
+                    apply(self._timetables[student_id])
+            self._timetables_version = version
+        else:
+            self._timetables.clear()
+            self._timetables_version = -1
 
     # Student evaluates tutor / class
     def evaluate_tutor(self, class_id: str, tutor_id: str, student_id: str, content: str):
@@ -104,16 +332,22 @@ class StudentService:
     # List student's enrolled classes (based on enrollments)
     def list_enrolled_classes(self, student_id: str):
         enrollments = self.enrollment_service.list_enrollments_for_student(student_id)
+        offerings = {
+            enr["class_id"]: self.offering_service.get_by_id(enr["class_id"])
+            for enr in enrollments
+        }
+        tutors = self.user_repo.get_many(o.tutor_id for o in offerings.values() if o)
         results = []
 
         for enr in enrollments:
-            offering = self.offering_service.get_by_id(enr["class_id"])
-
-            tutor_name = self.user_repo.get_by_id(offering.tutor_id).name
+            offering = offerings[enr["class_id"]]
 
             if not offering:
                 continue  # class deleted or missing
 
+            tutor = tutors.get(offering.tutor_id)
+            tutor_name = tutor.name if tutor else "Unknown Tutor"
+
             results.append({
                 "class_id": enr["class_id"],
                 "status": enr["enrollment_status"],
@@ -0,0 +1,93 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models.class_offering import ClassOffering
+
+
+@dataclass
+class TutorDashboard:
+    """What one tutor's dashboard shows, kept ready to serve."""
+    upcoming: List[Tuple[int, str]] = field(default_factory=list)   # (start minute, class id) of approved classes, sorted
+    pending_reports: Set[str] = field(default_factory=set)          # completed classes nobody has reported on
+    active_students: int = 0                                         # enrolled seats in classes not yet completed
+
+
+class DashboardProjection:
+    """
+    Per-tutor dashboards built in one pass over offerings and reports.
+
+    Every offering's contribution is derived from the offering itself, so
+    replacing an offering (approval, roster change, completion) only touches
+    its own tutor's dashboard: no other offering or report is looked at.
+    """
+
+    def __init__(self):
+        self.tutors: Dict[str, TutorDashboard] = {}
+        self.reported: Set[str] = set()                 # class ids with at least one report
+        self._by_id: Dict[str, ClassOffering] = {}
+        # class id -> (tutor id, upcoming entry or None, completed?, seats counted)
+        self._contributions: Dict[str, Tuple[str, Optional[Tuple[int, str]], bool, int]] = {}
+
+    @classmethod
+    def build(cls, offerings: Iterable[ClassOffering],
+              reported_class_ids: Iterable[str]) -> "DashboardProjection":
+        projection = cls()
+        projection.reported.update(reported_class_ids)
+        for offering in offerings:
+            projection.put_offering(offering)
+        return projection
+
+    def get(self, tutor_id: str) -> TutorDashboard:
+        return self.tutors.get(tutor_id) or TutorDashboard()
+
+    def offering(self, class_id: str) -> ClassOffering:
+        return self._by_id[class_id]
+
+    def upcoming(self, tutor_id: str, now_minute: int) -> List[ClassOffering]:
+        """The tutor's approved classes starting after now_minute, by start time."""
+        entries = self.get(tutor_id).upcoming
+        first = bisect_left(entries, (now_minute + 1,))
+        return [self._by_id[class_id] for _, class_id in entries[first:]]
+
+    def put_offering(self, offering: ClassOffering):
+        """Account for offering, replacing whatever it contributed before."""
+        self.remove_offering(offering.id)
+        self._by_id[offering.id] = offering
+        dashboard = self.tutors.setdefault(offering.tutor_id, TutorDashboard())
+
+        entry = None
+        if offering.status == "Approved":
+            entry = (offering.timeslot.start_minute, offering.id)
+            insort(dashboard.upcoming, entry)
+
+        completed = offering.status == "Completed"
+        seats = 0
+        if completed:
+            if offering.id not in self.reported:
+                dashboard.pending_reports.add(offering.id)
+        else:
+            seats = len(offering.enrolled_students or [])
+            dashboard.active_students += seats
+
+        self._contributions[offering.id] = (offering.tutor_id, entry, completed, seats)
+
+    def remove_offering(self, class_id: str):
+        self._by_id.pop(class_id, None)
+        contribution = self._contributions.pop(class_id, None)
+        if contribution is None:
+            return
+        tutor_id, entry, completed, seats = contribution
+        dashboard = self.tutors[tutor_id]
+
+        if entry is not None:
+            del dashboard.upcoming[bisect_left(dashboard.upcoming, entry)]
+        if completed:
+            dashboard.pending_reports.discard(class_id)
+        dashboard.active_students -= seats
+
+    def add_report(self, class_id: str):
+        self.reported.add(class_id)
+        contribution = self._contributions.get(class_id)
+        if contribution is not None:
+            self.tutors[contribution[0]].pending_reports.discard(class_id)
@@ -1,9 +1,13 @@
-from typing import Optional
+import threading
+from typing import List, Optional, Tuple
 from services.class_offering_service import ClassOfferingService
 from services.report_service import ReportService
-from models.class_offering import ClassOffering
+from services.tutor_dashboard import DashboardProjection
+from models.class_offering import ClassOffering, to_minutes
+from models.report import Report
 from datetime import datetime
 from repositories.user_repository import UserRepository
+from repositories.storage import make_user_repository
 
 class TutorService:
     def __init__(self,
@@ -12,7 +16,7 @@ class TutorService:
                  user_repo: Optional[UserRepository] = None):
         self.offering_service = offering_service or ClassOfferingService()
         self.report_service = report_service or ReportService()
-        self.user_repo = user_repo or UserRepository()
+        self.user_repo = user_repo or make_user_repository()
 
     # Tutor opens a class (creates a ClassOffering)
     def open_class_offering(self, offering: ClassOffering):
@@ -26,11 +30,8 @@ class TutorService:
             note=note,
         )
 
-    def list_my_classes(self, tutor_id: str):
-        all_offerings = self.offering_service.list_all()
-        offerings = [o for o in all_offerings if o.tutor_id == tutor_id]
-
-        return offerings
+    def list_my_classes(self, tutor_id: str, term: Optional[str] = None):
+        return self.offering_service.list_by_tutor(tutor_id, term)
 
 
 class TutorDashboardService:
@@ -40,56 +41,84 @@ class TutorDashboardService:
         self.offering_service = offering_service
         self.report_service = report_service
 
-    def get_upcoming_classes(self, tutor_id: str):
-        classes = self._get_tutor_classes(tutor_id)
-        now = datetime.now()
+        # Every tutor's dashboard, valid for one (offerings version, reports version) pair
+        self._projection: Optional[DashboardProjection] = None
+        self._projection_versions: Optional[Tuple[int, int]] = None
+        self._projection_lock = threading.Lock()
 
-        upcoming_classes = [c for c in classes if c.status == "Approved"]
+        offering_service.add_save_listener(self._record_offering_change)
+        report_service.add_create_listener(self._record_report_change)
 
-        upcoming = [
-            c for c in upcoming_classes
-            if datetime.fromisoformat(c.timeslot.start) > now
-        ]
-        return sorted(upcoming,
-                      key=lambda c: c.timeslot.start)
+    def get_upcoming_classes(self, tutor_id: str):
+        return self._dashboards().upcoming(tutor_id, to_minutes(datetime.now().isoformat()))
 
 
     def get_pending_reports(self, tutor_id: str):
-        classes = self._get_tutor_classes(tutor_id)
-        pending = []
-
-        completed_classes = [c for c in classes if c.status == "Completed"]
-        for c in completed_classes:
-            reports = self.report_service.get_reports_for_class(c.id)
-            if len(reports) == 0:
-                pending.append(c)
-
-        return pending
+        projection = self._dashboards()
+        return [projection.offering(class_id)
+                for class_id in sorted(projection.get(tutor_id).pending_reports)]
 
 
     def get_total_active_students(self, tutor_id: str):
-        classes = self._get_tutor_classes(tutor_id)
-        active_classes = [c for c in classes if c.status != "Completed"]
-        return sum(len(c.enrolled_students) if c.enrolled_students else 0
-                   for c in active_classes)
+        return self._dashboards().get(tutor_id).active_students
 
 
-    def dashboard_summary(self, tutor_id: str):
-        upcoming = self.get_upcoming_classes(tutor_id)
-        pending = self.get_pending_reports(tutor_id)
-        total_students = self.get_total_active_students(tutor_id)
+    def dashboard_summary(self, tutor_id: str, term: Optional[str] = None):
+        projection = self._dashboards(term)
+        dashboard = projection.get(tutor_id)
+        upcoming = projection.upcoming(tutor_id, to_minutes(datetime.now().isoformat()))
 
         return {
             "quick_stats": {
                 "upcoming_classes": len(upcoming),
-                "pending_reports": len(pending),
-                "total_students": total_students,
+                "pending_reports": len(dashboard.pending_reports),
+                "total_students": dashboard.active_students,
             },
             "upcoming_classes_detail": upcoming[:3]
         }
 
-    def _get_tutor_classes(self, tutor_id: str):
-        return [
-            o for o in self.offering_service.list_all()
-            if o.tutor_id == tutor_id
-        ]
+    def _dashboards(self, term: Optional[str] = None) -> DashboardProjection:
+        """
+        Built in one pass over offerings and reports, then patched by the
+        offering saves and new reports made through the shared services.
+        Rebuilt only when something else wrote to either file.
+        The dashboards of a given term are built for the call.
+        """
+        if term is not None:
+            return DashboardProjection.build(
+                self.offering_service.list_all(term),
+                (r.class_id for r in self.report_service.report_repo.list_all()),
+            )
+
+        versions = (self.offering_service.repo.version(), self.report_service.report_repo.version())
+        with self._projection_lock:
+            if self._projection is None or self._projection_versions != versions:
+                self._projection = DashboardProjection.build(
+                    self.offering_service.list_all(),
+                    (r.class_id for r in self.report_service.report_repo.list_all()),
+                )
+                self._projection_versions = versions
+            return self._projection
+
+    # Our own write bumped its file's version by exactly one: patch the projection.
+    # Anything else means another writer got in between, so rebuild lazily.
+    def _record_offering_change(self, offerings: List[ClassOffering], version_before: int, version: int):
+        with self._projection_lock:
+            if (self._projection_versions is not None
+                    and self._projection_versions[0] == version_before
+                    and version == version_before + 1):
+                for offering in offerings:
+                    self._projection.put_offering(offering)
+                self._projection_versions = (version, self._projection_versions[1])
+            else:
+                self._projection = None
+
+    def _record_report_change(self, report: Report, version_before: int, version: int):
+        with self._projection_lock:
+            if (self._projection_versions is not None
+                    and self._projection_versions[1] == version_before
+                    and version == version_before + 1):
+                self._projection.add_report(report.class_id)
+                self._projection_versions = (self._projection_versions[0], version)
+            else:
+                self._projection = None
@@ -0,0 +1,70 @@
+"""
+Shared fixtures. Every test runs against a copy of backend/data in its own
+temporary directory, with JSON storage, so the real data files are never
+touched.
+
+Run from the backend directory:
+    python -m pytest tests
+"""
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND))
+
+import container as container_module
+from repositories import (
+    enrollment_repository,
+    report_repository,
+    user_repository,
+)
+from repositories.class_offering_repository import ClassOfferingRepository
+from repositories.enrollment_repository import EnrollmentRepository
+from repositories.report_repository import ReportRepository
+from repositories.rooms_repository import RoomRepository
+from repositories.sequence_repository import SequenceRepository
+from repositories.user_repository import UserRepository
+
+logging.disable(logging.CRITICAL)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch) -> Path:
+    """A private copy of the data files; every repository module points at it."""
+    for path in (BACKEND / "data").glob("*.json"):
+        shutil.copy(path, tmp_path / path.name)
+
+    monkeypatch.setattr(enrollment_repository, "DATA_FILE", tmp_path / "enrollments.json")
+    monkeypatch.setattr(report_repository, "DATA_FILE", tmp_path / "reports.json")
+    monkeypatch.setattr(user_repository, "DATA_FILE", tmp_path / "users.json")
+
+    factories = {
+        "make_class_offering_repository": lambda: ClassOfferingRepository(
+            tmp_path / "class_offerings.json", tmp_path / "archive"),
+        "make_enrollment_repository": EnrollmentRepository,
+        "make_report_repository": ReportRepository,
+        "make_user_repository": UserRepository,
+        "make_room_repository": lambda: RoomRepository(tmp_path / "rooms.json"),
+        "make_sequence_repository": lambda: SequenceRepository(tmp_path / "sequences.json"),
+    }
+    for name, factory in factories.items():
+        monkeypatch.setattr(container_module, name, factory)
+    return tmp_path
+
+
+@pytest.fixture
+def services(data_dir) -> container_module.ServiceContainer:
+    return container_module.ServiceContainer()
+
+
+@pytest.fixture
+def client(services, monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    monkeypatch.setattr(app.state, "container", services)
+    return TestClient(app)
@@ -0,0 +1,26 @@
+from models.class_offering import ClassOffering, TimeSlot
+
+
+def _propose(services, tutor_id, start, end):
+    offering = ClassOffering(id="", subject="Discrete Math", tutor_id=tutor_id,
+                             timeslot=TimeSlot(start=start, end=end), delivery_mode="offline")
+    return services.offering_service.create_offering(offering).id
+
+
+def test_batch_approves_the_earlier_of_two_clashing_classes(services):
+    first = _propose(services, "tut-001", "2025-12-08T09:00", "2025-12-08T11:00")
+    second = _propose(services, "tut-002", "2025-12-08T10:00", "2025-12-08T12:00")
+
+    results = services.coordinator_service.approve_batch([
+        (second, "B1-201"),
+        (first, "B1-201"),
+        ("cls-999", "B1-201"),
+    ])
+
+    assert [r["approved"] for r in results] == [False, True, False]
+    assert results[0]["error"] == f"Room 'B1-201' is already booked for class '{first}'."
+    assert results[2]["error"] == "Class offering not found."
+
+    repo = services.class_offering_repo
+    assert (repo.get(first).status, repo.get(first).room) == ("Approved", "B1-201")
+    assert repo.get(second).status == "Pending"
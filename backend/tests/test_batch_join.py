@@ -0,0 +1,57 @@
+STUDENTS = ("stu-batch-a", "stu-batch-b", "stu-batch-c")
+
+
+def _enrolled(services, student_id):
+    return {e.class_id for e in services.enrollment_repo.get_for_student(student_id)}
+
+
+def _on_roster(services, student_id):
+    return {o.id for o in services.offering_service.list_all()
+            if student_id in (o.enrolled_students or [])}
+
+
+def test_failing_rows_leave_enrollments_and_rosters_consistent(client, services, monkeypatch):
+    join_classes = services.enrollment_service.join_classes
+
+    def join_then_reject(rows):
+        added = join_classes(rows)
+        # A coordinator rejects one of the classes before the rosters are written
+        services.coordinator_service.reject_class("cls-005", "Room flooded")
+        return added
+
+    monkeypatch.setattr(services.enrollment_service, "join_classes", join_then_reject)
+
+    rows = [
+        ("stu-batch-a", "cls-004"),
+        ("stu-batch-a", "cls-999"),    # unknown class
+        ("stu-batch-a", "cls-011"),    # still pending
+        ("stu-batch-b", "cls-001"),
+        ("stu-batch-b", "cls-010"),    # overlaps cls-001, accepted just before
+        ("stu-batch-b", "cls-005"),    # rejected mid-batch
+        ("stu-batch-c", "cls-006"),
+        ("stu-batch-c", "cls-006"),    # same row twice
+    ]
+    response = client.post("/students/join-batch",
+                           json={"rows": [{"student_id": s, "class_id": c} for s, c in rows]})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert [r["success"] for r in body["results"]] == [
+        True, False, False, True, False, False, True, False,
+    ]
+    assert body["joined"] == 3 and body["failed"] == 5
+    errors = [r["error"] for r in body["results"]]
+    assert errors[1] == "Class offering not found."
+    assert errors[2] == "Cannot join an unapproved class."
+    assert errors[4].startswith("Schedule conflict")
+    assert errors[5] == "Cannot join an unapproved class."
+    assert errors[7].startswith("Schedule conflict")
+
+    expected = {
+        "stu-batch-a": {"cls-004"},
+        "stu-batch-b": {"cls-001"},
+        "stu-batch-c": {"cls-006"},
+    }
+    for student_id in STUDENTS:
+        assert _enrolled(services, student_id) == expected[student_id]
+        assert _on_roster(services, student_id) == expected[student_id]
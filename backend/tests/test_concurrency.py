@@ -0,0 +1,42 @@
+import pytest
+
+from repositories.concurrency import ConcurrentModificationError
+
+
+def test_stale_save_is_rejected(services):
+    repo = services.class_offering_repo
+    first = repo.get("cls-001")
+    second = repo.get("cls-001")
+
+    first.meeting_link = "https://meet.example/first"
+    repo.save(first)
+
+    second.meeting_link = "https://meet.example/second"
+    with pytest.raises(ConcurrentModificationError):
+        repo.save(second)
+    assert repo.get("cls-001").meeting_link == "https://meet.example/first"
+    assert repo.get("cls-001").version == first.version
+
+
+def test_conflicting_save_is_retried(services, monkeypatch):
+    service = services.offering_service
+    read = service.repo.get
+    reads = []
+
+    def racing_get(class_id):
+        offering = read(class_id)
+        if not reads:
+            # Another writer saves the class right after this first read
+            other = read(class_id)
+            other.progress_notes = {**(other.progress_notes or {}), "2025-12-01 10:00": "concurrent"}
+            service.repo.save(other)
+        reads.append(class_id)
+        return offering
+
+    monkeypatch.setattr(service.repo, "get", racing_get)
+    service.add_student("cls-001", "stu-retry")
+
+    assert len(reads) == 2
+    stored = read("cls-001")
+    assert "stu-retry" in stored.enrolled_students
+    assert stored.progress_notes["2025-12-01 10:00"] == "concurrent"
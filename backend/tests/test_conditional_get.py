@@ -0,0 +1,23 @@
+def test_matching_etag_returns_304(client):
+    first = client.get("/coordinator/classes")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get("/coordinator/classes", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_write_changes_the_etag(client):
+    etag = client.get("/coordinator/classes").headers["etag"]
+
+    rejected = client.post("/coordinator/reject",
+                           json={"offering_id": "cls-011", "reason": "No tutor available"})
+    assert rejected.status_code == 200
+
+    after = client.get("/coordinator/classes", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["etag"] != etag
+    statuses = {item["id"]: item["status"] for item in after.json()["items"]}
+    assert statuses["cls-011"] == "Rejected"
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from repositories.codec import loads
+from repositories.json_utils import (
+    compact_json,
+    delete_records,
+    invalidate_cache,
+    load_json,
+    put_record,
+    put_records,
+    save_json,
+)
+
+EXPECTED = [{"id": "a", "n": 10}, {"id": "b", "n": 20}, {"id": "d", "n": 4}]
+
+
+def _write_changes(path: Path):
+    save_json(path, [{"id": "a", "n": 1}, {"id": "b", "n": 2}])
+    put_record(path, {"id": "a", "n": 10})
+    put_record(path, {"id": "c", "n": 3})
+    put_records(path, [{"id": "b", "n": 20}, {"id": "d", "n": 4}])
+    delete_records(path, {"id": "c"})
+
+
+def test_replayed_log_matches_compacted_snapshot(tmp_path):
+    path = tmp_path / "records.json"
+    log = Path(f"{path}.log")
+    _write_changes(path)
+
+    assert load_json(path) == EXPECTED
+    assert log.stat().st_size > 0
+
+    # What a fresh process sees: the snapshot with the log replayed on top
+    invalidate_cache(path)
+    assert load_json(path) == EXPECTED
+
+    compact_json(path)
+    assert not log.exists() or log.stat().st_size == 0
+    assert loads(path.read_bytes()) == EXPECTED
+    invalidate_cache(path)
+    assert load_json(path) == EXPECTED
+
+
+def test_torn_last_log_line_is_skipped(tmp_path):
+    path = tmp_path / "records.json"
+    _write_changes(path)
+
+    # A crash in the middle of an append leaves half a line behind
+    with open(f"{path}.log", "ab") as f:
+        f.write(b'{"op": "put", "match": {"id": "e"}, "rec')
+
+    invalidate_cache(path)
+    assert load_json(path) == EXPECTED
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from repositories.json_utils import save_json
+
+
+@pytest.fixture
+def many_offerings(data_dir):
+    """Pads the offerings file out to a few pages, each class with two notes."""
+    path = data_dir / "class_offerings.json"
+    offerings = json.loads(path.read_text(encoding="utf-8"))
+    template = offerings[0]
+    for n in range(100, 123):
+        offerings.append({
+            **template,
+            "id": f"cls-{n:03d}",
+            "enrolled_students": [],
+            "progress_notes": {
+                "2025-11-20 08:00": f"Week 1 notes for {n}.",
+                "2025-11-27 08:00": f"Week 2 notes for {n}.",
+            },
+        })
+    save_json(path, offerings)
+    return offerings
+
+
+def _collect(client, url, limit):
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_offering_pages_return_every_offering_once(many_offerings, client):
+    ids = [item["id"] for item in _collect(client, "/offerings/", limit=5)]
+
+    assert ids == sorted(o["id"] for o in many_offerings)
+
+
+def test_progress_note_pages_return_every_note_once(many_offerings, client):
+    notes = _collect(client, "/dept_chair/progress-notes", limit=2)
+    keys = [(note["class_id"], note["timestamp"]) for note in notes]
+
+    expected = {(o["id"], ts) for o in many_offerings for ts in o.get("progress_notes") or {}}
+    assert len(keys) == len(set(keys))
+    assert set(keys) == expected
@@ -3,10 +3,29 @@ import { AuthContext } from "../auth/AuthContext";
 import axios from "axios";
 import Navbar from "../components/Navbar";
 
+const PAGE_SIZE = 25;
+
+// One page of pending/rejected classes: { items, next_cursor }
+async function fetchClassPage(statusFilter, cursor) {
+  const params = new URLSearchParams({ limit: PAGE_SIZE });
+  if (statusFilter) params.set("status", statusFilter);
+  if (cursor) params.set("cursor", cursor);
+
+  const res = await fetch(`http://localhost:8000/coordinator/classes/pending?${params}`);
+  const data = await res.json();
+  return {
+    items: Array.isArray(data?.items) ? data.items : [],
+    nextCursor: data?.next_cursor || null,
+  };
+}
+
 export default function CoordinatorManageClass() {
   const { user } = useContext(AuthContext);
 
   const [classes, setClasses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [statusFilter, setStatusFilter] = useState(""); // "", "Pending" or "Rejected"
+  const [loadingMore, setLoadingMore] = useState(false);
   const [rooms, setRooms] = useState([]); // normalized array of {room_id, capacity}
   const [loading, setLoading] = useState(true);
 
@@ -30,12 +49,11 @@ export default function CoordinatorManageClass() {
     async function loadData() {
       setLoading(true);
       try {
-        const [classRes, roomRes] = await Promise.all([
-          fetch("http://localhost:8000/coordinator/classes/pending"),
+        const [classPage, roomRes] = await Promise.all([
+          fetchClassPage(statusFilter, null),
           fetch("http://localhost:8000/coordinator/rooms"),
         ]);
 
-        const classData = await classRes.json();
         const roomData = await roomRes.json();
 
         console.log("Room Data:", roomData);
@@ -57,11 +75,13 @@ export default function CoordinatorManageClass() {
 
         console.log("Loaded rooms (normalized):", normalizedRooms);
 
-        setClasses(Array.isArray(classData) ? classData : []);
+        setClasses(classPage.items);
+        setNextCursor(classPage.nextCursor);
         setRooms(normalizedRooms);
       } catch (err) {
         console.error("Error loading pending/rejected classes or rooms:", err);
         setClasses([]);
+        setNextCursor(null);
         setRooms([]);
       } finally {
         setLoading(false);
@@ -69,18 +89,33 @@ export default function CoordinatorManageClass() {
     }
 
     loadData();
-  }, [user]);
+  }, [user, statusFilter]);
 
+  // Reload from the first page (after approve/reject the list changes)
   async function refreshClasses() {
     try {
-      const classRes = await fetch("http://localhost:8000/coordinator/classes/pending");
-      const classData = await classRes.json();
-      setClasses(Array.isArray(classData) ? classData : []);
+      const classPage = await fetchClassPage(statusFilter, null);
+      setClasses(classPage.items);
+      setNextCursor(classPage.nextCursor);
     } catch (err) {
       console.error("Error refreshing classes:", err);
     }
   }
 
+  async function loadMoreClasses() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const classPage = await fetchClassPage(statusFilter, nextCursor);
+      setClasses((prev) => [...prev, ...classPage.items]);
+      setNextCursor(classPage.nextCursor);
+    } catch (err) {
+      console.error("Error loading more classes:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   // Approve
   async function handleApproveConfirm() {
     const { classId, deliveryMode, selectedRoom } = approveModal;
@@ -155,6 +190,13 @@ export default function CoordinatorManageClass() {
 
       <h2 style={{ marginTop: "20px" }}>Manage Pending / Rejected Classes</h2>
 
+      <label style={{ marginRight: "8px" }}>Show</label>
+      <select value={statusFilter} onChange={(e) => setStatusFilter(e.target.value)}>
+        <option value="">Pending and rejected</option>
+        <option value="Pending">Pending only</option>
+        <option value="Rejected">Rejected only</option>
+      </select>
+
       {classes.length === 0 ? (
         <p>No pending or rejected classes.</p>
       ) : (
@@ -210,6 +252,12 @@ export default function CoordinatorManageClass() {
         </table>
       )}
 
+      {nextCursor && (
+        <button style={{ ...btnSecondary, marginTop: "12px" }} onClick={loadMoreClasses} disabled={loadingMore}>
+          {loadingMore ? "Loading…" : "Load more"}
+        </button>
+      )}
+
       {/* Approve modal */}
       {approveModal.open && (
         <div style={modalOverlay}>
@@ -3,11 +3,28 @@ import { AuthContext } from "../auth/AuthContext";
 import axios from "axios";
 import Navbar from "../components/Navbar";
 
+const PAGE_SIZE = 50;
+
+// One page of a paginated list endpoint: { items, next_cursor }
+async function fetchPage(path, cursor) {
+  const params = new URLSearchParams({ limit: PAGE_SIZE });
+  if (cursor) params.set("cursor", cursor);
+
+  const res = await fetch(`http://localhost:8000${path}?${params}`);
+  const data = await res.json();
+  return {
+    items: Array.isArray(data?.items) ? data.items : [],
+    nextCursor: data?.next_cursor || null,
+  };
+}
+
 export default function DeptChairPage() {
   const { user } = useContext(AuthContext);
 
   const [progressNotes, setProgressNotes] = useState([]);
   const [studentEvals, setStudentEvals] = useState([]);
+  const [notesCursor, setNotesCursor] = useState(null);
+  const [evalsCursor, setEvalsCursor] = useState(null);
   const [loading, setLoading] = useState(true);
 
   // Automatically fetch on mount
@@ -23,19 +40,18 @@ export default function DeptChairPage() {
 
   async function loadDashboard() {
     try {
-      const [progressRes, evalRes] = await Promise.all([
-        fetch("http://localhost:8000/dept_chair/progress-notes"),
-        fetch("http://localhost:8000/dept_chair/student-evaluations")
+      const [progressPage, evalPage] = await Promise.all([
+        fetchPage("/dept_chair/progress-notes", null),
+        fetchPage("/dept_chair/student-evaluations", null)
       ]);
 
-      const progressData = await progressRes.json();
-      const evalData = await evalRes.json();
+      console.log("Progress notes:", progressPage.items);
+      console.log("Student evals:", evalPage.items);
 
-      console.log("Progress notes:", progressData);
-      console.log("Student evals:", evalData);
-
-      setProgressNotes(progressData);
-      setStudentEvals(evalData);
+      setProgressNotes(progressPage.items);
+      setNotesCursor(progressPage.nextCursor);
+      setStudentEvals(evalPage.items);
+      setEvalsCursor(evalPage.nextCursor);
     } catch (err) {
       console.error("Failed to fetch dashboard data:", err);
     } finally {
@@ -43,6 +59,26 @@ export default function DeptChairPage() {
     }
   }
 
+  async function loadMoreNotes() {
+    try {
+      const page = await fetchPage("/dept_chair/progress-notes", notesCursor);
+      setProgressNotes(prev => [...prev, ...page.items]);
+      setNotesCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to load more progress notes:", err);
+    }
+  }
+
+  async function loadMoreEvals() {
+    try {
+      const page = await fetchPage("/dept_chair/student-evaluations", evalsCursor);
+      setStudentEvals(prev => [...prev, ...page.items]);
+      setEvalsCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to load more student evaluations:", err);
+    }
+  }
+
   if (loading) return <p>Loading dashboard...</p>;
 
   // ------------------------------------------------------------------
@@ -173,6 +209,10 @@ export default function DeptChairPage() {
         ))}
       </div>
     ))}
+
+    {notesCursor && (
+      <button onClick={loadMoreNotes} style={loadMoreStyle}>Load more progress notes</button>
+    )}
 </section>
 
 <hr style={{ border: 'none', borderTop: '1px solid #e9ecef', marginBottom: '30px' }} />
@@ -225,8 +265,22 @@ export default function DeptChairPage() {
           </div>
             ))}
     </div>
+
+    {evalsCursor && (
+      <button onClick={loadMoreEvals} style={{ ...loadMoreStyle, marginTop: '20px' }}>Load more evaluations</button>
+    )}
 </section>
       <hr />
     </div>
   );
-}
\ No newline at end of file
+}
+
+const loadMoreStyle = {
+  padding: '10px 15px',
+  borderRadius: '5px',
+  border: '1px solid #007bff',
+  backgroundColor: '#fff',
+  color: '#007bff',
+  cursor: 'pointer',
+  fontWeight: '600'
+};
@@ -7,6 +7,7 @@ export default function CoordinatorDashboard() {
   const { user } = useContext(AuthContext);
 
   const [classes, setClasses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [coverage, setCoverage] = useState({});
   const [expandedRows, setExpandedRows] = useState({});
   const [loading, setLoading] = useState(true);
@@ -17,12 +18,13 @@ export default function CoordinatorDashboard() {
     async function fetchData() {
       try {
         const classRes = await fetch("http://localhost:8000/coordinator/classes");
-        const classData = await classRes.json();
+        const classPage = await classRes.json();
 
         const covRes = await fetch("http://localhost:8000/coordinator/coverage");
         const covData = await covRes.json();
 
-        setClasses(classData);
+        setClasses(classPage.items || []);
+        setNextCursor(classPage.next_cursor || null);
         setCoverage(covData);
       } catch (err) {
         console.error("Error fetching coordinator data:", err);
@@ -34,6 +36,19 @@ export default function CoordinatorDashboard() {
     fetchData();
   }, [user]);
 
+  async function loadMoreClasses() {
+    try {
+      const classRes = await fetch(
+        `http://localhost:8000/coordinator/classes?cursor=${encodeURIComponent(nextCursor)}`
+      );
+      const classPage = await classRes.json();
+      setClasses((prev) => [...prev, ...(classPage.items || [])]);
+      setNextCursor(classPage.next_cursor || null);
+    } catch (err) {
+      console.error("Error loading more classes:", err);
+    }
+  }
+
   function toggleRow(classId) {
     setExpandedRows((prev) => ({
       ...prev,
@@ -132,6 +147,12 @@ export default function CoordinatorDashboard() {
           ))}
         </tbody>
       </table>
+
+      {nextCursor && (
+        <button style={{ ...btnSecondary, marginTop: "12px" }} onClick={loadMoreClasses}>
+          Load more
+        </button>
+      )}
     </div>
   );
 }